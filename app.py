@@ -1,7 +1,4 @@
 import streamlit as st
-import matplotlib.pyplot as plt
-import matplotlib.font_manager as fm
-from pathlib import Path
 
 
 # ---------------------------
@@ -13,27 +10,8 @@ st.set_page_config(
     layout="wide"
 )
 
-# -----------------------------
-# 日本語フォント設定
-# -----------------------------
-def setup_japanese_font():
-    font_path = Path.cwd() / "fonts" / "ipaexg.ttf"
-
-    if font_path.exists():
-        # 🔥 フォントを明示的に登録
-        fm.fontManager.addfont(str(font_path))
-        font_prop = fm.FontProperties(fname=str(font_path))
-        font_name = font_prop.get_name()
-        plt.rcParams["font.family"] = font_name
-        plt.rcParams["axes.unicode_minus"] = False
-        print(f"✅ フォント読み込み成功: {font_name}")
-    else:
-        print("❌ フォントが見つかりません")
-
-# 一度だけ実行
-if "font_loaded" not in st.session_state:
-    setup_japanese_font()
-    st.session_state["font_loaded"] = True
+## 日本語フォントは最初に図を作るときにプロセスで1回だけ登録する（libs.fonts.configure_matplotlib）
+## トップページでは matplotlib・pandas を読み込まない
 
 
 # ---------------------------
@@ -60,7 +38,7 @@ st.write("")
 # ---------------------------
 # ページ説明カード
 # ---------------------------
-col1, col2 = st.columns(2)
+col1, col2, col3 = st.columns(3)
 
 with col1:
     st.markdown(
@@ -98,4 +76,23 @@ with col2:
         </div>
         """,
         unsafe_allow_html=True
+    )
+
+with col3:
+    st.markdown(
+        """
+        <div style="
+            background-color:#f5f7fa;
+            padding:25px;
+            border-radius:15px;
+            box-shadow:2px 2px 15px rgba(0,0,0,0.05);
+        ">
+            <h3>⏱ today</h3>
+            <p style="font-size:16px;">
+                当日の稼働状況を、<br>
+                CSVの追記に合わせて自動更新します。
+            </p>
+        </div>
+        """,
+        unsafe_allow_html=True
     )
\ No newline at end of file
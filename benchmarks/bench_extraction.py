@@ -0,0 +1,126 @@
+"""
+売上・担当者抽出（output_sales_and_operator.py）のベンチマーク
+
+合成の machining_completed（既定 300万行）を作り、
+機械×日ごとのクエリ（旧実装）と全機械・全期間の1クエリ（現実装）を
+インデックスの有無それぞれで計測し、結果が一致することも確認する。
+
+使い方:
+    python -m benchmarks.bench_extraction
+    python -m benchmarks.bench_extraction --rows 5000000 --days 365 --db /tmp/machining_completed.db
+"""
+import argparse
+import sqlite3
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+import output_sales_and_operator as extraction
+from benchmarks.synthetic import write_machining_db
+from libs.settings import load_config
+
+
+START_DATE = date(2026, 1, 1)
+
+## 旧実装のクエリ（比較のためだけに残す）
+SQL_REVENUE = """
+SELECT SUM(revenue_total)
+FROM machining_completed
+WHERE unit_name = ?
+AND timestamp BETWEEN ? AND ?
+"""
+
+SQL_OPERATOR = """
+SELECT operator_name
+FROM machining_completed
+WHERE unit_name = ?
+AND timestamp BETWEEN ? AND ?
+GROUP BY operator_name
+ORDER BY COUNT(*) DESC
+LIMIT 1
+"""
+
+
+def _fetch_one(cur, machine_name, time_range_start, day_end, night_start, time_range_end) -> dict:
+    """旧実装: 1機械1日分の売上・日勤/夜勤の担当者"""
+    cur.execute(SQL_REVENUE, (machine_name, time_range_start, time_range_end))
+    revenue = cur.fetchone()[0] or 0
+
+    cur.execute(SQL_OPERATOR, (machine_name, time_range_start, day_end))
+    r = cur.fetchone()
+    day_operator = r[0] if r else ""
+
+    cur.execute(SQL_OPERATOR, (machine_name, night_start, time_range_end))
+    r = cur.fetchone()
+    night_operator = r[0] if r else ""
+
+    return {
+        "revenue": revenue,
+        "day_operator": day_operator,
+        "night_operator": night_operator,
+    }
+
+
+def _per_machine(cur, machines: list, start_date: date, days: int, config: dict) -> dict:
+    """旧実装: 機械×日ごとに3クエリ"""
+    result = {}
+    for i in range(days):
+        target = (start_date + timedelta(days=i)).strftime("%Y-%m-%d")
+        time_range_start, day_end, night_start, time_range_end = extraction.create_time(target, config)
+        result[target] = {
+            name: _fetch_one(cur, name, time_range_start, day_end, night_start, time_range_end)
+            for name in machines
+        }
+    return result
+
+
+def _measure(label: str, func) -> tuple:
+    t0 = time.perf_counter()
+    result = func()
+    print(f"{label:<28} {time.perf_counter() - t0:>8.2f} s")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="売上・担当者抽出のベンチマーク")
+    parser.add_argument("--rows", type=int, default=3_000_000)
+    parser.add_argument("--days", type=int, default=180)
+    parser.add_argument("--query-days", type=int, default=31, help="計測する期間（日数）")
+    parser.add_argument("--db", type=Path, help="合成DBの保存先（既存なら再利用）")
+    args = parser.parse_args()
+
+    config = load_config()
+    machines = extraction.machine_names(config)
+    db_path = args.db or Path(tempfile.gettempdir()) / f"machining_completed_{args.rows}.db"
+
+    if not db_path.exists():
+        t0 = time.perf_counter()
+        write_machining_db(db_path, args.rows, machines, START_DATE, args.days)
+        print(f"合成DB作成: {args.rows:,} 行 ({time.perf_counter() - t0:.1f} 秒) -> {db_path}")
+
+    end_date = (START_DATE + timedelta(days=args.query_days - 1)).strftime("%Y-%m-%d")
+
+    with sqlite3.connect(db_path) as conn:
+        cur = conn.cursor()
+        conn.execute("DROP INDEX IF EXISTS idx_machining_completed_unit_timestamp")
+
+        print(f"{len(machines)} 機械 × {args.query_days} 日")
+        print("-" * 40)
+        _measure("1クエリ（索引なし）", lambda: extraction.fetch_fleet_revenue_and_operator(
+            cur, machines, START_DATE.strftime("%Y-%m-%d"), end_date, config))
+
+        extraction.create_index(conn)
+        legacy = _measure("機械×日ごと（索引あり）", lambda: _per_machine(cur, machines, START_DATE, args.query_days, config))
+        fleet = _measure("1クエリ（索引あり）", lambda: extraction.fetch_fleet_revenue_and_operator(
+            cur, machines, START_DATE.strftime("%Y-%m-%d"), end_date, config))
+
+    mismatches = sum(
+        legacy[d][m]["revenue"] != fleet[d][m]["revenue"]
+        for d in legacy for m in machines
+    )
+    print(f"売上の不一致: {mismatches} 件")
+
+
+if __name__ == "__main__":
+    main()
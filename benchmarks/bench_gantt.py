@@ -0,0 +1,90 @@
+"""
+ガントチャート描画のベンチマーク
+
+イベント数 100 / 1,000 / 10,000 の合成データで、
+行ごとの barh + axvline（旧実装）と、ステータスごとの broken_barh +
+LineCollection（現実装）の 描画時間・Artist数 を比較する。
+
+使い方:
+    python -m benchmarks.bench_gantt
+"""
+import time
+
+import matplotlib
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt
+
+from benchmarks.synthetic import make_day_events
+from libs.graph_blueprint import MachineDailyReport, ReportConfig
+
+
+EVENT_COUNTS: list = [100, 1_000, 10_000]
+REPEAT = 3
+
+
+def _legacy_draw_gantt(report: MachineDailyReport, ax):
+    """旧実装（行ごとに barh / axvline）"""
+    for _, row in report.df.iterrows():
+        ax.barh(y=0, left=row["start_h"], width=row["duration_h"], color=row["Color"], height=0.6)
+
+    pallet_df = report.df[report.df["ステータス"] == "パレチェン"]
+    for _, row in pallet_df.iterrows():
+        ax.axvline(x=row["start_h"], ymin=0.0, ymax=0.5, color="black", linewidth=1, alpha=0.8, zorder=5)
+
+
+def _current_draw_gantt(report: MachineDailyReport, ax):
+    fig = ax.figure
+    ax.remove()
+    report._draw_gantt(fig, fig.add_gridspec(2, 2, height_ratios=[0.4, 2.0]))
+    return fig.axes[0]
+
+
+def _count_artists(ax) -> int:
+    return len(ax.patches) + len(ax.collections) + len(ax.lines)
+
+
+def _measure(report: MachineDailyReport, draw_func) -> tuple:
+    best = float("inf")
+    artists = 0
+    for _ in range(REPEAT):
+        t0 = time.perf_counter()
+        fig, ax = plt.subplots(figsize=(16, 3))
+        ax = draw_func(report, ax) or ax
+        fig.canvas.draw()
+        best = min(best, time.perf_counter() - t0)
+        artists = _count_artists(ax)
+        plt.close(fig)
+    return best, artists
+
+
+def main():
+    print(f"{'events':>8} | {'legacy[s]':>10} {'artists':>8} | {'current[s]':>10} {'artists':>8} | {'speedup':>7}")
+    print("-" * 66)
+
+    for n in EVENT_COUNTS:
+        df = make_day_events(n)
+        config = ReportConfig(
+            machine_name="BENCH",
+            report_date="2026/01/01",
+            sales_amount=0,
+            on_time=None,
+            off_time=None,
+            day_operator=None,
+            day_multi=None,
+            night_operator=None,
+            night_multi=None,
+        )
+        report = MachineDailyReport(df, config)
+
+        legacy_t, legacy_a = _measure(report, _legacy_draw_gantt)
+        current_t, current_a = _measure(report, _current_draw_gantt)
+
+        print(
+            f"{n:>8,} | {legacy_t:>10.3f} {legacy_a:>8,} | "
+            f"{current_t:>10.3f} {current_a:>8,} | {legacy_t / current_t:>6.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
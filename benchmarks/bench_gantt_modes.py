@@ -0,0 +1,81 @@
+"""
+ガントチャートの描画モード比較（matplotlib 静止画 vs Plotly インタラクティブ）
+
+各モードについて、サーバー側でブラウザに送るデータができるまでの時間と
+その転送サイズを測る。
+- 静止画: MachineDailyReport.draw() → PNG（st.pyplot と同じ dpi=200）
+- インタラクティブ: 区間圧縮 → Plotly Figure → JSON
+
+ブラウザ側の描画時間（first paint）はここでは測れないため、
+転送サイズとサーバー側の時間を比較の目安にする。
+
+使い方:
+    python -m benchmarks.bench_gantt_modes
+"""
+import time
+from datetime import date
+
+import matplotlib
+matplotlib.use("Agg")
+
+from benchmarks.synthetic import make_day_events
+from libs.event_store import load_day
+from libs.graph_blueprint import MachineDailyReport, ReportConfig
+from libs.interactive_gantt import build_gantt_figure, compress_intervals
+from libs.report_cache import render_to_bytes
+
+
+EVENT_COUNTS: list = [100, 1_000, 10_000]
+
+## 実データの例（イベント数の多い日）
+REAL_DAYS: list = [("M1-6", date(2026, 5, 11))]
+
+
+def _config(name: str) -> ReportConfig:
+    return ReportConfig(
+        machine_name=name,
+        report_date="2026/01/01",
+        sales_amount=100_000,
+        on_time=None,
+        off_time=None,
+        day_operator=None,
+        day_multi=None,
+        night_operator=None,
+        night_multi=None,
+    )
+
+
+def _measure(label: str, df):
+    report = MachineDailyReport(df, _config(label))
+
+    t0 = time.perf_counter()
+    png = render_to_bytes(report.draw(), "png")
+    static_t = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    payload = build_gantt_figure(report).to_json()
+    interactive_t = time.perf_counter() - t0
+
+    n_intervals = len(compress_intervals(report))
+
+    print(
+        f"{label:>18} {len(df):>7,} | {static_t:>8.3f} {len(png) / 1024:>9.1f} | "
+        f"{interactive_t:>8.3f} {len(payload.encode('utf-8')) / 1024:>9.1f} {n_intervals:>9,}"
+    )
+
+
+def main():
+    print(f"{'':>18} {'events':>7} | {'png[s]':>8} {'png[KB]':>9} | {'json[s]':>8} {'json[KB]':>9} {'intervals':>9}")
+    print("-" * 80)
+
+    for machine, target_date in REAL_DAYS:
+        df = load_day(machine, target_date)
+        if df is not None:
+            _measure(f"{machine} {target_date}", df)
+
+    for n in EVENT_COUNTS:
+        _measure("synthetic", make_day_events(n))
+
+
+if __name__ == "__main__":
+    main()
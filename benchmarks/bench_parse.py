@@ -0,0 +1,70 @@
+"""
+稼働ステータスCSV読み込みのベンチマーク
+
+dataset/ 配下の全CSVを
+  - 既定の型で読み込み + pd.to_datetime(format="mixed")（旧実装）
+  - 標準形式の直接解析（read_status_csv, engine="fast"）
+  - 型指定の read_csv + 固定形式の日時変換（engine="c" / "pyarrow"）
+で読み込み、合計時間と DataFrame のメモリ使用量（deep）を比較する。
+
+使い方:
+    python -m benchmarks.bench_parse
+"""
+import time
+
+import pandas as pd
+
+from libs.settings import DATASET_DIR
+from libs.status_csv import HAS_PYARROW, read_status_csv
+
+
+REPEAT = 3
+
+
+def _legacy_read(path) -> pd.DataFrame:
+    """旧実装（pages の load_csv 相当）"""
+    df = pd.read_csv(path, encoding="utf-8-sig")
+    df["日時"] = pd.to_datetime(df["日時"], format="mixed")
+    return df
+
+
+def _measure(label: str, reader, paths: list) -> list:
+    best = float("inf")
+    for _ in range(REPEAT):
+        t0 = time.perf_counter()
+        frames = [reader(p) for p in paths]
+        best = min(best, time.perf_counter() - t0)
+
+    rows = sum(len(df) for df in frames)
+    memory = sum(df.memory_usage(deep=True).sum() for df in frames)
+    print(f"{label:<22} {best:>8.2f} {best / len(paths) * 1000:>8.2f} {rows:>9,} {memory / 1024 / 1024:>9.2f}")
+    return frames
+
+
+def main():
+    paths = sorted(DATASET_DIR.glob("*/*.csv"))
+
+    print(f"{len(paths):,} ファイル（最良 {REPEAT} 回）")
+    print(f"{'':<22} {'合計[s]':>8} {'1件[ms]':>8} {'行数':>9} {'メモリ[MB]':>9}")
+    print("-" * 62)
+
+    legacy = _measure("旧実装", _legacy_read, paths)
+    typed = _measure("型指定 (fast)", read_status_csv, paths)
+    _measure("型指定 (c)", lambda p: read_status_csv(p, engine="c"), paths)
+    if HAS_PYARROW:
+        _measure("型指定 (pyarrow)", lambda p: read_status_csv(p, engine="pyarrow"), paths)
+
+    # 変換結果が旧実装と一致すること
+    mismatches = sum(
+        not (
+            a["日時"].equals(b["日時"])
+            and a["経過秒数"].astype("int64").equals(b["経過秒数"].astype("int64"))
+            and a["ステータス"].equals(b["ステータス"].astype(str))
+        )
+        for a, b in zip(legacy, typed)
+    )
+    print(f"旧実装との不一致: {mismatches} ファイル")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+ロールアップ作成（CSVの読み込み・集計）の並列方式のベンチマーク
+
+空のロールアップから全機械分を作る時間を、逐次 / スレッド / プロセス で比較する。
+--latency-ms を指定すると、ファイル共有の読み込み待ちを想定して
+1ファイルごとにその時間だけ待ってから読む（I/O 待ちが主の場合、スレッドで短縮される）。
+
+使い方:
+    python -m benchmarks.bench_rollup
+    python -m benchmarks.bench_rollup --latency-ms 5 --workers 8
+"""
+import argparse
+import tempfile
+import time
+from functools import partial
+from pathlib import Path
+
+from libs.parallel import EXECUTORS
+from libs.rollup import refresh_rollup, summarize_file
+from libs.settings import LOAD_WORKERS
+
+
+def _summarize_with_latency(path: Path, latency_ms: float) -> tuple:
+    time.sleep(latency_ms / 1000)
+    return summarize_file(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ロールアップ作成の並列方式の比較")
+    parser.add_argument("--latency-ms", type=float, default=0, help="1ファイルごとに加える読み込み待ち（ミリ秒）")
+    parser.add_argument("--workers", type=int, default=LOAD_WORKERS)
+    args = parser.parse_args()
+
+    import libs.rollup as rollup
+    if args.latency_ms:
+        # 並列実行される関数を差し替える（プロセスプールでも渡せるよう partial にする）
+        rollup.summarize_file = partial(_summarize_with_latency, latency_ms=args.latency_ms)
+
+    print(f"ワーカー数 {args.workers} / 読み込み待ち {args.latency_ms} ms")
+    for executor in EXECUTORS:
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = Path(tmp) / "rollup.db"
+            t0 = time.perf_counter()
+            files = refresh_rollup(db_path=db_path, executor=executor, max_workers=args.workers)
+            elapsed = time.perf_counter() - t0
+        print(f"{executor:<8} {files:>6} ファイル {elapsed:>8.2f} s")
+
+
+if __name__ == "__main__":
+    main()
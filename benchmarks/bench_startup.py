@@ -0,0 +1,129 @@
+"""
+起動時間（import 時間）のベンチマーク
+
+app.py と pages/*.py のモジュール先頭の import 文だけを取り出し、新しいプロセスで実行する。
+- total: import 文の実行にかかった時間（インタプリタ起動を除く、repeat 回の最小値）
+- 増分: python -X importtime で求めた、streamlit 本体が読み込まないモジュールの累積時間の合計
+  （サーバーでは streamlit は読み込み済みのため、ページを開いたときに増える分）
+増分が STARTUP_BUDGET_MS を超えたら終了コード 1。
+累積時間の大きいトップレベルのモジュールも一覧にする。
+--save で一覧を benchmarks/importtime.txt に保存する（変更前後の比較用に git で管理する）。
+
+使い方:
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --save
+"""
+import argparse
+import ast
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+
+BASE_DIR: Path = Path(__file__).resolve().parent.parent
+REPORT_PATH: Path = Path(__file__).resolve().parent / "importtime.txt"
+
+SCRIPTS: list = ["app.py", "pages/daily.py", "pages/analysis.py", "pages/today.py"]
+
+## スクリプトごとの増分の上限（ミリ秒）
+STARTUP_BUDGET_MS: dict = {
+    "app.py": 50,
+    "pages/daily.py": 100,
+    "pages/analysis.py": 100,
+    "pages/today.py": 100,
+}
+
+REPEAT = 5
+TOP_N = 15
+
+
+def top_level_imports(script: Path) -> str:
+    """スクリプトのモジュール先頭にある import 文だけを取り出したコード"""
+    tree = ast.parse(script.read_text(encoding="utf-8"))
+    return "\n".join(
+        ast.unparse(node)
+        for node in tree.body
+        if isinstance(node, (ast.Import, ast.ImportFrom))
+    )
+
+
+def _run(code: str, *options: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *options, "-c", code],
+        cwd=BASE_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def wall_ms(code: str) -> float:
+    """新しいプロセスで code を実行する時間（repeat 回の最小値、ミリ秒）"""
+    best = float("inf")
+    for _ in range(REPEAT):
+        t0 = time.perf_counter()
+        _run(code)
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def importtime_top(code: str, exclude: set = frozenset()) -> list:
+    """-X importtime の累積時間が大きいトップレベルのモジュール [(モジュール, ミリ秒), ...]"""
+    stderr = _run(code, "-X", "importtime").stderr
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        # 入れ子の import は名前の前の空白が増える
+        if name.startswith("  ") or name.strip() in exclude:
+            continue
+        modules.append((name.strip(), int(cumulative) / 1000))
+    return sorted(modules, key=lambda m: -m[1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="起動時間（import 時間）のベンチマーク")
+    parser.add_argument("--save", action="store_true", help=f"一覧を {REPORT_PATH.name} に保存する")
+    args = parser.parse_args()
+
+    base_ms = wall_ms("pass")
+    streamlit_ms = wall_ms("import streamlit") - base_ms
+    streamlit_modules = {name for name, _ in importtime_top("import streamlit")}
+
+    print(f"インタプリタ起動 {base_ms:.0f} ms / streamlit {streamlit_ms:.0f} ms\n")
+    print(f"{'script':<20} {'total(ms)':>10} {'増分(ms)':>9} {'上限(ms)':>9}")
+
+    report = []
+    over = []
+    for script in SCRIPTS:
+        code = top_level_imports(BASE_DIR / script)
+        total = wall_ms(code) - base_ms
+        modules = importtime_top(f"import streamlit\n{code}", streamlit_modules)
+        extra = sum(ms for _, ms in modules)
+        budget = STARTUP_BUDGET_MS[script]
+        flag = "" if extra <= budget else "  ⚠ 上限超過"
+        print(f"{script:<20} {total:>10.0f} {extra:>9.0f} {budget:>9}{flag}")
+        if flag:
+            over.append(script)
+
+        report.append(f"# {script}（streamlit 以外、累積 ms）")
+        report.extend(
+            f"{ms:>8.1f}  {name}"
+            for name, ms in modules[:TOP_N]
+        )
+        report.append("")
+
+    print("\n" + "\n".join(report))
+
+    if args.save:
+        REPORT_PATH.write_text("\n".join(report), encoding="utf-8")
+        print(f"保存しました: {REPORT_PATH}")
+
+    if over:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
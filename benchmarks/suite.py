@@ -0,0 +1,361 @@
+"""
+ベンチマークスイート（基準値との比較つき）
+
+ページが使う処理を、実データ（dataset/）と合成データ（機械数×日数を指定）に対して計測し、
+benchmarks/baselines.json に保存した基準値より遅く・重くなったものを検出する。
+
+計測する処理（旧実装の関数名との対応）:
+    parse_csv           全CSVの読み込み（load_multiple_csv 相当）
+    ingest              イベントストアへの圧縮（空の状態から）
+    rollup              日次ロールアップの作成（空の状態から）
+    load_events         期間・全機械のイベント読み込み
+    status_seconds      期間のステータス別秒数
+    total_sales         期間の売上合計（get_total_sales 相当）
+    daily_sale          1機械1日の売上行（get_sale 相当）× 機械数 × 7日
+    shift_detail        シフト別明細
+    period_analysis     期間分析の結果一式（キャッシュ無し）
+    report_init         MachineDailyReport.__init__（イベント数が最多の日）
+    report_draw         MachineDailyReport.draw()
+    pie_chart           期間分析の円グラフ（draw_pie_chart）
+
+計測値:
+    seconds   実行時間（repeat 回の最小値）
+    peak_mb   別に1回実行したときの tracemalloc のピーク（Python / NumPy のヒープ。Arrow のメモリプールは含まない）
+    artists   描画系のみ、Figure 内の Artist 数（fig.findobj()）
+
+データセットごとに子プロセスで計測する（設定のパスは import 時に決まるため、
+環境変数 MACHINING_DATASET_DIR / MACHINING_CACHE_DIR を変えて起動する）。
+キャッシュ類は一時ディレクトリに作るので、cache/ の内容には影響しない。
+合成データは cache/bench/ に作り、同じ規模なら使い回す。
+
+使い方:
+    python -m benchmarks.suite                          # 実データ + 合成データ（small）を基準値と比較
+    python -m benchmarks.suite --dataset synthetic --scale full
+    python -m benchmarks.suite --save                   # 今回の結果を基準値として保存
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Callable, Optional
+
+
+# --- 定数 ---
+BASELINE_PATH: Path = Path(__file__).resolve().parent / "baselines.json"
+
+## 合成データの規模（機械数, 日数）
+SCALES: dict = {
+    "small": (10, 90),
+    "full": (50, 3 * 365),
+}
+
+SYNTHETIC_START_DATE = date(2024, 1, 1)
+
+REPEAT = 3
+
+## 基準値からの許容幅（時間はばらつきが大きいので広めに取る）
+TIME_TOLERANCE = 0.5
+MEMORY_TOLERANCE = 0.2
+## これより短い処理の時間差は判定しない（秒）
+MIN_TIME_DIFF = 0.005
+
+
+@dataclass
+class Case:
+    name: str
+    run: Callable  # 戻り値は追加の計測値（dict）または None
+    setup: Optional[Callable] = None  # 毎回の実行前に呼ぶ（計測しない）
+    repeat: Optional[int] = None  # 省略時は --repeat（空の状態から作る処理は1回）
+
+
+@dataclass
+class Workload:
+    machines: list
+    start_date: date
+    end_date: date
+    report_machine: str
+    report_date: date
+    sale_lookups: list = field(default_factory=list)  # [(machine, date), ...]
+
+
+# ---------------------------
+# 計測（子プロセス）
+# ---------------------------
+def _make_workload() -> Workload:
+    from libs.machine_registry import get_registry
+    from libs.manifest import get_manifest
+
+    registry = {name: info for name, info in get_registry().items() if info.has_data}
+    machines = sorted(registry)
+    start_date = min(info.first_date for info in registry.values())
+    end_date = max(info.last_date for info in registry.values())
+
+    # 日次レポートはイベント数の最も多い日で計測する
+    manifest = get_manifest(machines[0])
+    report_date = max(manifest.dates, key=lambda d: (manifest.entries[d].rows, d))
+
+    sale_lookups = [
+        (m, registry[m].last_date - timedelta(days=i))
+        for m in machines
+        for i in range(7)
+    ]
+    return Workload(machines, start_date, end_date, machines[0], report_date, sale_lookups)
+
+
+def _make_cases(work: Workload) -> list:
+    from libs.analysis_charts import draw_pie_chart
+    from libs.daily_report import make_report_config
+    from libs.event_store import EVENT_STORE_DIR, load_day, load_events, sync_store
+    from libs.graph_blueprint import MachineDailyReport
+    from libs.manifest import get_manifest
+    from libs.period_analysis import analyze_period
+    from libs.result_cache import RESULT_CACHE_DIR, ResultCache
+    from libs.rollup import ROLLUP_DB_PATH, get_day_summary, query_status_seconds, refresh_rollup
+    from libs.sales_db import fetch_daily_sale, fetch_total_sales
+    from libs.settings import DATASET_DIR
+    from libs.shifts import query_shift_detail
+    from libs.status_csv import read_status_csv
+
+    machines, start, end = work.machines, work.start_date, work.end_date
+    paths = [
+        DATASET_DIR / m / f"{d.strftime('%Y%m%d')}.csv"
+        for m in machines
+        for d in get_manifest(m).dates
+    ]
+
+    def clear_store():
+        shutil.rmtree(EVENT_STORE_DIR, ignore_errors=True)
+
+    def clear_rollup():
+        ROLLUP_DB_PATH.unlink(missing_ok=True)
+
+    def clear_results():
+        shutil.rmtree(RESULT_CACHE_DIR, ignore_errors=True)
+
+    def parse_csv():
+        rows = sum(len(read_status_csv(p)) for p in paths)
+        return {"files": len(paths), "rows": rows}
+
+    def report_inputs():
+        df = load_day(work.report_machine, work.report_date)
+        day_summary = get_day_summary(work.report_machine, work.report_date)
+        sale_row = fetch_daily_sale(work.report_machine, work.report_date)
+        config = make_report_config(work.report_machine, work.report_date, day_summary, sale_row)
+        return df, config, day_summary
+
+    df, config, day_summary = None, None, None
+    state = {}
+
+    def report_init():
+        state["report"] = MachineDailyReport(df, config, day_summary.status_seconds)
+        return {"events": len(df)}
+
+    def report_draw():
+        fig = state["report"].draw()
+        return {"artists": len(fig.findobj())}
+
+    def pie_chart():
+        fig, _ = draw_pie_chart(state["status_seconds"])
+        return {"artists": len(fig.findobj())}
+
+    def status_seconds():
+        state["status_seconds"] = query_status_seconds(machines, start, end)
+
+    def prepare_report():
+        nonlocal df, config, day_summary
+        if df is None:
+            df, config, day_summary = report_inputs()
+
+    return [
+        Case("parse_csv", parse_csv),
+        Case("ingest", lambda: {"months": sum(map(len, sync_store(machines).values()))}, clear_store, repeat=1),
+        Case("rollup", lambda: {"days": refresh_rollup(machines)}, clear_rollup, repeat=1),
+        Case("load_events", lambda: {"rows": len(load_events(machines, start, end))}),
+        Case("status_seconds", status_seconds),
+        Case("total_sales", lambda: fetch_total_sales(machines, start, end) and None),
+        Case("daily_sale", lambda: [fetch_daily_sale(m, d) for m, d in work.sale_lookups] and None),
+        Case("shift_detail", lambda: {"rows": len(query_shift_detail(machines, start, end))}),
+        Case(
+            "period_analysis",
+            lambda: analyze_period(machines, start, end, ResultCache()) and None,
+            clear_results,
+            repeat=1,
+        ),
+        Case("report_init", report_init, prepare_report),
+        Case("report_draw", report_draw, lambda: prepare_report() or report_init()),
+        Case("pie_chart", pie_chart),
+    ]
+
+
+def _measure(case: Case, repeat: int) -> dict:
+    best = float("inf")
+    extra = None
+    for _ in range(case.repeat or repeat):
+        if case.setup:
+            case.setup()
+        t0 = time.perf_counter()
+        extra = case.run()
+        best = min(best, time.perf_counter() - t0)
+
+    # メモリは計測のオーバーヘッドが大きいので別に1回だけ
+    if case.setup:
+        case.setup()
+    tracemalloc.start()
+    case.run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {"seconds": round(best, 5), "peak_mb": round(peak / 1024 / 1024, 2), **(extra or {})}
+
+
+def run_worker(repeat: int, output: Path):
+    import warnings
+
+    import matplotlib
+    matplotlib.use("Agg")
+    # 日本語フォントの無い環境では描画のたびに出るため抑止する
+    warnings.filterwarnings("ignore", message="Glyph .* missing from font")
+
+    work = _make_workload()
+    results = {}
+    for case in _make_cases(work):
+        results[case.name] = _measure(case, repeat)
+        print(f"  {case.name:<16} {results[case.name]['seconds']:>9.4f} s", file=sys.stderr, flush=True)
+
+    meta = {
+        "machines": len(work.machines),
+        "start_date": work.start_date.isoformat(),
+        "end_date": work.end_date.isoformat(),
+        "report": f"{work.report_machine} {work.report_date}",
+    }
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({"meta": meta, "cases": results}, f, ensure_ascii=False)
+
+
+# ---------------------------
+# データセットの準備と比較（親プロセス）
+# ---------------------------
+def _synthetic_dir(scale: str) -> Path:
+    """合成データを用意する（同じ規模のものがあれば使い回す）"""
+    from benchmarks.synthetic import write_dataset
+    from libs.settings import CACHE_DIR
+
+    n_machines, days = SCALES[scale]
+    root = CACHE_DIR / "bench" / f"synthetic-{scale}"
+    marker = root / "_complete.json"
+    params = {"machines": n_machines, "days": days, "start_date": SYNTHETIC_START_DATE.isoformat()}
+
+    if marker.exists() and json.loads(marker.read_text(encoding="utf-8")) == params:
+        return root
+
+    shutil.rmtree(root, ignore_errors=True)
+    print(f"合成データを作成中: {n_machines} 機械 × {days} 日 → {root}", file=sys.stderr)
+    write_dataset(root, n_machines, days, SYNTHETIC_START_DATE)
+    marker.write_text(json.dumps(params), encoding="utf-8")
+    return root
+
+
+def _run_dataset(label: str, dataset_dir: Optional[Path], repeat: int) -> dict:
+    print(f"[{label}]", file=sys.stderr)
+    with tempfile.TemporaryDirectory(prefix="machining-bench-") as tmp:
+        env = dict(os.environ, MACHINING_CACHE_DIR=str(Path(tmp) / "cache"))
+        if dataset_dir is not None:
+            env["MACHINING_DATASET_DIR"] = str(dataset_dir)
+        output = Path(tmp) / "result.json"
+
+        subprocess.run(
+            [sys.executable, "-m", "benchmarks.suite", "--worker", "--repeat", str(repeat), "--output", str(output)],
+            env=env,
+            check=True,
+            cwd=Path(__file__).resolve().parent.parent,
+        )
+        return json.loads(output.read_text(encoding="utf-8"))
+
+
+def _compare(current: dict, baseline: Optional[dict], time_tol: float, memory_tol: float) -> list:
+    """基準値と比較して、悪化した項目のメッセージを返す"""
+    regressions = []
+    base_cases = (baseline or {}).get("cases", {})
+
+    print(f"  {'case':<16} {'seconds':>9} {'base':>9} {'peak MB':>9} {'base':>9} {'artists':>8}")
+    for name, result in current["cases"].items():
+        base = base_cases.get(name)
+        flags = []
+        if base:
+            if (
+                result["seconds"] > base["seconds"] * (1 + time_tol)
+                and result["seconds"] - base["seconds"] > MIN_TIME_DIFF
+            ):
+                flags.append(f"時間 {result['seconds'] / base['seconds']:.2f}倍")
+            if result["peak_mb"] > base["peak_mb"] * (1 + memory_tol) and result["peak_mb"] - base["peak_mb"] > 1:
+                flags.append(f"メモリ {result['peak_mb'] / max(base['peak_mb'], 0.01):.2f}倍")
+            if "artists" in base and result.get("artists") != base["artists"]:
+                flags.append(f"Artist数 {base['artists']} → {result.get('artists')}")
+
+        base_seconds = f"{base['seconds']:.4f}" if base else "-"
+        base_peak = f"{base['peak_mb']:.2f}" if base else "-"
+        print(
+            f"  {name:<16} {result['seconds']:>9.4f} {base_seconds:>9} "
+            f"{result['peak_mb']:>9.2f} {base_peak:>9} "
+            f"{result.get('artists', ''):>8}  {'⚠ ' + ', '.join(flags) if flags else ''}"
+        )
+        regressions.extend(f"{name}: {flag}" for flag in flags)
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ベンチマークスイート（基準値との比較つき）")
+    parser.add_argument("--dataset", nargs="+", choices=["real", "synthetic"], default=["real", "synthetic"])
+    parser.add_argument("--scale", choices=list(SCALES), default="small", help="合成データの規模")
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    parser.add_argument("--save", action="store_true", help="今回の結果を基準値として保存する")
+    parser.add_argument("--time-tolerance", type=float, default=TIME_TOLERANCE)
+    parser.add_argument("--memory-tolerance", type=float, default=MEMORY_TOLERANCE)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--output", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.repeat, args.output)
+        return
+
+    baselines = json.loads(BASELINE_PATH.read_text(encoding="utf-8")) if BASELINE_PATH.exists() else {}
+    regressions = []
+
+    for dataset in args.dataset:
+        if dataset == "real":
+            label, dataset_dir = "real", None
+        else:
+            label, dataset_dir = f"synthetic-{args.scale}", _synthetic_dir(args.scale)
+
+        current = _run_dataset(label, dataset_dir, args.repeat)
+        print(f"\n[{label}] {current['meta']}")
+        found = _compare(current, baselines.get(label), args.time_tolerance, args.memory_tolerance)
+        regressions.extend(f"{label} {r}" for r in found)
+
+        if args.save:
+            current["platform"] = f"{platform.python_implementation()} {platform.python_version()} {platform.machine()}"
+            baselines[label] = current
+
+    if args.save:
+        BASELINE_PATH.write_text(json.dumps(baselines, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+        print(f"\n基準値を保存しました: {BASELINE_PATH}")
+    elif regressions:
+        print("\n基準値より悪化した項目:")
+        for r in regressions:
+            print(f"  {r}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+ベンチマーク用の合成データ生成
+
+実データ（dataset/<machine>/YYYYMMDD.csv）と同じ列・同じ性質
+（5:00開始、経過秒数の合計が24時間、前後に電源断）のイベントを作る。
+"""
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+
+# 稼働中に出現するステータスと出現比率（実データの分布に近づけたもの）
+RUNNING_STATUSES: list = ["自動起動", "自動停止", "段取り", "パレチェン", "アラーム"]
+RUNNING_WEIGHTS: list = [0.41, 0.39, 0.13, 0.05, 0.02]
+
+DAY_SECONDS = 24 * 3600
+
+
+def make_day_events(n_events: int, target_date: date = date(2026, 1, 1), seed: int = 0) -> pd.DataFrame:
+    """n_events 行の1日分イベント（日時, ステータス, 経過秒数）"""
+    rng = np.random.default_rng(seed)
+    n_running = max(n_events - 2, 1)
+
+    # 前後の電源断を除いた稼働時間（16～20h）を n_running 個に分割する
+    running_seconds = int(rng.integers(16 * 3600, 20 * 3600))
+    cuts = np.sort(rng.choice(np.arange(1, running_seconds), n_running - 1, replace=False))
+    durations = np.diff(np.concatenate([[0], cuts, [running_seconds]]))
+
+    off_before = int(rng.integers(0, DAY_SECONDS - running_seconds))
+    off_after = DAY_SECONDS - running_seconds - off_before
+
+    statuses = np.concatenate([
+        ["電源断"],
+        rng.choice(RUNNING_STATUSES, n_running, p=RUNNING_WEIGHTS),
+        ["電源断"],
+    ])
+    seconds = np.concatenate([[off_before], durations, [off_after]]).astype("int64")
+
+    day_start = datetime.combine(target_date, datetime.min.time()) + timedelta(hours=5)
+    offsets = np.concatenate([[0], np.cumsum(seconds)[:-1]])
+
+    return pd.DataFrame({
+        "日時": pd.to_datetime(day_start) + pd.to_timedelta(offsets, unit="s"),
+        "ステータス": statuses,
+        "経過秒数": seconds,
+    })
+
+
+# ---------------------------
+# machining_completed（売上・担当者抽出の元DB）
+# ---------------------------
+OPERATORS: list = [f"{c}{n}" for c in "ABCDEFGH" for n in range(2)]
+
+SQL_CREATE_MACHINING = """
+CREATE TABLE IF NOT EXISTS machining_completed (
+    id INTEGER PRIMARY KEY,
+    unit_name TEXT,
+    timestamp TEXT,
+    operator_name TEXT,
+    revenue_total INTEGER
+)
+"""
+
+
+def make_machining_rows(
+    n_rows: int,
+    machines: list,
+    start_date: date,
+    days: int,
+    seed: int = 0,
+) -> pd.DataFrame:
+    """
+    machining_completed の合成行（unit_name, timestamp, operator_name, revenue_total）
+
+    機械×日×シフト（5:00～17:00 / 17:00～翌5:00）ごとに主担当を決め、
+    加工完了の8割はその主担当、残りはランダムな担当者にする。
+    """
+    rng = np.random.default_rng(seed)
+
+    machine_idx = rng.integers(0, len(machines), n_rows)
+    # 稼働日の開始（5:00）からの経過秒数
+    day_idx = rng.integers(0, days, n_rows)
+    offset = rng.integers(0, DAY_SECONDS, n_rows)
+    shift_idx = (offset >= 12 * 3600).astype("int64")
+
+    main_operator = rng.integers(0, len(OPERATORS), (len(machines), days, 2))
+    operator_idx = np.where(
+        rng.random(n_rows) < 0.8,
+        main_operator[machine_idx, day_idx, shift_idx],
+        rng.integers(0, len(OPERATORS), n_rows),
+    )
+
+    base = np.datetime64(start_date, "s") + np.timedelta64(5 * 3600, "s")
+    timestamps = base + (day_idx * DAY_SECONDS + offset).astype("timedelta64[s]")
+
+    return pd.DataFrame({
+        "unit_name": np.asarray(machines)[machine_idx],
+        "timestamp": np.datetime_as_string(timestamps).astype(object),
+        "operator_name": np.asarray(OPERATORS)[operator_idx],
+        "revenue_total": rng.integers(500, 8000, n_rows),
+    }).assign(timestamp=lambda d: d["timestamp"].str.replace("T", " ", regex=False))
+
+
+def write_machining_db(
+    db_path,
+    n_rows: int,
+    machines: list,
+    start_date: date,
+    days: int,
+    seed: int = 0,
+    chunk_rows: int = 500_000,
+):
+    """合成の machining_completed を db_path に作る（数百万行でもメモリに乗るよう分割して書く）"""
+    import sqlite3
+
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("PRAGMA journal_mode=OFF")
+        conn.execute("PRAGMA synchronous=OFF")
+        conn.execute(SQL_CREATE_MACHINING)
+        for i, first in enumerate(range(0, n_rows, chunk_rows)):
+            rows = make_machining_rows(min(chunk_rows, n_rows - first), machines, start_date, days, seed + i)
+            conn.executemany(
+                "INSERT INTO machining_completed (unit_name, timestamp, operator_name, revenue_total) "
+                "VALUES (?, ?, ?, ?)",
+                rows.itertuples(index=False, name=None),
+            )
+        conn.commit()
+
+
+# ---------------------------
+# dataset/ と同じ構成の合成データ（機械数×日数を指定）
+# ---------------------------
+def write_dataset(
+    root,
+    n_machines: int,
+    days: int,
+    start_date: date = date(2024, 1, 1),
+    events_range: tuple = (80, 300),
+    off_day_rate: float = 0.15,
+    seed: int = 0,
+) -> list:
+    """
+    root/<machine>/YYYYMMDD.csv と root/sales.db を作る。戻り値は機械名のリスト
+
+    休日（off_day_rate の割合）は実データと同じく電源断1行（86400秒）だけの日にする。
+    """
+    from pathlib import Path
+
+    from libs.sales_db import close_connections, upsert_daily_sales
+
+    root = Path(root)
+    rng = np.random.default_rng(seed)
+    machines = [f"SYN-{i + 1:03d}" for i in range(n_machines)]
+    sales_rows = []
+
+    for m_idx, machine in enumerate(machines):
+        machine_dir = root / machine
+        machine_dir.mkdir(parents=True, exist_ok=True)
+
+        for d in range(days):
+            target_date = start_date + timedelta(days=d)
+            day_start = datetime.combine(target_date, datetime.min.time()) + timedelta(hours=5)
+
+            if rng.random() < off_day_rate:
+                df = pd.DataFrame({"日時": [day_start], "ステータス": ["電源断"], "経過秒数": [DAY_SECONDS]})
+                sale = 0
+            else:
+                n_events = int(rng.integers(*events_range))
+                df = make_day_events(n_events, target_date, seed=seed + m_idx * 100_000 + d)
+                running = df.loc[df["ステータス"] == "自動起動", "経過秒数"].sum()
+                sale = int(running / 3600 * rng.integers(3000, 9000))
+
+            df.to_csv(
+                machine_dir / f"{target_date.strftime('%Y%m%d')}.csv",
+                index=False,
+                encoding="utf-8-sig",
+                date_format="%Y-%m-%d %H:%M:%S",
+            )
+            sales_rows.append((
+                machine,
+                target_date.strftime("%Y-%m-%d"),
+                sale,
+                str(rng.choice(OPERATORS)) if sale else "",
+                "",
+                str(rng.choice(OPERATORS)) if sale else "",
+                "",
+            ))
+
+    upsert_daily_sales(sales_rows, root / "sales.db")
+    close_connections()
+    return machines
@@ -0,0 +1,53 @@
+"""
+期間分析ページ（pages/analysis.py）のグラフ
+
+ページから切り出して、ベンチマーク等からも呼べるようにしたもの。
+"""
+from matplotlib.figure import Figure
+
+from libs.fonts import apply_style, default_report_style
+
+
+# -----------------------------
+# 円グラフ描画（指定仕様）
+# -----------------------------
+def draw_pie_chart(summary):
+
+    status_order = [
+        "自動起動",
+        "自動停止",
+        "段取り",
+        "アラーム",
+        "電源断"
+    ]
+
+    color_map = {
+        "電源断": "gray",
+        "アラーム": "red",
+        "段取り": "yellow",
+        "自動停止": "green",
+        "自動起動": "#1E90FF",
+    }
+
+    summary = summary.reindex(status_order, fill_value=0)
+
+    hours = summary / 3600
+
+    fig = Figure(figsize=(4.5, 4.5))
+    ax = fig.add_subplot()
+
+    ax.pie(
+        hours,
+        labels=hours.index,
+        colors=[color_map[s] for s in hours.index],
+        autopct="%1.1f%%",
+        startangle=90,
+        counterclock=False
+    )
+
+    ax.set_title("ステータス内訳（時間比率）", fontsize=12)
+
+    apply_style(fig, default_report_style())
+    fig.tight_layout()
+
+    return fig, summary
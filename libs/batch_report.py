@@ -0,0 +1,180 @@
+"""
+日次レポートの一括出力（ヘッドレス）
+
+全機械×全日の MachineDailyReport を PNG / PDF に書き出す。
+描画はプロセスプールで並列に行い（Agg バックエンド）、
+出力ファイルが元CSVより新しい日はスキップする。
+
+使い方:
+    python -m libs.batch_report --from 2026-01-01 --to 2026-06-30 --machines all --out reports/
+    python -m libs.batch_report --from 2026-05-01 --to 2026-05-31 --machines M1-1 M1-6 --format png pdf
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date, datetime
+from pathlib import Path
+
+from libs.event_store import list_machines, scan_sources, sync_machine
+from libs.rollup import refresh_rollup
+
+
+# --- 定数 ---
+DEFAULT_FORMATS: list = ["png"]
+DEFAULT_DPI = 100
+
+
+def _parse_date(value: str) -> date:
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+def output_path(out_dir: Path, machine_name: str, target_date: date, fmt: str) -> Path:
+    """出力先: <out>/<machine>/YYYYMMDD.<fmt>"""
+    return out_dir / machine_name / f"{target_date.strftime('%Y%m%d')}.{fmt}"
+
+
+def plan_tasks(
+    machines: list,
+    start_date: date,
+    end_date: date,
+    out_dir: Path,
+    formats: list,
+    force: bool = False,
+) -> tuple:
+    """
+    描画が必要な (machine, date) の一覧と、スキップ件数を返す
+
+    日付は機械ディレクトリの走査結果から決める（日ごとの存在確認はしない）。
+    """
+    tasks = []
+    skipped = 0
+
+    for machine in machines:
+        for files in scan_sources(machine).values():
+            for name, (mtime_ns, _size) in files.items():
+                target_date = datetime.strptime(name[:8], "%Y%m%d").date()
+                if not start_date <= target_date <= end_date:
+                    continue
+
+                if not force and all(
+                    (p := output_path(out_dir, machine, target_date, fmt)).exists()
+                    and p.stat().st_mtime_ns > mtime_ns
+                    for fmt in formats
+                ):
+                    skipped += 1
+                    continue
+
+                tasks.append((machine, target_date))
+
+    return sorted(tasks), skipped
+
+
+# ---------------------------
+# ワーカー（子プロセス）
+# ---------------------------
+def _init_worker():
+    import matplotlib
+    matplotlib.use("Agg")
+
+
+def _render_one(machine_name: str, target_date: date, out_dir: Path, formats: list, dpi: int) -> tuple:
+    """1機械1日分を描画して保存する。戻り値は (machine, date, 出力ファイル数)"""
+    from libs.daily_report import build_daily_report
+
+    report = build_daily_report(machine_name, target_date)
+    if report is None:
+        return machine_name, target_date, 0
+
+    fig = report.draw()
+    for fmt in formats:
+        path = output_path(out_dir, machine_name, target_date, fmt)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.stem}.{os.getpid()}.{fmt}")
+        fig.savefig(tmp, format=fmt, dpi=dpi)
+        os.replace(tmp, path)
+
+    return machine_name, target_date, len(formats)
+
+
+def run_batch(
+    machines: list,
+    start_date: date,
+    end_date: date,
+    out_dir: Path,
+    formats: list = DEFAULT_FORMATS,
+    workers: int = None,
+    dpi: int = DEFAULT_DPI,
+    force: bool = False,
+) -> dict:
+    """一括出力を実行し、件数の集計を返す"""
+    # イベントストア・ロールアップは親プロセスで一度だけ最新化する（子プロセス同士の書き込み競合を防ぐ）
+    # 一括処理のため、過去日のCSVの書き換えも全ファイルの stat で拾う
+    for machine in machines:
+        sync_machine(machine, full=True)
+    refresh_rollup(machines, full=True)
+
+    tasks, skipped = plan_tasks(machines, start_date, end_date, out_dir, formats, force)
+    rendered = 0
+    failed = []
+
+    if tasks:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+            futures = {
+                executor.submit(_render_one, machine, target_date, out_dir, formats, dpi): (machine, target_date)
+                for machine, target_date in tasks
+            }
+            for i, future in enumerate(as_completed(futures), start=1):
+                machine, target_date = futures[future]
+                try:
+                    _, _, n_files = future.result()
+                    rendered += 1 if n_files else 0
+                except Exception as e:
+                    failed.append((machine, target_date, repr(e)))
+                print(f"\r[{i}/{len(tasks)}] {machine} {target_date}", end="", flush=True)
+        print()
+
+    return {
+        "rendered": rendered,
+        "skipped": skipped,
+        "failed": failed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="日次レポートを一括でPNG/PDFに出力する")
+    parser.add_argument("--from", dest="start_date", type=_parse_date, required=True, help="開始日 YYYY-MM-DD")
+    parser.add_argument("--to", dest="end_date", type=_parse_date, required=True, help="終了日 YYYY-MM-DD")
+    parser.add_argument("--machines", nargs="+", default=["all"], help="機械名（all で全機械）")
+    parser.add_argument("--out", type=Path, default=Path("reports"), help="出力ディレクトリ")
+    parser.add_argument("--format", dest="formats", nargs="+", choices=["png", "pdf", "svg"], default=DEFAULT_FORMATS)
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="並列数（既定: CPUコア数）")
+    parser.add_argument("--dpi", type=int, default=DEFAULT_DPI)
+    parser.add_argument("--force", action="store_true", help="出力が新しくても再描画する")
+    args = parser.parse_args()
+
+    machines = list_machines() if args.machines == ["all"] else args.machines
+
+    t0 = time.perf_counter()
+    result = run_batch(
+        machines,
+        args.start_date,
+        args.end_date,
+        args.out,
+        formats=args.formats,
+        workers=args.workers,
+        dpi=args.dpi,
+        force=args.force,
+    )
+    elapsed = time.perf_counter() - t0
+
+    print(
+        f"✅ 出力: {result['rendered']} 件 / スキップ: {result['skipped']} 件 / "
+        f"失敗: {len(result['failed'])} 件 ({elapsed:.1f} 秒)"
+    )
+    for machine, target_date, error in result["failed"]:
+        print(f"❌ {machine} {target_date}: {error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+1機械1日分のレポート（MachineDailyReport）の組み立て
+
+日次ページとバッチ出力（libs.batch_report）で共通に使う。
+"""
+from datetime import date
+from typing import Optional
+
+from libs.event_store import load_day
+from libs.fonts import ReportStyle
+from libs.graph_blueprint import MachineDailyReport, ReportConfig
+from libs.rollup import DaySummary, get_day_summary
+from libs.sales_db import fetch_daily_sale
+
+
+def make_report_config(machine_name: str, target_date: date, day_summary: DaySummary, sale_row) -> ReportConfig:
+    """ロールアップの集計値と売上行から ReportConfig を作る"""
+    sales_amount, day_operator, day_multi, night_operator, night_multi = sale_row
+
+    return ReportConfig(
+        machine_name=f"{machine_name}",
+        report_date=target_date.strftime("%Y/%m/%d"),
+        sales_amount=sales_amount,
+        on_time=day_summary.power_on_time,
+        off_time=day_summary.power_off_time,
+        day_operator=day_operator,
+        day_multi=day_multi,
+        night_operator=night_operator,
+        night_multi=night_multi,
+    )
+
+
+def build_daily_report(
+    machine_name: str,
+    target_date: date,
+    style: Optional[ReportStyle] = None,
+) -> Optional[MachineDailyReport]:
+    """
+    ロールアップ・イベントストア・売上DBからレポートを組み立てる
+
+    ロールアップは呼び出し側で最新化しておくこと。データが無ければ None。
+    """
+    day_summary = get_day_summary(machine_name, target_date)
+    if day_summary is None:
+        return None
+
+    df = load_day(machine_name, target_date)
+    config = make_report_config(
+        machine_name,
+        target_date,
+        day_summary,
+        fetch_daily_sale(machine_name, target_date),
+    )
+    return MachineDailyReport(df, config, day_summary.status_seconds, style)
@@ -0,0 +1,68 @@
+"""
+ページ下部の処理時間パネル（libs.profiling の記録を表示する）
+
+環境変数 MACHINING_PROFILE=1 または URL の ?debug=1 のときだけ計測・表示する。
+"""
+import streamlit as st
+
+from libs import profiling
+
+
+def debug_enabled() -> bool:
+    return profiling.env_enabled() or st.query_params.get("debug") == "1"
+
+
+def start_profile(page: str):
+    """
+    有効なら計測を始める（戻り値は Profile または None）
+
+    st.stop() や st.switch_page() で終わった実行は finish されず、計測がスレッドに残る。
+    無効なときはそれを捨てて、以降の実行で記録・表示されないようにする。
+    """
+    if debug_enabled():
+        return profiling.start(page)
+    profiling.discard()
+    return None
+
+
+def show_debug_panel(params: dict = None):
+    """計測を終えてログに追記し、折りたたみパネルに表示する"""
+    profile = profiling.finish(params)
+    if profile is None:
+        return
+
+    import pandas as pd
+
+    with st.expander(f"🛠 処理時間（合計 {profile.total_seconds * 1000:,.0f} ms）", expanded=False):
+        stages = pd.DataFrame(
+            [
+                {
+                    "段階": profiling.STAGES.get(stage, stage),
+                    "回数": count,
+                    "時間(ms)": round(seconds * 1000, 1),
+                    "割合(%)": round(seconds / profile.total_seconds * 100, 1) if profile.total_seconds else 0,
+                }
+                for stage, (count, seconds) in profile.stages.items()
+            ],
+            columns=["段階", "回数", "時間(ms)", "割合(%)"],
+        )
+        st.dataframe(stages, hide_index=True, width="stretch")
+        st.caption("段階が入れ子の場合（集計の中のCSV読み込みなど）は外側の時間に内側も含む")
+
+        totals = profiling.cache_totals()
+        cache = pd.DataFrame(
+            [
+                {
+                    "キャッシュ": name,
+                    "ヒット": calls - misses,
+                    "ミス": misses,
+                    "累計ヒット率(%)": round(
+                        (totals[name][0] - totals[name][1]) / totals[name][0] * 100, 1
+                    ) if totals.get(name, (0,))[0] else None,
+                }
+                for name, (calls, misses) in profile.cache.items()
+            ],
+            columns=["キャッシュ", "ヒット", "ミス", "累計ヒット率(%)"],
+        )
+        st.dataframe(cache, hide_index=True, width="stretch")
+        st.caption(f"ログ: {profiling.PROFILE_LOG_PATH}")
@@ -0,0 +1,314 @@
+"""
+稼働イベントの列指向ストア
+
+dataset/<machine>/YYYYMMDD.csv を 機械×月 単位の Parquet に圧縮し、
+期間・列を絞って読み込むためのローダーを提供する。
+
+    cache/events/<machine>/<YYYY-MM>.parquet
+    cache/events/<machine>/_sources.json   # 圧縮元CSVの (mtime, size)
+
+使い方:
+    python -m libs.event_store                 # 全機械を圧縮
+    python -m libs.event_store --machines M1-1 M1-6
+"""
+import argparse
+import json
+import os
+from datetime import date, datetime
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from libs.manifest import get_manifest, list_machines, refresh_range  # list_machines は従来の import 元のため再公開
+from libs.settings import CACHE_DIR, DATASET_DIR
+from libs.status_csv import STATUS_DTYPE, read_status_csv
+
+
+# --- 定数 ---
+EVENT_STORE_DIR: Path = CACHE_DIR / "events"
+
+SOURCES_FILE_NAME = "_sources.json"
+
+EVENT_COLUMNS: list = ["日時", "ステータス", "経過秒数"]
+
+SCHEMA = pa.schema([
+    ("date", pa.date32()),
+    ("日時", pa.timestamp("s")),
+    ("ステータス", pa.dictionary(pa.int8(), pa.string())),
+    ("経過秒数", pa.int32()),
+])
+
+
+# ---------------------------
+# 元CSVの把握
+# ---------------------------
+def scan_sources(
+    machine: str,
+    dataset_dir: Path = DATASET_DIR,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    full: bool = False,
+) -> dict:
+    """
+    月ごとの元CSVを返す（日付マニフェストから作る）
+
+    {"2026-01": {"20260101.csv": [mtime_ns, size], ...}, ...}
+    過去日のCSVの書き換えは、start_date～end_date を指定すればその期間だけ、
+    full=True（CLI・一括処理）なら全ファイルを stat し直して拾う。
+    """
+    if full:
+        manifest = get_manifest(machine, dataset_dir, full=True)
+    elif start_date is not None:
+        manifest = refresh_range(machine, start_date, end_date, dataset_dir)
+    else:
+        manifest = get_manifest(machine, dataset_dir)
+    months: dict = {}
+
+    for d in manifest.dates:
+        entry = manifest.entries[d]
+        months.setdefault(d.strftime("%Y-%m"), {})[f"{d.strftime('%Y%m%d')}.csv"] = [entry.mtime_ns, entry.size]
+
+    return months
+
+
+def _month_keys(start_date: date, end_date: date) -> list:
+    """期間に含まれる YYYY-MM のリスト"""
+    return [
+        p.strftime("%Y-%m")
+        for p in pd.period_range(start_date, end_date, freq="M")
+    ]
+
+
+def _month_span(months: list) -> tuple:
+    """YYYY-MM のリストが覆う (初日, 末日)"""
+    return (
+        pd.Period(min(months), freq="M").start_time.date(),
+        pd.Period(max(months), freq="M").end_time.date(),
+    )
+
+
+# ---------------------------
+# 圧縮（インジェスト）
+# ---------------------------
+def _partition_path(machine: str, month: str, store_dir: Path) -> Path:
+    return store_dir / machine / f"{month}.parquet"
+
+
+def _load_recorded_sources(machine: str, store_dir: Path) -> dict:
+    path = store_dir / machine / SOURCES_FILE_NAME
+    if not path.exists():
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save_recorded_sources(machine: str, recorded: dict, store_dir: Path):
+    path = store_dir / machine / SOURCES_FILE_NAME
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(recorded, f, ensure_ascii=False, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def _build_partition(machine: str, month: str, files: dict, dataset_dir: Path, store_dir: Path):
+    """1か月分のCSVを読み込み、Parquet 1ファイルに書き出す"""
+    frames = []
+    for name in sorted(files):
+        df = read_status_csv(dataset_dir / machine / name)
+        df.insert(0, "date", datetime.strptime(name[:8], "%Y%m%d").date())
+        frames.append(df)
+
+    df = pd.concat(frames, ignore_index=True)
+    table = pa.Table.from_pandas(df[SCHEMA.names], schema=SCHEMA, preserve_index=False)
+
+    path = _partition_path(machine, month, store_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    pq.write_table(table, tmp, compression="zstd")
+    os.replace(tmp, path)
+
+
+def sync_machine(
+    machine: str,
+    months: Optional[list] = None,
+    dataset_dir: Path = DATASET_DIR,
+    store_dir: Path = EVENT_STORE_DIR,
+    full: bool = False,
+) -> list:
+    """
+    元CSVと記録済みの (mtime, size) を比較し、変化した月だけ再圧縮する
+
+    months を指定した場合はその月だけを対象にし、その月のCSVだけを stat し直す。
+    full=True なら全ファイルを stat し直す（scan_sources）。
+    戻り値は再圧縮した月のリスト。
+    """
+    if months and not full:
+        sources = scan_sources(machine, dataset_dir, *_month_span(months))
+    else:
+        sources = scan_sources(machine, dataset_dir, full=full)
+    recorded = _load_recorded_sources(machine, store_dir)
+    targets = months if months is not None else sorted(set(sources) | set(recorded))
+
+    rebuilt = []
+    for month in targets:
+        files = sources.get(month, {})
+        if recorded.get(month) == files:
+            continue
+
+        if files:
+            _build_partition(machine, month, files, dataset_dir, store_dir)
+            recorded[month] = files
+        else:
+            # 元CSVが消えた月はパーティションも削除
+            _partition_path(machine, month, store_dir).unlink(missing_ok=True)
+            recorded.pop(month, None)
+        rebuilt.append(month)
+
+    if rebuilt:
+        _save_recorded_sources(machine, recorded, store_dir)
+
+    return rebuilt
+
+
+def sync_store(
+    machines: Optional[list] = None,
+    dataset_dir: Path = DATASET_DIR,
+    store_dir: Path = EVENT_STORE_DIR,
+    full: bool = False,
+) -> dict:
+    """全機械（または指定機械）のストアを最新化する"""
+    if machines is None:
+        machines = list_machines(dataset_dir)
+
+    return {
+        machine: sync_machine(machine, dataset_dir=dataset_dir, store_dir=store_dir, full=full)
+        for machine in machines
+    }
+
+
+# ---------------------------
+# 読み込み
+# ---------------------------
+def _read_columns(columns: Optional[list]) -> list:
+    columns = list(columns) if columns is not None else EVENT_COLUMNS
+    return ["date"] + [c for c in columns if c != "date"]
+
+
+def _iter_tables(
+    machines: list,
+    start_date: date,
+    end_date: date,
+    read_columns: list,
+    dataset_dir: Path,
+    store_dir: Path,
+):
+    """
+    対象月のパーティションだけを開き（パーティション剪定）、指定列だけを読む（列剪定）。
+    読み込み前に対象月の鮮度を確認し、古ければその場で再圧縮する。
+    yield (machine, pyarrow.Table)
+    """
+    months = _month_keys(start_date, end_date)
+    filters = [("date", ">=", start_date), ("date", "<=", end_date)]
+
+    for machine in machines:
+        sync_machine(machine, months, dataset_dir, store_dir)
+
+        for month in months:
+            path = _partition_path(machine, month, store_dir)
+            if not path.exists():
+                continue
+
+            table = pq.read_table(path, columns=read_columns, filters=filters)
+            if table.num_rows == 0:
+                continue
+            yield machine, table
+
+
+def _to_frame(table: pa.Table) -> pd.DataFrame:
+    df = table.to_pandas()
+    df["date"] = pd.to_datetime(df["date"])
+    if "ステータス" in df:
+        df["ステータス"] = df["ステータス"].cat.set_categories(STATUS_DTYPE.categories)
+    return df
+
+
+def load_events(
+    machines: list,
+    start_date: date,
+    end_date: date,
+    columns: Optional[list] = None,
+    dataset_dir: Path = DATASET_DIR,
+    store_dir: Path = EVENT_STORE_DIR,
+) -> pd.DataFrame:
+    """
+    期間内の稼働イベントを1つの DataFrame に読み込む
+
+    行数は 期間×機械数 に比例するため、集計だけなら iter_event_batches を使う。
+    """
+    read_columns = _read_columns(columns)
+
+    tables = [
+        table.append_column("machine", pa.array([machine] * table.num_rows, pa.string()))
+        for machine, table in _iter_tables(machines, start_date, end_date, read_columns, dataset_dir, store_dir)
+    ]
+    if not tables:
+        return pd.DataFrame(columns=["machine"] + read_columns)
+
+    df = _to_frame(pa.concat_tables(tables))
+    df = df[["machine"] + read_columns]
+    df["machine"] = df["machine"].astype("category")
+    return df
+
+
+def iter_event_batches(
+    machines: list,
+    start_date: date,
+    end_date: date,
+    columns: Optional[list] = None,
+    dataset_dir: Path = DATASET_DIR,
+    store_dir: Path = EVENT_STORE_DIR,
+):
+    """
+    期間内の稼働イベントを 機械×月 のパーティションごとに返す（連結しない）
+
+    yield (machine, DataFrame[date, columns...])。集計側で順に足し込めば、
+    メモリは期間・機械数によらず1パーティション分で済む。
+    """
+    read_columns = _read_columns(columns)
+    for machine, table in _iter_tables(machines, start_date, end_date, read_columns, dataset_dir, store_dir):
+        yield machine, _to_frame(table)
+
+
+def load_day(
+    machine: str,
+    target_date: date,
+    dataset_dir: Path = DATASET_DIR,
+    store_dir: Path = EVENT_STORE_DIR,
+) -> Optional[pd.DataFrame]:
+    """1機械1日分のイベント（日時, ステータス, 経過秒数）。データが無ければ None"""
+    df = load_events(
+        [machine], target_date, target_date,
+        dataset_dir=dataset_dir, store_dir=store_dir,
+    )
+    if df.empty:
+        return None
+    return df[EVENT_COLUMNS].reset_index(drop=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="稼働CSVを機械×月のParquetに圧縮する")
+    parser.add_argument("--machines", nargs="*", default=None, help="対象機械（省略時は全機械）")
+    args = parser.parse_args()
+
+    # 手動の実行では過去日のCSVの書き換えも拾う
+    result = sync_store(args.machines, full=True)
+
+    for machine, months in result.items():
+        print(f"{machine} -> 再圧縮: {', '.join(months) if months else 'なし'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+機械×日 のヒートマップと稼働推移
+
+日次ロールアップの 機械×日 の実稼働秒数（NumPy 2次元配列）から
+稼働率・遊休率を求め、Altair のヒートマップ（セルのクリックで選択）と
+機械ごとの推移（7日移動平均）を作る。
+"""
+import altair as alt
+import numpy as np
+import pandas as pd
+
+from libs.graph_blueprint import ReportConfig
+
+
+# --- 定数 ---
+DAY_SECONDS = 24 * 3600
+
+## 日次レポートと同じ基準稼働時間（h）
+BASE_WORK_HOURS: float = ReportConfig.base_work_hours
+
+METRICS: dict = {
+    "稼働率": "24時間のうち電源断以外の割合（%）",
+    "遊休率": f"基準稼働時間 {BASE_WORK_HOURS}h に対する未稼働の割合（%）",
+}
+
+## 推移の移動平均日数
+TREND_WINDOW = 7
+
+SELECTION_NAME = "cell"
+
+
+def metric_matrix(seconds: np.ndarray, metric: str) -> np.ndarray:
+    """実稼働秒数の行列を 稼働率 / 遊休率（%）に変換する（NaN はそのまま）"""
+    if metric == "遊休率":
+        return (BASE_WORK_HOURS - seconds / 3600) / BASE_WORK_HOURS * 100
+    return seconds / DAY_SECONDS * 100
+
+
+def to_long(machines: list, dates: np.ndarray, values: np.ndarray) -> pd.DataFrame:
+    """行列を (machine, date, day, value) の縦持ちにする（データの無いセルは除く）"""
+    mi, di = np.nonzero(~np.isnan(values))
+    return pd.DataFrame({
+        "machine": np.asarray(machines, dtype=object)[mi],
+        "date": dates[di].astype("datetime64[ns]"),
+        # 選択結果の受け渡し用（ブラウザのタイムゾーンに影響されない文字列）
+        "day": np.datetime_as_string(dates[di]),
+        "value": values[mi, di].round(1),
+    })
+
+
+def build_heatmap(machines: list, dates: np.ndarray, values: np.ndarray, metric: str) -> alt.Chart:
+    """機械×日 のヒートマップ（セルをクリックすると選択される）"""
+    data = to_long(machines, dates, values)
+    cell = alt.selection_point(name=SELECTION_NAME, fields=["machine", "day"], on="click")
+
+    return (
+        alt.Chart(data)
+        .mark_rect()
+        .encode(
+            x=alt.X("yearmonthdate(date):T", title=None, axis=alt.Axis(format="%m/%d", labelOverlap=True)),
+            y=alt.Y("machine:N", title=None, sort=list(machines)),
+            color=alt.Color(
+                "value:Q",
+                title=f"{metric}(%)",
+                # 良い方を緑にする（遊休率は低いほど良い）
+                scale=alt.Scale(scheme="redyellowgreen", reverse=metric == "遊休率"),
+            ),
+            opacity=alt.condition(cell, alt.value(1.0), alt.value(0.35)),
+            tooltip=[
+                alt.Tooltip("machine:N", title="機械"),
+                alt.Tooltip("yearmonthdate(date):T", title="日付", format="%Y/%m/%d"),
+                alt.Tooltip("value:Q", title=f"{metric}(%)"),
+            ],
+        )
+        .add_params(cell)
+        .properties(height=max(24 * len(machines), 120))
+    )
+
+
+def trend_frame(machines: list, dates: np.ndarray, values: np.ndarray, window: int = TREND_WINDOW) -> pd.DataFrame:
+    """機械ごとの移動平均（index 日付、列 機械）。データの無い日は平均から除く"""
+    frame = pd.DataFrame(values.T, index=pd.DatetimeIndex(dates, name="日付"), columns=list(machines))
+    return frame.rolling(window, min_periods=1).mean().round(1)
+
+
+def selected_cell(event) -> tuple:
+    """st.altair_chart の選択イベントから (機械, 日付) を取り出す（未選択なら (None, None)）"""
+    points = (event or {}).get("selection", {}).get(SELECTION_NAME) or []
+    if not points:
+        return None, None
+    point = points[0]
+    return point.get("machine"), pd.Timestamp(point["day"]).date()
@@ -0,0 +1,87 @@
+"""
+日本語フォントの解決と描画スタイル
+
+フォント一覧の走査・同梱フォント（fonts/ipaexg.ttf）の登録はプロセスで1回だけ行う。
+レポート描画はグローバルな plt.rcParams を書き換えず、ReportStyle を
+Figure 内の Text に直接適用する（複数レポートを並行して描画できるようにするため）。
+rcParams の既定フォントも、最初に図を作るときにプロセスで1回だけ設定する
+（app.py の起動時に matplotlib を読み込まないため）。
+"""
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+import matplotlib.font_manager as fm
+from matplotlib.table import Table
+from matplotlib.text import Text
+
+from libs.settings import BASE_DIR
+
+
+# --- 定数 ---
+FONT_PATH: Path = BASE_DIR / "fonts" / "ipaexg.ttf"
+
+FONT_CANDIDATES: list = [
+    "Yu Gothic", "Meiryo", "MS Gothic",
+    "Hiragino Sans", "IPAexGothic", "sans-serif",
+]
+
+
+@dataclass(frozen=True)
+class ReportStyle:
+    font_family: str = "sans-serif"
+
+
+@lru_cache(maxsize=None)
+def register_bundled_font() -> Optional[str]:
+    """同梱フォントを fontManager に登録してフォント名を返す（無ければ None）"""
+    if not FONT_PATH.exists():
+        return None
+
+    fm.fontManager.addfont(str(FONT_PATH))
+    return fm.FontProperties(fname=str(FONT_PATH)).get_name()
+
+
+@lru_cache(maxsize=None)
+def resolve_font_family() -> str:
+    """候補の中から利用可能な最初のフォント名（フォント一覧の走査は1回だけ）"""
+    register_bundled_font()
+    available = {f.name for f in fm.fontManager.ttflist}
+
+    for font in FONT_CANDIDATES:
+        if font in available:
+            return font
+    return "sans-serif"
+
+
+@lru_cache(maxsize=None)
+def configure_matplotlib() -> Optional[str]:
+    """rcParams の既定フォントを同梱フォントにする（プロセスで1回だけ）"""
+    import matplotlib
+
+    font_name = register_bundled_font()
+    if font_name is not None:
+        matplotlib.rcParams["font.family"] = font_name
+        matplotlib.rcParams["axes.unicode_minus"] = False
+        print(f"✅ フォント読み込み成功: {font_name}")
+    else:
+        print("❌ フォントが見つかりません")
+    return font_name
+
+
+@lru_cache(maxsize=None)
+def default_report_style() -> ReportStyle:
+    configure_matplotlib()
+    return ReportStyle(font_family=resolve_font_family())
+
+
+def apply_style(fig, style: ReportStyle):
+    """Figure 内の全 Text にフォントを設定する（rcParams は変更しない）"""
+    for text in fig.findobj(Text):
+        text.set_fontfamily(style.font_family)
+
+    # テーブルのセル文字は findobj で辿れないため個別に設定する
+    for table in fig.findobj(Table):
+        for cell in table.get_celld().values():
+            cell.get_text().set_fontfamily(style.font_family)
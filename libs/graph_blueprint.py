@@ -1,10 +1,16 @@
 import pandas as pd
-import matplotlib.pyplot as plt
 import numpy as np
-import matplotlib.font_manager as fm
+from matplotlib.collections import LineCollection
+from matplotlib.figure import Figure
+from matplotlib.lines import Line2D
+from matplotlib.patches import Rectangle
 from dataclasses import dataclass
 from typing import Optional
 
+from libs.fonts import ReportStyle, apply_style, default_report_style
+from libs.status_csv import STATUS_LIST
+from libs.timeline import Timeline
+
 
 @dataclass
 class ReportConfig:
@@ -35,37 +41,31 @@ class ReportConfig:
 
 
 class MachineDailyReport:
-    def __init__(self, df: pd.DataFrame, config: ReportConfig):
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        config: ReportConfig,
+        summary: Optional[pd.Series] = None,
+        style: Optional[ReportStyle] = None,
+    ):
         # slice対策（超重要）
         self.df = df.copy()
         self.config = config
+        # ロールアップ済みのステータス別秒数があれば再集計しない
+        self._precomputed_summary = summary
+        # フォントはプロセスで1回だけ解決したものを使う（rcParamsは変更しない）
+        self.style = style if style is not None else default_report_style()
 
-        self._setup_font()
         self._prepare_dataframe()
         self._aggregate()
 
-    # --- フォント設定 ---
-    def _setup_font(self):
-        font_candidates = [
-            "Yu Gothic", "Meiryo", "MS Gothic",
-            "Hiragino Sans", "IPAexGothic", "sans-serif",
-        ]
-
-        font_name = "sans-serif"
-        for font in font_candidates:
-            if font in [f.name for f in fm.fontManager.ttflist]:
-                font_name = font
-                break
-
-        plt.rcParams["font.family"] = font_name
-        plt.rcParams["axes.unicode_minus"] = False
-
     # --- DataFrame前処理 ---
     def _prepare_dataframe(self):
-        self.df["duration_h"] = self.df["経過秒数"] / 3600
-        self.df["start_h"] = (
-            self.df["duration_h"].cumsum().shift(1).fillna(0)
-        )
+        # 区間の位置は各行の日時から求める（途中から始まる日・すき間のある日も正しい位置に描く）
+        self.timeline = Timeline.from_events(self.df, start_hour=self.config.start_hour)
+
+        self.df["duration_h"] = self.timeline.duration / 3600
+        self.df["start_h"] = self.timeline.start / 3600
 
         self.df["Color"] = self.df["ステータス"].map(
             lambda x: self.config.color_map.get(x, "purple")
@@ -74,9 +74,10 @@ class MachineDailyReport:
     # --- 集計処理 ---
     def _aggregate(self):
         # ステータス別合計（秒）
-        self.summary = (
-            self.df.groupby("ステータス")["経過秒数"].sum()
-        )
+        if self._precomputed_summary is not None:
+            self.summary = self._precomputed_summary.copy()
+        else:
+            self.summary = self.timeline.status_seconds()
 
         # --- 電源断以外の合計時間（h） ---
         self.real_work_time = sum(
@@ -123,13 +124,15 @@ class MachineDailyReport:
         return self.summary.get(status, 0) / 3600
 
     # --- 描画メソッド ---
+    # pyplot のグローバル状態を使わず Figure を直接組み立てる
     def draw(self):
         # ================================
         # ★ 稼働ゼロチェック（最重要）
         # ================================
         if self.real_work_time <= 0:
-            fig = plt.figure(figsize=(10, 4))
-            plt.text(
+            fig = Figure(figsize=(10, 4))
+            ax = fig.add_subplot()
+            ax.text(
                 0.5,
                 0.5,
                 "機械が稼働していません。",
@@ -138,11 +141,12 @@ class MachineDailyReport:
                 fontsize=24,
                 color="red",
             )
-            plt.axis("off")
+            ax.axis("off")
+            apply_style(fig, self.style)
             return fig
 
         # ===== 通常描画 =====
-        fig = plt.figure(figsize=(16, 10))
+        fig = Figure(figsize=(16, 10))
         fig.suptitle(
             f"{self.config.machine_name}　{self.config.report_date}",
             fontsize=26,
@@ -153,11 +157,12 @@ class MachineDailyReport:
         gs = fig.add_gridspec(2, 2, height_ratios=[0.4, 2.0])
 
         self._draw_gantt(fig, gs)
-        self._draw_pie(gs)
-        self._draw_table_and_text(gs)
+        self._draw_pie(fig, gs)
+        self._draw_table_and_text(fig, gs)
 
-        plt.tight_layout(rect=[0, 0, 1, 0.96])
-        # plt.show()
+        # レイアウト計算の前にフォントを確定させる
+        apply_style(fig, self.style)
+        fig.tight_layout(rect=[0, 0, 1, 0.96])
         return fig
 
     # --- ガントチャート ---
@@ -165,13 +170,15 @@ class MachineDailyReport:
         ax = fig.add_subplot(gs[0, :])
 
         # --- ガント本体 ---
-        for _, row in self.df.iterrows():
-            ax.barh(
-                y=0,
-                left=row["start_h"],
-                width=row["duration_h"],
-                color=row["Color"],
-                height=0.6,
+        # 連続する同一ステータスをまとめた区間を、ステータスごとに broken_barh 1回（= PolyCollection 1個）で描く
+        merged = self.timeline.merged()
+        for code in pd.unique(merged.code):
+            part = merged.where(merged.code == code)
+            ax.broken_barh(
+                np.column_stack([part.start / 3600, part.duration / 3600]),
+                (-0.3, 0.6),
+                facecolors=self.config.color_map.get(STATUS_LIST[code], "purple"),
+                linewidth=0,
             )
 
         # --- X軸設定 ---
@@ -206,14 +213,14 @@ class MachineDailyReport:
 
         # --- 凡例 ---
         handles = [
-            plt.Rectangle((0, 0), 1, 1, fc=c)
+            Rectangle((0, 0), 1, 1, fc=c)
             for c in self.config.color_map.values()
         ]
         labels = list(self.config.color_map.keys())
 
         # 8:30ライン用の凡例を追加
         handles.append(
-            plt.Line2D([0], [0], color="orange", linewidth=3)
+            Line2D([0], [0], color="orange", linewidth=3)
         )
         labels.append("8:30")
 
@@ -228,23 +235,33 @@ class MachineDailyReport:
         # =================================================
         # ★ パレチェンの縦ライン（黒）
         # =================================================
-        pallet_df = self.df[self.df["ステータス"] == "パレチェン"]
-
-        for _, row in pallet_df.iterrows():
-            ax.axvline(
-                x=row["start_h"],
-                ymin=0.0,   # 下端（0=最下部）
-                ymax=0.5,   # 上端（0.5=真ん中まで）
-                color="black",
-                linewidth=1,
-                linestyle="-",
-                alpha=0.8,
-                zorder=5,
+        pallet_x = self.timeline.start[self.timeline.code == STATUS_LIST.index("パレチェン")] / 3600
+
+        if len(pallet_x):
+            # x はデータ座標、y は軸座標（0=最下部 ～ 0.5=真ん中）で LineCollection 1個にまとめる
+            segments = np.stack(
+                [
+                    np.column_stack([pallet_x, np.zeros_like(pallet_x)]),
+                    np.column_stack([pallet_x, np.full_like(pallet_x, 0.5)]),
+                ],
+                axis=1,
+            )
+            ax.add_collection(
+                LineCollection(
+                    segments,
+                    colors="black",
+                    linewidths=1,
+                    linestyles="-",
+                    alpha=0.8,
+                    zorder=5,
+                    transform=ax.get_xaxis_transform(),
+                ),
+                autolim=False,
             )
 
     # --- 円グラフ ---
-    def _draw_pie(self, gs):
-        ax = plt.subplot(gs[1, 0])
+    def _draw_pie(self, fig, gs):
+        ax = fig.add_subplot(gs[1, 0])
 
         labels = ["自動起動", "自動停止", "段取り", "アラーム"]
         values = [self._get_hours(l) for l in labels]
@@ -262,11 +279,11 @@ class MachineDailyReport:
         ax.legend(labels, loc="upper right")
 
     # --- テーブル + KPI ---
-    def _draw_table_and_text(self, gs):
+    def _draw_table_and_text(self, fig, gs):
         sub = gs[1, 1].subgridspec(2, 1, height_ratios=[1.1, 0.9])
 
         # --- テーブル ---
-        ax_t = plt.subplot(sub[0])
+        ax_t = fig.add_subplot(sub[0])
         ax_t.axis("off")
 
         rows = []
@@ -295,7 +312,7 @@ class MachineDailyReport:
             table.get_celld()[(0, col)].get_text().set_weight("bold")
 
         # --- KPI ---
-        ax_k = plt.subplot(sub[1])
+        ax_k = fig.add_subplot(sub[1])
         ax_k.axis("off")
 
         # 左右の配置基準位置
@@ -0,0 +1,151 @@
+"""
+インタラクティブなガントチャート（Plotly）
+
+MachineDailyReport の前処理済みデータから、クライアントに送る区間を
+サーバー側で圧縮してから描画する。
+
+- 連続する同一ステータスの区間を1つにまとめる（ランレングス）
+- 表示解像度で1ピクセル未満の短い区間は直前の区間に吸収する
+- パレチェンは区間ではなくマーカー（1トレース）として送る
+- 全体 / 日勤 / 夜勤 のズームボタンを付ける（シフトの境目は config.toml の [shift]）
+"""
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from libs.graph_blueprint import MachineDailyReport
+from libs.shifts import shift_bounds
+from libs.status_csv import STATUS_LIST
+
+
+# --- 定数 ---
+## 区間の最小幅を決める表示解像度（シフトへのズームを考慮して横幅の2倍程度）
+DEFAULT_RESOLUTION_PX = 3200
+
+PALLET_STATUS = "パレチェン"
+PALLET_CODE = STATUS_LIST.index(PALLET_STATUS)
+
+
+def shift_ranges(start_hour: int, config: Optional[dict] = None) -> tuple:
+    """
+    日勤・夜勤のズーム範囲 ([開始, 終了], [開始, 終了])
+
+    横軸はレポートの開始時刻（start_hour 時）からの経過時間。既定の設定では ([0, 12], [12, 24])。
+    """
+    day_start, boundary = shift_bounds(config)
+    offset = (day_start / 3600 - start_hour) % 24
+    day_end = offset + boundary / 3600
+    # 夜勤は翌稼働日の開始までだが、横軸（24時間）の右端で切る
+    return [offset, day_end], [day_end, 24.0]
+
+
+def compress_intervals(report: MachineDailyReport, resolution_px: int = DEFAULT_RESOLUTION_PX) -> pd.DataFrame:
+    """
+    ガント用の区間 (start_h, duration_h, status) を圧縮して返す
+
+    パレチェンは区間から除き（直前の区間に含める）、マーカーとして別に扱う。
+    """
+    timeline = report.timeline
+    bars = timeline.where(timeline.code != PALLET_CODE)
+
+    start = bars.start / 3600
+    status = bars.code
+    if len(start) == 0:
+        return pd.DataFrame(columns=["start_h", "duration_h", "status"])
+    end = np.append(start[1:], timeline.end[-1] / 3600)
+
+    # 1ピクセル未満の区間は直前の区間に吸収（先頭は残す）
+    min_width = 24 / resolution_px
+    keep = (end - start) >= min_width
+    keep[0] = True
+    start, status = start[keep], status[keep]
+
+    # 連続する同一ステータスをまとめる
+    changed = np.ones(len(status), dtype=bool)
+    changed[1:] = status[1:] != status[:-1]
+    start, status = start[changed], status[changed]
+
+    total_end = end[-1]
+    duration = np.append(start[1:], total_end) - start
+
+    return pd.DataFrame({
+        "start_h": start.astype("float32"),
+        "duration_h": duration.astype("float32"),
+        "status": np.asarray(STATUS_LIST, dtype=object)[status],
+    })
+
+
+def build_gantt_figure(report: MachineDailyReport, resolution_px: int = DEFAULT_RESOLUTION_PX) -> go.Figure:
+    """ステータスごとに1トレースの横棒 + パレチェンのマーカー1トレース"""
+    config = report.config
+    intervals = compress_intervals(report, resolution_px)
+
+    fig = go.Figure()
+
+    # 色の無いステータス（不明など）も静止画と同じく紫で描く
+    for status in STATUS_LIST:
+        if status == PALLET_STATUS:
+            continue
+        color = config.color_map.get(status, "purple")
+        part = intervals[intervals["status"] == status]
+        if part.empty:
+            continue
+        fig.add_trace(go.Bar(
+            name=status,
+            orientation="h",
+            base=part["start_h"].to_numpy(),
+            x=part["duration_h"].to_numpy(),
+            y=np.zeros(len(part), dtype="int8"),
+            marker=dict(color=color, line=dict(width=0)),
+            hovertemplate=f"{status}<br>%{{x:.2f}} h<extra></extra>",
+            width=0.6,
+        ))
+
+    timeline = report.timeline
+    pallet_x = (timeline.start[timeline.code == PALLET_CODE] / 3600).astype("float32")
+    if len(pallet_x):
+        fig.add_trace(go.Scatter(
+            name=PALLET_STATUS,
+            x=pallet_x,
+            y=np.full(len(pallet_x), -0.15, dtype="float32"),
+            mode="markers",
+            marker=dict(symbol="line-ns", size=14, line=dict(width=1, color=config.color_map[PALLET_STATUS])),
+            hoverinfo="skip",
+        ))
+
+    day_range, night_range = shift_ranges(config.start_hour)
+
+    # 8:30 の縦ライン
+    fig.add_vline(x=(8.5 - config.start_hour) % 24, line=dict(color="orange", width=3))
+
+    ticks = list(range(0, 25, 2))
+    fig.update_layout(
+        barmode="overlay",
+        height=260,
+        margin=dict(l=10, r=10, t=40, b=10),
+        title=f"{config.machine_name}　{config.report_date}　24時間稼働状況",
+        xaxis=dict(
+            range=[0, 24],
+            tickvals=ticks,
+            ticktext=[f"{(config.start_hour + t) % 24:02d}:00" for t in ticks],
+            showgrid=True,
+            griddash="dash",
+        ),
+        yaxis=dict(visible=False, range=[-0.5, 0.5], fixedrange=True),
+        legend=dict(title="ステータス"),
+        updatemenus=[dict(
+            type="buttons",
+            direction="right",
+            x=0,
+            y=1.25,
+            xanchor="left",
+            buttons=[
+                dict(label="全体", method="relayout", args=[{"xaxis.range": [0, 24]}]),
+                dict(label="日勤", method="relayout", args=[{"xaxis.range": day_range}]),
+                dict(label="夜勤", method="relayout", args=[{"xaxis.range": night_range}]),
+            ],
+        )],
+    )
+    return fig
@@ -0,0 +1,135 @@
+"""
+当日CSVの追記分だけを読むリーダー（tail -f 相当）
+
+ファイルごとに読み込み済みのバイト位置を覚えておき、
+呼ばれるたびに追記された行だけを解析してステータス別秒数・電源オン/オフ時刻を
+逐次更新する。ファイルが短くなった（置き換えられた）場合は最初から読み直す。
+解析できない行（書きかけ・壊れた行）は読み飛ばして bad_rows に数える。
+"""
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
+
+from libs.statuses import STATUS_LIST, UNKNOWN_STATUS
+
+## pandas は旧形式の日時と summary() でだけ読み込む（当日稼働ページの起動を軽くするため）
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+BOM = b"\xef\xbb\xbf"
+
+
+def _parse_timestamp(value: str) -> datetime:
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        # "2026/3/7 5:00" 等の旧形式
+        import pandas as pd
+
+        return pd.to_datetime(value).to_pydatetime()
+
+
+class StatusTail:
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.offset = 0
+        self._partial = b""
+        self._header_done = False
+        self._prev_status = None
+
+        self.status_seconds = {s: 0 for s in STATUS_LIST}
+        self.power_on_time: Optional[datetime] = None
+        self.power_off_time: Optional[datetime] = None
+        self.last_timestamp: Optional[datetime] = None
+        self.last_status: Optional[str] = None
+        self.rows = 0
+        self.bad_rows = 0
+
+    # --- 追記分の読み込み ---
+    def poll(self) -> int:
+        """追記された行を読み込んで集計に反映する。戻り値は新しく読んだ行数"""
+        with self._lock:
+            try:
+                size = self.path.stat().st_size
+            except FileNotFoundError:
+                return 0
+
+            if size < self.offset:
+                # ファイルが置き換えられた
+                self._reset()
+            if size == self.offset:
+                return 0
+
+            with open(self.path, "rb") as f:
+                f.seek(self.offset)
+                chunk = f.read(size - self.offset)
+            self.offset += len(chunk)
+
+            data = self._partial + chunk
+            # 改行で終わっていない最後の行は次回に持ち越す
+            complete, sep, self._partial = data.rpartition(b"\n")
+            if not sep:
+                self._partial = data
+                return 0
+
+            lines = complete.split(b"\n")
+            if not self._header_done:
+                lines = lines[1:]
+                self._header_done = True
+
+            n = 0
+            for line in lines:
+                line = line.strip().removeprefix(BOM)
+                if not line:
+                    continue
+                # 1行の解析に失敗しても、同じチャンクの残りの行は反映する
+                try:
+                    parsed = self._parse(line)
+                except (ValueError, UnicodeDecodeError):
+                    self.bad_rows += 1
+                    continue
+                self._apply(*parsed)
+                n += 1
+            return n
+
+    def _parse(self, line: bytes) -> tuple:
+        """1行を (日時, ステータス, 経過秒数) にする（解析できなければ ValueError）"""
+        timestamp, status, seconds = line.decode("utf-8").split(",")[:3]
+        if status not in self.status_seconds:
+            status = UNKNOWN_STATUS
+        return _parse_timestamp(timestamp), status, int(seconds)
+
+    def _apply(self, timestamp: datetime, status: str, seconds: int):
+        self.status_seconds[status] += seconds
+
+        # 電源オン: 最初の「電源断 → 電源断以外」
+        if self.power_on_time is None and status != "電源断" and self._prev_status == "電源断":
+            self.power_on_time = timestamp
+        # 電源オフ: 最後の「電源断以外 → 電源断」（先頭行が電源断の場合も含む）
+        if status == "電源断" and self._prev_status != "電源断":
+            self.power_off_time = timestamp
+
+        self._prev_status = status
+        self.last_timestamp = timestamp
+        self.last_status = status
+        self.rows += 1
+
+    # --- 集計値 ---
+    @property
+    def real_work_time(self) -> float:
+        """電源断以外の合計時間（h）"""
+        return sum(v for s, v in self.status_seconds.items() if s != "電源断") / 3600
+
+    def summary(self) -> "pd.Series":
+        """ステータス別秒数（0のステータスは除く）"""
+        import pandas as pd
+
+        summary = pd.Series(self.status_seconds, dtype="int64", name="経過秒数")
+        summary.index.name = "ステータス"
+        return summary[summary > 0]
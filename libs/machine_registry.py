@@ -0,0 +1,116 @@
+"""
+機械の一覧とメタデータ（レジストリ）
+
+dataset/ の機械ディレクトリと sales.db の売上テーブルから機械を見つけ、
+機械ごとのデータの期間・ファイル数・シフト設定をまとめて返す。
+期間・ファイル数は日付マニフェスト（libs.manifest）から取り、
+sales.db は mtime が変わったときだけ読み直す（毎回の確認は stat 数回で済む）。
+"""
+import os
+import threading
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Optional
+
+from libs.manifest import get_manifest, list_machines
+from libs.profiling import span
+from libs.sales_db import fetch_sales_machines
+from libs.settings import DATASET_DIR, SALES_DB_PATH, load_config
+
+
+@dataclass(frozen=True)
+class MachineInfo:
+    name: str
+    first_date: Optional[date]  # CSVの最初の日（CSVが無ければ None）
+    last_date: Optional[date]
+    file_count: int
+    has_sales: bool
+    shift_start: dict  # {"hour", "mitute", "second"}
+    day_end: dict
+
+    @property
+    def has_data(self) -> bool:
+        return self.file_count > 0
+
+
+# --- プロセス内キャッシュ ---
+_lock = threading.Lock()
+## {str(sales_db_path): (mtime_ns, 機械名のset)}
+_sales_cache: dict = {}
+
+
+def _mtime_ns(path) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def _dataset_machines(dataset_dir: Path) -> dict:
+    """{機械名: (first, last, count)}"""
+    if not dataset_dir.is_dir():
+        return {}
+
+    result = {}
+    for name in list_machines(dataset_dir):
+        manifest = get_manifest(name, dataset_dir)
+        result[name] = (manifest.first_date, manifest.last_date, len(manifest.dates))
+    return result
+
+
+def _sales_machines(sales_db_path: Path) -> set:
+    mtime_ns = _mtime_ns(sales_db_path)
+    if mtime_ns is None:
+        return set()
+
+    cached = _sales_cache.get(str(sales_db_path))
+    if cached is None or cached[0] != mtime_ns:
+        cached = (mtime_ns, set(fetch_sales_machines(sales_db_path)))
+        _sales_cache[str(sales_db_path)] = cached
+    return cached[1]
+
+
+@span("discovery")
+def get_registry(dataset_dir: Path = DATASET_DIR, sales_db_path: Path = SALES_DB_PATH) -> dict:
+    """{機械名: MachineInfo}（機械名順）"""
+    config = load_config()
+
+    dataset = _dataset_machines(Path(dataset_dir))
+    with _lock:
+        sales = _sales_machines(Path(sales_db_path))
+
+    return {
+        name: MachineInfo(
+            name=name,
+            first_date=dataset.get(name, (None, None, 0))[0],
+            last_date=dataset.get(name, (None, None, 0))[1],
+            file_count=dataset.get(name, (None, None, 0))[2],
+            has_sales=name in sales,
+            shift_start=config["shift_start"],
+            day_end=config["day_end"],
+        )
+        for name in sorted(set(dataset) | sales)
+    }
+
+
+def list_machine_names(dataset_dir: Path = DATASET_DIR, sales_db_path: Path = SALES_DB_PATH) -> list:
+    """稼働データか売上データのある機械名"""
+    return list(get_registry(dataset_dir, sales_db_path))
+
+
+def date_bounds(machines: list, registry: dict) -> tuple:
+    """指定機械のデータがある期間 (最初の日, 最後の日)。データが無ければ (None, None)"""
+    infos = [registry[m] for m in machines if m in registry and registry[m].has_data]
+    if not infos:
+        return None, None
+    return min(i.first_date for i in infos), max(i.last_date for i in infos)
+
+
+if __name__ == "__main__":
+    for info in get_registry().values():
+        print(
+            f"{info.name:<10} {info.file_count:>5} 件  "
+            f"{info.first_date or '-'} ～ {info.last_date or '-'}  "
+            f"売上: {'あり' if info.has_sales else 'なし'}"
+        )
@@ -0,0 +1,302 @@
+"""
+機械ごとの日付マニフェスト（どの日のCSVがあるか）
+
+機械ディレクトリを1回だけ走査して、日付順のリストと
+ファイルごとの (サイズ, mtime, 行数, 内容ハッシュ) を cache/manifest/<machine>.json に保存する。
+以降はディレクトリの mtime が変わったときだけ走査し直し、
+変わっていなければ最終日のファイル（当日分は追記されるため）だけ stat する。
+期間の問い合わせは日付リストの二分探索で答えるため、日ごとの存在確認は不要になる。
+
+過去日のCSVをその場で書き換えてもディレクトリの mtime は変わらないため、
+ページからの鮮度の確認（ロールアップ・イベントストア・集計結果キャッシュ）では
+refresh_range() で読む期間のファイルだけ stat し直す。
+full=True はディレクトリを1回走査して全ファイルを stat し、(サイズ, mtime) の
+変わったファイルだけ読み直す（CLI・一括処理用。変化が無ければ保存もしない）。
+
+使い方:
+    python -m libs.manifest                  # 全機械を更新
+    python -m libs.manifest --machines M1-1 --full
+"""
+import argparse
+import bisect
+import hashlib
+import json
+import os
+import re
+import threading
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+from libs.profiling import span
+from libs.settings import CACHE_DIR, DATASET_DIR
+
+
+# --- 定数 ---
+MANIFEST_DIR: Path = CACHE_DIR / "manifest"
+
+CSV_NAME_PATTERN = re.compile(r"^(\d{8})\.csv$")
+
+## 保存形式を変えたら上げる
+MANIFEST_VERSION = 1
+
+
+class FileEntry(NamedTuple):
+    size: int
+    mtime_ns: int
+    rows: int  # ヘッダーを除いた行数
+    sha1: str
+
+
+@dataclass
+class Manifest:
+    machine: str
+    dir_mtime_ns: Optional[int] = None
+    entries: dict = field(default_factory=dict)  # {date: FileEntry}
+    dates: list = field(default_factory=list)  # entries のキーを日付順に並べたもの
+
+    def _sort(self):
+        self.dates = sorted(self.entries)
+
+    # --- 問い合わせ ---
+    def has(self, target_date: date) -> bool:
+        return target_date in self.entries
+
+    def dates_in_range(self, start_date: date, end_date: date) -> list:
+        """期間内でCSVのある日（日付順）"""
+        lo = bisect.bisect_left(self.dates, start_date)
+        hi = bisect.bisect_right(self.dates, end_date)
+        return self.dates[lo:hi]
+
+    def missing_dates(self, start_date: date, end_date: date) -> list:
+        """期間内でCSVの無い日"""
+        present = set(self.dates_in_range(start_date, end_date))
+        days = (end_date - start_date).days + 1
+        return [
+            d for d in (start_date + timedelta(days=i) for i in range(max(days, 0)))
+            if d not in present
+        ]
+
+    def nearest(self, target_date: date) -> tuple:
+        """target_date の直前・直後のCSVのある日（無ければ None）"""
+        i = bisect.bisect_left(self.dates, target_date)
+        before = self.dates[i - 1] if i > 0 else None
+        j = bisect.bisect_right(self.dates, target_date)
+        after = self.dates[j] if j < len(self.dates) else None
+        return before, after
+
+    @property
+    def first_date(self) -> Optional[date]:
+        return self.dates[0] if self.dates else None
+
+    @property
+    def last_date(self) -> Optional[date]:
+        return self.dates[-1] if self.dates else None
+
+    # --- 保存形式 ---
+    def to_json(self) -> dict:
+        return {
+            "version": MANIFEST_VERSION,
+            "dir_mtime_ns": self.dir_mtime_ns,
+            "files": {d.strftime("%Y%m%d"): list(e) for d, e in self.entries.items()},
+        }
+
+    @classmethod
+    def from_json(cls, machine: str, raw: dict) -> "Manifest":
+        if raw.get("version") != MANIFEST_VERSION:
+            return cls(machine)
+        manifest = cls(
+            machine,
+            raw["dir_mtime_ns"],
+            {
+                datetime.strptime(ymd, "%Y%m%d").date(): FileEntry(*values)
+                for ymd, values in raw["files"].items()
+            },
+        )
+        manifest._sort()
+        return manifest
+
+
+def list_machines(dataset_dir: Path = DATASET_DIR) -> list:
+    """dataset/ 直下の機械ディレクトリ名を返す"""
+    return sorted(
+        entry.name
+        for entry in os.scandir(dataset_dir)
+        if entry.is_dir() and not entry.name.startswith((".", "_"))
+    )
+
+
+# --- プロセス内キャッシュ ---
+_lock = threading.Lock()
+_manifests: dict = {}  # {(dataset_dir, machine): Manifest}
+
+
+def _manifest_path(machine: str, manifest_dir: Path) -> Path:
+    return manifest_dir / f"{machine}.json"
+
+
+def _load(machine: str, manifest_dir: Path) -> Manifest:
+    try:
+        with open(_manifest_path(machine, manifest_dir), encoding="utf-8") as f:
+            return Manifest.from_json(machine, json.load(f))
+    except (FileNotFoundError, ValueError, KeyError, TypeError):
+        return Manifest(machine)
+
+
+def _save(manifest: Manifest, manifest_dir: Path):
+    path = _manifest_path(manifest.machine, manifest_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest.to_json(), f)
+    os.replace(tmp, path)
+
+
+def _describe(path: str, st: os.stat_result) -> FileEntry:
+    """1ファイルを読んで行数とハッシュを求める"""
+    with open(path, "rb") as f:
+        data = f.read()
+    lines = data.count(b"\n") + (0 if data.endswith(b"\n") or not data else 1)
+    return FileEntry(st.st_size, st.st_mtime_ns, max(lines - 1, 0), hashlib.sha1(data).hexdigest())
+
+
+def _refresh_entry(manifest: Manifest, machine_dir: Path, target_date: date) -> bool:
+    """1日分だけ stat して、変わっていれば記録し直す。戻り値は変更の有無"""
+    path = machine_dir / f"{target_date.strftime('%Y%m%d')}.csv"
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        manifest.entries.pop(target_date, None)
+        manifest._sort()
+        return True
+
+    entry = manifest.entries.get(target_date)
+    if entry is not None and (entry.size, entry.mtime_ns) == (st.st_size, st.st_mtime_ns):
+        return False
+    manifest.entries[target_date] = _describe(str(path), st)
+    return True
+
+
+def _rescan(manifest: Manifest, machine_dir: Path, dir_mtime_ns: int) -> bool:
+    """
+    ディレクトリを1回走査し、追加・変更・削除されたファイルだけ記録し直す。戻り値は変更の有無
+
+    鮮度の確認のたびに呼ばれるため、entries は作り直さずに変わった日だけ書き換える。
+    """
+    changed = manifest.dir_mtime_ns != dir_mtime_ns
+    found = set()
+    for entry in os.scandir(machine_dir):
+        m = CSV_NAME_PATTERN.match(entry.name)
+        if not m:
+            continue
+        ymd = m.group(1)
+        target_date = date(int(ymd[:4]), int(ymd[4:6]), int(ymd[6:]))  # strptime より速い（全ファイルを回るため）
+        st = entry.stat()
+        found.add(target_date)
+        old = manifest.entries.get(target_date)
+        if old is None or (old.size, old.mtime_ns) != (st.st_size, st.st_mtime_ns):
+            manifest.entries[target_date] = _describe(entry.path, st)
+            changed = True
+
+    # 消えたファイル
+    for target_date in manifest.entries.keys() - found:
+        del manifest.entries[target_date]
+        changed = True
+
+    manifest.dir_mtime_ns = dir_mtime_ns
+    if changed:
+        manifest._sort()
+    return changed
+
+
+@span("discovery")
+def get_manifest(
+    machine: str,
+    dataset_dir: Path = DATASET_DIR,
+    manifest_dir: Path = MANIFEST_DIR,
+    full: bool = False,
+) -> Manifest:
+    """
+    最新化した機械のマニフェストを返す
+
+    full=True ならディレクトリの mtime に関係なく全ファイルを stat し、過去日の書き換えも検出する。
+    """
+    machine_dir = Path(dataset_dir) / machine
+    key = (str(dataset_dir), machine)
+
+    with _lock:
+        manifest = _manifests.get(key)
+        if manifest is None:
+            manifest = _load(machine, manifest_dir)
+            _manifests[key] = manifest
+
+        try:
+            dir_mtime_ns = os.stat(machine_dir).st_mtime_ns
+        except FileNotFoundError:
+            manifest.entries.clear()
+            manifest.dates = []
+            manifest.dir_mtime_ns = None
+            return manifest
+
+        if full or manifest.dir_mtime_ns != dir_mtime_ns:
+            if _rescan(manifest, machine_dir, dir_mtime_ns):
+                _save(manifest, manifest_dir)
+        elif manifest.dates and _refresh_entry(manifest, machine_dir, manifest.dates[-1]):
+            # 当日分（最終日）は追記されてもディレクトリの mtime が変わらない
+            _save(manifest, manifest_dir)
+
+        return manifest
+
+
+def refresh_range(
+    machine: str,
+    start_date: date,
+    end_date: date,
+    dataset_dir: Path = DATASET_DIR,
+    manifest_dir: Path = MANIFEST_DIR,
+) -> Manifest:
+    """期間内のCSVだけを stat し直したマニフェスト（期間内の過去日の書き換えを検出する）"""
+    manifest = get_manifest(machine, dataset_dir, manifest_dir)
+    machine_dir = os.path.join(dataset_dir, machine)
+
+    with _lock:
+        changed = False
+        for d in manifest.dates_in_range(start_date, end_date):
+            # 期間の日数だけ回るため、Path・strftime を使わずにパスを作る
+            path = os.path.join(machine_dir, f"{d.year:04d}{d.month:02d}{d.day:02d}.csv")
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                del manifest.entries[d]
+                changed = True
+                continue
+            entry = manifest.entries[d]
+            if (entry.size, entry.mtime_ns) != (st.st_size, st.st_mtime_ns):
+                manifest.entries[d] = _describe(path, st)
+                changed = True
+
+        if changed:
+            manifest._sort()
+            _save(manifest, manifest_dir)
+
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="機械ごとの日付マニフェストを更新する")
+    parser.add_argument("--machines", nargs="+", help="対象の機械（省略時は全機械）")
+    parser.add_argument("--full", action="store_true", help="ディレクトリの mtime に関係なく全ファイルを確認する")
+    args = parser.parse_args()
+
+    for machine in args.machines or list_machines():
+        manifest = get_manifest(machine, full=args.full)
+        rows = sum(e.rows for e in manifest.entries.values())
+        print(
+            f"{machine:<10} {len(manifest.dates):>5} 日  {rows:>9,} 行  "
+            f"{manifest.first_date or '-'} ～ {manifest.last_date or '-'}"
+        )
+
+
+if __name__ == "__main__":
+    main()
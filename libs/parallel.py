@@ -0,0 +1,60 @@
+"""
+ファイル単位の処理の並列実行
+
+スレッドプール（I/O 待ちが主）・プロセスプール（解析が主）・逐次を切り替えて
+func(item) を実行し、結果は items と同じ順序で返す（完了順に依存しない）。
+items は CHUNK_SIZE 件ずつ取り出して実行するため、items をジェネレーターで渡し、
+受け取った側が結果を処理してから次へ進めば、手元に残る件数は全体の件数によらず一定になる。
+プロセスプールでは func は import できるモジュールの関数にし、
+戻り値は小さな集計値にする（DataFrame を返すと受け渡しのコストが大きい）。
+"""
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import islice
+from typing import Callable, Iterable, Iterator
+
+from libs.settings import EXECUTORS, LOAD_EXECUTOR, LOAD_WORKERS  # EXECUTORS は従来の import 元のため再公開
+
+
+# --- 定数 ---
+## プロセスプールで1回に渡す件数（受け渡しの回数を減らす）
+PROCESS_CHUNKSIZE = 32
+
+## iter_ordered が一度に実行する件数（未処理の結果を溜めすぎないため）
+CHUNK_SIZE = 64
+
+
+def iter_ordered(
+    func: Callable,
+    items: Iterable,
+    executor: str = LOAD_EXECUTOR,
+    max_workers: int = LOAD_WORKERS,
+) -> Iterator:
+    """func(item) を並列に実行し、items と同じ順序で結果を1件ずつ返す"""
+    # 綴り違いなどをスレッドプールとして黙って実行しない（ジェネレーターのため最初の next() で送出）
+    if executor not in EXECUTORS:
+        raise ValueError(
+            f"並列方式 {executor!r} は使えません（{' / '.join(EXECUTORS)} のいずれか。"
+            "環境変数 MACHINING_LOAD_EXECUTOR を確認してください）"
+        )
+
+    items = iter(items)
+    chunk = list(islice(items, CHUNK_SIZE))
+
+    # 1件だけ・ワーカー1つならプールを作らない（差分更新はほとんどがこの場合）
+    if executor == "serial" or max_workers <= 1 or len(chunk) <= 1:
+        yield from map(func, chunk)
+        yield from map(func, items)
+        return
+
+    if executor == "process":
+        pool = ProcessPoolExecutor(max_workers=max_workers)
+        options = {"chunksize": PROCESS_CHUNKSIZE}
+    else:
+        pool = ThreadPoolExecutor(max_workers=max_workers)
+        options = {}
+
+    # プールは1回だけ作り、CHUNK_SIZE 件ずつ実行する
+    with pool:
+        while chunk:
+            yield from pool.map(func, chunk, **options)
+            chunk = list(islice(items, CHUNK_SIZE))
@@ -0,0 +1,133 @@
+"""
+期間分析の結果（analysis.py の表示内容一式）
+
+結果全体を (機械の集合, 期間, データのバージョン) をキーに ResultCache に保存する。
+いちばん重いシフト別明細は 機械×月 の部分結果に分けて保存し、
+別の期間（例: 1か月 ⊂ 四半期）の分析でも同じ月の部分結果を使い回す。
+"""
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from libs.result_cache import ResultCache, get_result_cache, sales_version, source_version
+from libs.rollup import query_daily_matrix, query_status_seconds, refresh_rollup
+from libs.sales_db import fetch_fleet_comparison, fetch_operator_ranking, fetch_total_sales
+from libs.shifts import query_shift_detail, shift_bounds
+
+
+@dataclass
+class PeriodResult:
+    machines: list
+    start_date: date
+    end_date: date
+    status_seconds: pd.Series
+    total_sales: int
+    fleet: pd.DataFrame
+    operators: pd.DataFrame
+    dates: np.ndarray  # 日付（datetime64[D]）
+    daily_seconds: np.ndarray  # 機械×日 の実稼働秒数
+    shift_detail: pd.DataFrame
+
+
+def month_segments(start_date: date, end_date: date) -> list:
+    """期間を月ごとに区切った (開始日, 終了日) のリスト（両端の月は期間で切る）"""
+    segments = []
+    current = start_date
+    while current <= end_date:
+        next_month = (current.replace(day=1) + timedelta(days=32)).replace(day=1)
+        segments.append((current, min(end_date, next_month - timedelta(days=1))))
+        current = next_month
+    return segments
+
+
+def cached_shift_detail(
+    machines: list,
+    start_date: date,
+    end_date: date,
+    cache: Optional[ResultCache] = None,
+    verify: bool = True,
+) -> pd.DataFrame:
+    """
+    シフト別明細を 機械×月 の部分結果から組み立てる
+
+    キャッシュに無い部分だけをまとめて1回で集計し、部分ごとに保存する。
+    verify=False は期間の元CSVを確認した直後用（source_version を参照）。
+    """
+    cache = cache or get_result_cache()
+    sales_v = sales_version()
+    bounds = shift_bounds()
+
+    parts = {}
+    missing = []
+    for machine in machines:
+        for seg_start, seg_end in month_segments(start_date, end_date):
+            key = (
+                "shift_detail", machine, seg_start, seg_end,
+                source_version(machine, seg_start, seg_end, verify=verify), sales_v, bounds,
+            )
+            value = cache.get(key)
+            if value is None:
+                missing.append((machine, seg_start, seg_end, key))
+            else:
+                parts[(machine, seg_start)] = value
+
+    if missing:
+        detail = query_shift_detail(
+            sorted({m for m, *_ in missing}),
+            min(s for _, s, _, _ in missing),
+            max(e for _, _, e, _ in missing),
+        )
+        for machine, seg_start, seg_end, key in missing:
+            part = detail[
+                (detail["machine"] == machine)
+                & (detail["date"] >= pd.Timestamp(seg_start))
+                & (detail["date"] <= pd.Timestamp(seg_end))
+            ].reset_index(drop=True)
+            cache.put(key, part)
+            parts[(machine, seg_start)] = part
+
+    frames = [parts[k] for k in sorted(parts) if not parts[k].empty]
+    if not frames:
+        return query_shift_detail([], start_date, end_date)
+    return pd.concat(frames, ignore_index=True)
+
+
+def analyze_period(
+    machines: list,
+    start_date: date,
+    end_date: date,
+    cache: Optional[ResultCache] = None,
+) -> PeriodResult:
+    """期間分析の結果一式（データが変わっていなければキャッシュから返す）"""
+    cache = cache or get_result_cache()
+    machines = sorted(set(machines))
+
+    version = (
+        tuple(source_version(m, start_date, end_date) for m in machines),
+        sales_version(),
+        shift_bounds(),
+    )
+
+    def compute() -> PeriodResult:
+        # 新しく届いたCSVだけを集計してから、集計済みの行を合算する
+        # （期間内の過去日の書き換えは上の version で stat し直したマニフェストに反映済み）
+        refresh_rollup(machines)
+        dates, daily_seconds = query_daily_matrix(machines, start_date, end_date)
+        return PeriodResult(
+            machines=machines,
+            start_date=start_date,
+            end_date=end_date,
+            status_seconds=query_status_seconds(machines, start_date, end_date),
+            total_sales=fetch_total_sales(machines, start_date, end_date),
+            fleet=fetch_fleet_comparison(machines, start_date, end_date),
+            operators=fetch_operator_ranking(machines, start_date, end_date),
+            dates=dates,
+            daily_seconds=daily_seconds,
+            # 期間の元CSVは上の version で確認済み
+            shift_detail=cached_shift_detail(machines, start_date, end_date, cache, verify=False),
+        )
+
+    return cache.get_or_compute(("period", tuple(machines), start_date, end_date, version), compute)
@@ -0,0 +1,182 @@
+"""
+処理時間の計測（オプトイン）
+
+有効にしたページの実行ごとに、段階（ファイル探索・CSV読み込み・売上クエリ・集計・
+図の作成・表示）別の時間と、キャッシュのヒット/ミス数を記録する。
+
+- 記録は実行中のスレッド（Streamlit ではセッションごとのスクリプト実行）に紐づく。
+  start() していないスレッドでは span() も count_cache() も何もしない
+- 同じ段階の入れ子（get_registry → get_manifest など）は外側だけを計測する
+- finish() で cache/profile.jsonl に1行追記する（JSON Lines）
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import wraps
+from pathlib import Path
+from typing import Callable, Optional
+
+from libs.settings import CACHE_DIR
+
+
+# --- 定数 ---
+PROFILE_LOG_PATH: Path = CACHE_DIR / "profile.jsonl"
+
+## 環境変数で全ページの計測を有効にする（ページでは URL の ?debug=1 でも有効）
+PROFILE_ENV = "MACHINING_PROFILE"
+
+## 段階の表示名
+STAGES: dict = {
+    "discovery": "ファイル探索",
+    "csv_parse": "CSV読み込み",
+    "sales_query": "売上クエリ",
+    "aggregate": "集計",
+    "figure": "図の作成",
+    "render": "表示（シリアライズ）",
+}
+
+
+@dataclass
+class Profile:
+    page: str
+    started_at: datetime = field(default_factory=datetime.now)
+    started: float = field(default_factory=time.perf_counter)
+    total_seconds: Optional[float] = None
+    stages: dict = field(default_factory=dict)  # {段階: [回数, 秒]}
+    cache: dict = field(default_factory=dict)  # {キャッシュ名: [呼び出し, ミス]}
+    active: set = field(default_factory=set)  # 計測中の段階（入れ子の二重計上を防ぐ）
+
+    def add(self, stage: str, seconds: float):
+        entry = self.stages.setdefault(stage, [0, 0.0])
+        entry[0] += 1
+        entry[1] += seconds
+
+    def to_record(self, params: Optional[dict] = None) -> dict:
+        return {
+            "time": self.started_at.isoformat(timespec="seconds"),
+            "page": self.page,
+            "pid": os.getpid(),
+            "params": params or {},
+            "total_seconds": round(self.total_seconds or 0.0, 6),
+            "stages": {
+                stage: {"count": count, "seconds": round(seconds, 6)}
+                for stage, (count, seconds) in self.stages.items()
+            },
+            "cache": {
+                name: {"calls": calls, "hits": calls - misses, "misses": misses}
+                for name, (calls, misses) in self.cache.items()
+            },
+        }
+
+
+# --- スレッドごとの記録・プロセス全体のキャッシュ集計 ---
+_local = threading.local()
+_lock = threading.Lock()
+_cache_totals: dict = {}  # {キャッシュ名: [呼び出し, ミス]}
+
+
+def env_enabled() -> bool:
+    return os.environ.get(PROFILE_ENV, "") not in ("", "0")
+
+
+def current() -> Optional[Profile]:
+    return getattr(_local, "profile", None)
+
+
+def start(page: str) -> Profile:
+    """このスレッドでの計測を始める"""
+    _local.profile = Profile(page)
+    return _local.profile
+
+
+def discard():
+    """このスレッドの計測を記録せずに捨てる"""
+    _local.profile = None
+
+
+def finish(params: Optional[dict] = None, log_path: Path = PROFILE_LOG_PATH) -> Optional[Profile]:
+    """計測を終えてログに追記する（start() していなければ None）"""
+    profile = current()
+    if profile is None:
+        return None
+    _local.profile = None
+    profile.total_seconds = time.perf_counter() - profile.started
+
+    line = json.dumps(profile.to_record(params), ensure_ascii=False, default=str)
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    with _lock, open(log_path, "a", encoding="utf-8") as f:
+        f.write(line + "\n")
+    return profile
+
+
+@contextmanager
+def span(stage: str):
+    """with span("csv_parse"): ... の区間の時間を段階ごとに合計する"""
+    profile = current()
+    if profile is None or stage in profile.active:
+        yield
+        return
+
+    profile.active.add(stage)
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.active.discard(stage)
+        profile.add(stage, time.perf_counter() - t0)
+
+
+def count_cache(name: str, hit: bool):
+    """キャッシュの参照1回分を記録する（プロセス全体の累計は計測の有無に関係なく数える）"""
+    with _lock:
+        totals = _cache_totals.setdefault(name, [0, 0])
+        totals[0] += 1
+        totals[1] += not hit
+
+    profile = current()
+    if profile is not None:
+        entry = profile.cache.setdefault(name, [0, 0])
+        entry[0] += 1
+        entry[1] += not hit
+
+
+def cache_totals() -> dict:
+    """プロセス起動からの {キャッシュ名: (呼び出し, ミス)}"""
+    with _lock:
+        return {name: tuple(v) for name, v in _cache_totals.items()}
+
+
+def counted_cache(cache_decorator: Callable, name: Optional[str] = None) -> Callable:
+    """
+    st.cache_data / st.cache_resource にヒット/ミスの計数を付ける
+
+        @counted_cache(st.cache_data(ttl=3600))
+        def get_sale(...): ...
+
+    関数本体が実行されたらミス、されなければヒットとして数える。
+    """
+    def decorate(func: Callable) -> Callable:
+        label = name or func.__name__
+
+        @wraps(func)
+        def compute(*args, **kwargs):
+            _local.cache_miss = True
+            return func(*args, **kwargs)
+
+        cached = cache_decorator(compute)
+
+        @wraps(func)
+        def call(*args, **kwargs):
+            _local.cache_miss = False
+            value = cached(*args, **kwargs)
+            count_cache(label, hit=not _local.cache_miss)
+            return value
+
+        call.clear = cached.clear
+        return call
+
+    return decorate
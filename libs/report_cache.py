@@ -0,0 +1,128 @@
+"""
+描画済みレポート画像のディスクキャッシュ
+
+キーは (機械, 日付, 元CSVの mtime/size, 売上行のバージョン, 形式) で、
+値は描画済みの PNG / SVG バイト列。cache/reports/ に置くため
+アプリの再起動後も有効で、複数の Streamlit ワーカープロセスから共有できる。
+合計サイズが上限を超えたら、最後に参照された時刻が古いものから削除する（LRU）。
+"""
+import hashlib
+import io
+import os
+from datetime import date
+from pathlib import Path
+from typing import Callable, Optional
+
+from libs.profiling import count_cache, span
+from libs.settings import CACHE_DIR, DATASET_DIR
+
+
+# --- 定数 ---
+REPORT_CACHE_DIR: Path = CACHE_DIR / "reports"
+
+## 合計サイズの上限（バイト）
+MAX_CACHE_BYTES = 256 * 1024 * 1024
+
+## 描画内容を変えたら上げる（古いキャッシュを無効化するため）
+RENDER_VERSION = 2
+
+## st.pyplot と同じ出力設定
+SAVEFIG_OPTIONS: dict = {"bbox_inches": "tight", "dpi": 200}
+
+
+def sales_row_version(sale_row) -> str:
+    """売上行（売上・担当者・マルチ）の内容から作るバージョン"""
+    return hashlib.sha1(repr(tuple(sale_row)).encode("utf-8")).hexdigest()[:12]
+
+
+def cache_key(machine_name: str, target_date: date, source_stat, sales_version: str, fmt: str) -> str:
+    raw = "|".join([
+        str(RENDER_VERSION),
+        machine_name,
+        target_date.strftime("%Y-%m-%d"),
+        str(source_stat.st_mtime_ns),
+        str(source_stat.st_size),
+        sales_version,
+        fmt,
+    ])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _cache_path(key: str, fmt: str, cache_dir: Path) -> Path:
+    return cache_dir / key[:2] / f"{key}.{fmt}"
+
+
+def evict(cache_dir: Path = REPORT_CACHE_DIR, max_bytes: int = MAX_CACHE_BYTES) -> int:
+    """合計サイズが上限以下になるまで、参照の古いファイルから削除する。戻り値は削除数"""
+    entries = []
+    for sub in cache_dir.glob("*/"):
+        for entry in os.scandir(sub):
+            if entry.is_file() and not entry.name.startswith("."):
+                st = entry.stat()
+                entries.append((st.st_mtime_ns, st.st_size, entry.path))
+
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            # 他プロセスが先に削除した
+            pass
+        total -= size
+        removed += 1
+
+    return removed
+
+
+@span("render")
+def render_to_bytes(fig, fmt: str) -> bytes:
+    buf = io.BytesIO()
+    fig.savefig(buf, format=fmt, **SAVEFIG_OPTIONS)
+    return buf.getvalue()
+
+
+def get_report_image(
+    machine_name: str,
+    target_date: date,
+    sale_row,
+    render: Callable,
+    fmt: str = "png",
+    dataset_dir: Path = DATASET_DIR,
+    cache_dir: Path = REPORT_CACHE_DIR,
+    max_bytes: int = MAX_CACHE_BYTES,
+) -> Optional[bytes]:
+    """
+    レポート画像のバイト列を返す（キャッシュに無ければ render() の Figure を描画して保存）
+
+    元CSVが無ければ None。
+    """
+    source = dataset_dir / machine_name / f"{target_date.strftime('%Y%m%d')}.csv"
+    try:
+        source_stat = source.stat()
+    except FileNotFoundError:
+        return None
+
+    key = cache_key(machine_name, target_date, source_stat, sales_row_version(sale_row), fmt)
+    path = _cache_path(key, fmt, cache_dir)
+
+    try:
+        data = path.read_bytes()
+        # 参照時刻を更新（LRU の順序に使う）
+        os.utime(path)
+        count_cache("report_image", hit=True)
+        return data
+    except FileNotFoundError:
+        count_cache("report_image", hit=False)
+
+    data = render_to_bytes(render(), fmt)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{key}.{os.getpid()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+    evict(cache_dir, max_bytes)
+    return data
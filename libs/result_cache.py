@@ -0,0 +1,204 @@
+"""
+集計結果のキャッシュ（メモリ + ディスク）
+
+キーは呼び出し側が作るタプル（対象・期間・データのバージョン）で、
+値は pickle できる任意の集計結果。
+- メモリ上は合計サイズの上限つき LRU（古いものから捨てる）
+- 書き込み時にディスク（cache/results/）にも保存し、再起動後や
+  メモリから追い出された後はディスクから読み戻す。ディスクも合計サイズで LRU 削除する
+
+データのバージョンは、日付マニフェストの内容ハッシュと sales.db の (mtime, size) から作る。
+マニフェストは期間内のファイルを stat し直してから使う（過去日のCSVの書き換えも反映する）。
+ディスクの結果が壊れていて読めない場合はファイルを消してミスとして扱う。
+"""
+import hashlib
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from datetime import date
+from pathlib import Path
+from typing import Callable
+
+from libs.manifest import get_manifest, refresh_range
+from libs.profiling import count_cache
+from libs.report_cache import evict
+from libs.settings import CACHE_DIR, DATASET_DIR, SALES_DB_PATH
+
+
+# --- 定数 ---
+RESULT_CACHE_DIR: Path = CACHE_DIR / "results"
+
+## メモリ・ディスクそれぞれの合計サイズの上限（バイト）
+MAX_MEMORY_BYTES = 64 * 1024 * 1024
+MAX_DISK_BYTES = 512 * 1024 * 1024
+
+## 集計方法を変えたら上げる（古いキャッシュを無効化するため）
+RESULT_VERSION = 1
+
+## 壊れた・読めない pickle で起きる例外（途中で切れたファイル、モジュール構成の変更など）
+UNREADABLE_ERRORS = (
+    pickle.UnpicklingError, EOFError, AttributeError, ImportError, IndexError, TypeError, ValueError,
+)
+
+
+# ---------------------------
+# データのバージョン
+# ---------------------------
+def source_version(
+    machine: str,
+    start_date: date,
+    end_date: date,
+    dataset_dir: Path = DATASET_DIR,
+    verify: bool = True,
+) -> str:
+    """
+    機械・期間内の元CSVの内容ハッシュから作るバージョン
+
+    verify=False は同じ期間を確認した直後用（ファイルごとの stat を省く）。
+    """
+    if verify:
+        manifest = refresh_range(machine, start_date, end_date, dataset_dir)
+    else:
+        manifest = get_manifest(machine, dataset_dir)
+    digest = hashlib.sha1(machine.encode("utf-8"))
+    for d in manifest.dates_in_range(start_date, end_date):
+        digest.update(f"{d}:{manifest.entries[d].sha1}".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def sales_version(db_path: Path = SALES_DB_PATH) -> str:
+    """sales.db（と WAL）の (mtime, size) から作るバージョン"""
+    parts = []
+    for path in (Path(db_path), Path(f"{db_path}-wal")):
+        try:
+            st = path.stat()
+            parts.append(f"{st.st_mtime_ns}:{st.st_size}")
+        except FileNotFoundError:
+            parts.append("-")
+    return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()[:16]
+
+
+# ---------------------------
+# キャッシュ本体
+# ---------------------------
+class ResultCache:
+    def __init__(
+        self,
+        cache_dir: Path = RESULT_CACHE_DIR,
+        max_memory_bytes: int = MAX_MEMORY_BYTES,
+        max_disk_bytes: int = MAX_DISK_BYTES,
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+
+        self._memory: OrderedDict = OrderedDict()  # {key: (size, value)}
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(parts: tuple) -> str:
+        return hashlib.sha256(repr((RESULT_VERSION, *parts)).encode("utf-8")).hexdigest()
+
+    def _disk_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.pkl"
+
+    def _remember(self, key: str, size: int, value):
+        """メモリに載せ、上限を超えた分を参照の古いものから捨てる（ディスクには残っている）"""
+        if key in self._memory:
+            self._memory_bytes -= self._memory.pop(key)[0]
+        if size > self.max_memory_bytes:
+            return
+        self._memory[key] = (size, value)
+        self._memory_bytes += size
+        while self._memory_bytes > self.max_memory_bytes:
+            _, (old_size, _) = self._memory.popitem(last=False)
+            self._memory_bytes -= old_size
+
+    # --- 参照 ---
+    def get(self, parts: tuple, default=None):
+        key = self.make_key(parts)
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                count_cache("result_cache", hit=True)
+                return entry[1]
+
+        path = self._disk_path(key)
+        try:
+            data = path.read_bytes()
+            os.utime(path)
+            value = pickle.loads(data)
+        except (FileNotFoundError, *UNREADABLE_ERRORS):
+            # 壊れたファイルは消して、計算し直した結果で置き換えられるようにする
+            path.unlink(missing_ok=True)
+            with self._lock:
+                self.misses += 1
+            count_cache("result_cache", hit=False)
+            return default
+
+        with self._lock:
+            self._remember(key, len(data), value)
+            self.disk_hits += 1
+        count_cache("result_cache", hit=True)
+        return value
+
+    def put(self, parts: tuple, value):
+        key = self.make_key(parts)
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+        path = self._disk_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{key}.{os.getpid()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+        with self._lock:
+            self._remember(key, len(data), value)
+
+        evict(self.cache_dir, self.max_disk_bytes)
+
+    def get_or_compute(self, parts: tuple, compute: Callable):
+        """キャッシュにあればそれを、無ければ compute() の結果を保存して返す"""
+        missing = object()
+        value = self.get(parts, missing)
+        if value is missing:
+            value = compute()
+            self.put(parts, value)
+        return value
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+            }
+
+    def clear_memory(self):
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+
+
+## プロセスで共有するキャッシュ
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def get_result_cache() -> ResultCache:
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = ResultCache()
+        return _default_cache
@@ -0,0 +1,323 @@
+"""
+日次ロールアップ（機械×日×ステータス の秒数集計）
+
+過去日の集計値は変わらないため、CSV 1ファイルにつき1回だけ集計して
+cache/rollup.db に保存する。元CSVの (mtime, size) が変わった日だけ再集計する。
+ファイルの読み込み・集計はワーカー（スレッド / プロセス）で並列に行い、
+戻ってくるのはステータス別秒数などの小さな集計値だけ（DataFrame は連結しない）。
+
+使い方:
+    python -m libs.rollup                 # 全機械を最新化
+    python -m libs.rollup --machines M1-1
+    python -m libs.rollup --executor process --workers 4
+"""
+import argparse
+import sqlite3
+from contextlib import closing
+from dataclasses import dataclass
+from datetime import date, datetime
+from itertools import tee
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from libs.event_store import list_machines, scan_sources
+from libs.parallel import EXECUTORS, iter_ordered
+from libs.settings import CACHE_DIR, DATASET_DIR, LOAD_EXECUTOR, LOAD_WORKERS
+from libs.status_csv import STATUS_LIST, read_status_csv
+from libs.timeline import Timeline
+
+
+# --- 定数 ---
+ROLLUP_DB_PATH: Path = CACHE_DIR / "rollup.db"
+
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS daily_status (
+    machine TEXT NOT NULL,
+    date    TEXT NOT NULL,
+    status  TEXT NOT NULL,
+    seconds INTEGER NOT NULL,
+    PRIMARY KEY (machine, date, status)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS daily_summary (
+    machine           TEXT NOT NULL,
+    date              TEXT NOT NULL,
+    power_on_time     TEXT,
+    power_off_time    TEXT,
+    real_work_seconds INTEGER NOT NULL,
+    source_mtime_ns   INTEGER NOT NULL,
+    source_size       INTEGER NOT NULL,
+    PRIMARY KEY (machine, date)
+) WITHOUT ROWID;
+"""
+
+
+@dataclass
+class DaySummary:
+    status_seconds: pd.Series
+    power_on_time: Optional[str]
+    power_off_time: Optional[str]
+    real_work_time: float
+
+
+# ---------------------------
+# 1日分の集計
+# ---------------------------
+def _format_time(value) -> Optional[str]:
+    return value.strftime("%H:%M:%S") if value is not None else None
+
+
+def summarize_day(df: pd.DataFrame):
+    """1日分のイベントから (ステータス別秒数, 電源オン, 電源オフ, 実稼働秒数) を求める"""
+    timeline = Timeline.from_events(df)
+    return (
+        timeline.status_seconds(),
+        _format_time(timeline.first_power_on()),
+        _format_time(timeline.last_power_off()),
+        timeline.real_work_seconds(),
+    )
+
+
+def summarize_file(path: Path) -> tuple:
+    """
+    CSV 1ファイルを読み込んで集計する（ワーカーで実行する）
+
+    戻り値: ([(ステータス, 秒数), ...], 電源オン, 電源オフ, 実稼働秒数)
+    """
+    status_seconds, on_time, off_time, real_work_seconds = summarize_day(read_status_csv(path))
+    return (
+        [(str(s), int(sec)) for s, sec in status_seconds.items()],
+        on_time,
+        off_time,
+        int(real_work_seconds),
+    )
+
+
+# ---------------------------
+# ロールアップの更新
+# ---------------------------
+def _connect(db_path: Path) -> sqlite3.Connection:
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    conn.executescript(SCHEMA_SQL)
+    return conn
+
+
+def _file_date(name: str) -> str:
+    return datetime.strptime(name[:8], "%Y%m%d").strftime("%Y-%m-%d")
+
+
+def _pending_files(
+    conn: sqlite3.Connection,
+    machines: list,
+    dataset_dir: Path,
+    start_date: Optional[date],
+    end_date: Optional[date],
+    full: bool,
+):
+    """
+    機械ごとに記録済みの (mtime, size) と元CSVを比べ、集計し直すファイルを順に返す
+
+    (machine, date, ファイル名, mtime, size) を1件ずつ返し、元CSVが消えた日はその機械に進んだときに削除する。
+    start_date / end_date / full は scan_sources に渡す（stat し直す範囲）。
+    """
+    for machine in machines:
+        recorded = {
+            d: (mtime, size)
+            for d, mtime, size in conn.execute(
+                "SELECT date, source_mtime_ns, source_size FROM daily_summary WHERE machine = ?",
+                (machine,),
+            )
+        }
+
+        current = {}
+        for files in scan_sources(machine, dataset_dir, start_date, end_date, full).values():
+            for name, (mtime, size) in files.items():
+                current[_file_date(name)] = (name, mtime, size)
+
+        # 元CSVが消えた日は削除
+        removed = [(machine, d) for d in recorded.keys() - current.keys()]
+        conn.executemany("DELETE FROM daily_status WHERE machine = ? AND date = ?", removed)
+        conn.executemany("DELETE FROM daily_summary WHERE machine = ? AND date = ?", removed)
+
+        for d, (name, mtime, size) in sorted(current.items()):
+            if recorded.get(d) != (mtime, size):
+                yield machine, d, name, mtime, size
+
+
+def refresh_rollup(
+    machines: Optional[list] = None,
+    dataset_dir: Path = DATASET_DIR,
+    db_path: Path = ROLLUP_DB_PATH,
+    executor: str = LOAD_EXECUTOR,
+    max_workers: int = LOAD_WORKERS,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    full: bool = False,
+) -> int:
+    """
+    新規・更新されたCSVだけを集計してロールアップに反映する
+
+    executor / max_workers は読み込みの並列方式（libs.parallel.iter_ordered）。
+    過去日のCSVの書き換えは、start_date～end_date を指定すればその期間だけ、
+    full=True なら全ファイルを stat し直して拾う（libs.event_store.scan_sources）。
+    戻り値は再集計したファイル数。
+    """
+    if machines is None:
+        machines = list_machines(dataset_dir)
+
+    refreshed = 0
+    with closing(_connect(db_path)) as conn, conn:
+        # 読み込み・集計は並列に行い、書き込みは pending の順に1本の接続で行う
+        # （対象ファイルも結果も一定件数ずつ受け取って処理するため、全ファイル分を溜めない）
+        pending, for_paths = tee(_pending_files(conn, machines, dataset_dir, start_date, end_date, full))
+        results = iter_ordered(
+            summarize_file,
+            (dataset_dir / machine / name for machine, _, name, _, _ in for_paths),
+            executor,
+            max_workers,
+        )
+
+        for (machine, d, name, mtime, size), result in zip(pending, results, strict=True):
+            refreshed += 1
+            status_seconds, on_time, off_time, real_work_seconds = result
+
+            conn.execute("DELETE FROM daily_status WHERE machine = ? AND date = ?", (machine, d))
+            conn.executemany(
+                "INSERT INTO daily_status (machine, date, status, seconds) VALUES (?, ?, ?, ?)",
+                [(machine, d, s, sec) for s, sec in status_seconds],
+            )
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO daily_summary
+                (machine, date, power_on_time, power_off_time, real_work_seconds, source_mtime_ns, source_size)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (machine, d, on_time, off_time, real_work_seconds, mtime, size),
+            )
+
+    return refreshed
+
+
+# ---------------------------
+# 参照
+# ---------------------------
+def _placeholders(values: list) -> str:
+    return ", ".join("?" for _ in values)
+
+
+def query_status_seconds(
+    machines: list,
+    start_date: date,
+    end_date: date,
+    db_path: Path = ROLLUP_DB_PATH,
+) -> pd.Series:
+    """期間・機械を合算したステータス別秒数（データが無ければ空のSeries）"""
+    sql = f"""
+        SELECT status, SUM(seconds)
+        FROM daily_status
+        WHERE machine IN ({_placeholders(machines)})
+        AND date BETWEEN ? AND ?
+        GROUP BY status
+    """
+    params = [*machines, start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d")]
+
+    with closing(_connect(db_path)) as conn:
+        rows = conn.execute(sql, params).fetchall()
+
+    summary = pd.Series(dict(rows), dtype="int64", name="経過秒数")
+    summary.index.name = "ステータス"
+    return summary.reindex([s for s in STATUS_LIST if s in summary.index])
+
+
+def query_daily_matrix(
+    machines: list,
+    start_date: date,
+    end_date: date,
+    db_path: Path = ROLLUP_DB_PATH,
+) -> tuple:
+    """
+    機械×日 の実稼働秒数（電源断以外）を2次元配列で返す
+
+    戻り値: (日付の datetime64[D] 配列, shape (機械数, 日数) の float64 配列)。データの無い日は NaN
+    """
+    first = np.datetime64(start_date, "D")
+    dates = np.arange(first, np.datetime64(end_date, "D") + 1)
+    matrix = np.full((len(machines), len(dates)), np.nan)
+
+    sql = f"""
+        SELECT machine, date, real_work_seconds
+        FROM daily_summary
+        WHERE machine IN ({_placeholders(machines)})
+        AND date BETWEEN ? AND ?
+    """
+    params = [*machines, start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d")]
+
+    with closing(_connect(db_path)) as conn:
+        rows = conn.execute(sql, params).fetchall()
+
+    if rows:
+        row_machines, row_dates, seconds = zip(*rows)
+        index = {m: i for i, m in enumerate(machines)}
+        matrix[
+            [index[m] for m in row_machines],
+            (np.array(row_dates, dtype="datetime64[D]") - first).astype("int64"),
+        ] = seconds
+
+    return dates, matrix
+
+
+def get_day_summary(
+    machine: str,
+    target_date: date,
+    db_path: Path = ROLLUP_DB_PATH,
+) -> Optional[DaySummary]:
+    """1機械1日分のKPI用集計。ロールアップに無ければ None"""
+    date_str = target_date.strftime("%Y-%m-%d")
+
+    with closing(_connect(db_path)) as conn:
+        row = conn.execute(
+            """
+            SELECT power_on_time, power_off_time, real_work_seconds
+            FROM daily_summary
+            WHERE machine = ? AND date = ?
+            """,
+            (machine, date_str),
+        ).fetchone()
+        if row is None:
+            return None
+
+        status_rows = conn.execute(
+            "SELECT status, seconds FROM daily_status WHERE machine = ? AND date = ?",
+            (machine, date_str),
+        ).fetchall()
+
+    on_time, off_time, real_work_seconds = row
+    status_seconds = pd.Series(dict(status_rows), dtype="int64", name="経過秒数")
+    status_seconds.index.name = "ステータス"
+
+    return DaySummary(
+        status_seconds=status_seconds.reindex([s for s in STATUS_LIST if s in status_seconds.index]),
+        power_on_time=on_time,
+        power_off_time=off_time,
+        real_work_time=real_work_seconds / 3600,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="日次ロールアップを最新化する")
+    parser.add_argument("--machines", nargs="*", default=None, help="対象機械（省略時は全機械）")
+    parser.add_argument("--executor", choices=EXECUTORS, default=LOAD_EXECUTOR, help="読み込みの並列方式")
+    parser.add_argument("--workers", type=int, default=LOAD_WORKERS, help="ワーカー数")
+    args = parser.parse_args()
+
+    # 手動の実行では過去日のCSVの書き換えも拾う
+    updated = refresh_rollup(args.machines, executor=args.executor, max_workers=args.workers, full=True)
+    print(f"再集計: {updated} ファイル")
+
+
+if __name__ == "__main__":
+    main()
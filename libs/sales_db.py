@@ -0,0 +1,472 @@
+"""
+売上DB（dataset/sales.db）のデータアクセス層
+
+- 接続はDBパスごとに1本を使い回す（都度 connect しない）
+- 期間・複数機械の売上合計は1クエリで取得する
+- date 列のインデックスはマイグレーションで作成する
+- マイグレーション2で機械別テーブルを縦持ちの daily_sales 1本に統合する
+  （旧テーブル名は互換ビューとして残る）
+
+使い方:
+    python -m libs.sales_db migrate
+"""
+import argparse
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from libs.profiling import span
+from libs.settings import SALES_DB_PATH
+
+## pandas は DataFrame を返す関数の中で読み込む（機械一覧・売上行の参照だけのページで読み込まないため）
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+# --- 定数 ---
+UNIFIED_TABLE = "daily_sales"
+
+SALES_COLUMNS: list = ["sale", "day_operator", "day_multi", "night_operator", "night_multi"]
+
+
+# --- 接続の使い回し ---
+_connections: dict = {}
+_locks: dict = {}
+_registry_lock = threading.Lock()
+
+
+def get_connection(db_path: Path = SALES_DB_PATH) -> sqlite3.Connection:
+    """DBパスごとに1本の接続を返す（Streamlitの複数スレッドから共有する）"""
+    key = str(db_path)
+    with _registry_lock:
+        conn = _connections.get(key)
+        if conn is None:
+            conn = sqlite3.connect(key, check_same_thread=False)
+            _connections[key] = conn
+            _locks[key] = threading.RLock()
+    return conn
+
+
+@contextmanager
+def _cursor(db_path: Path = SALES_DB_PATH):
+    conn = get_connection(db_path)
+    with span("sales_query"), _locks[str(db_path)]:
+        cur = conn.cursor()
+        try:
+            yield cur
+        finally:
+            cur.close()
+
+
+def close_connections():
+    """使い回している接続をすべて閉じる"""
+    with _registry_lock:
+        for conn in _connections.values():
+            conn.close()
+        _connections.clear()
+        _locks.clear()
+
+
+# ---------------------------
+# テーブル
+# ---------------------------
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def list_machine_tables(cur) -> list:
+    """機械ごとの売上テーブル名（統合前のスキーマ）"""
+    cur.execute(
+        """
+        SELECT name FROM sqlite_master
+        WHERE type = 'table'
+        AND name NOT LIKE 'sqlite_%'
+        AND name != ?
+        ORDER BY name
+        """,
+        (UNIFIED_TABLE,),
+    )
+    return [r[0] for r in cur.fetchall()]
+
+
+def is_unified(cur) -> bool:
+    """daily_sales に統合済みかどうか"""
+    cur.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+        (UNIFIED_TABLE,),
+    )
+    return cur.fetchone() is not None
+
+
+def list_sales_machines(cur) -> list:
+    """売上データを持つ機械名"""
+    if is_unified(cur):
+        cur.execute(f"SELECT DISTINCT machine FROM {UNIFIED_TABLE} ORDER BY machine")
+        return [r[0] for r in cur.fetchall()]
+    return list_machine_tables(cur)
+
+
+def fetch_sales_machines(db_path: Path = SALES_DB_PATH) -> list:
+    """売上データを持つ機械名（sales.db を開いて取得する）"""
+    with _cursor(db_path) as cur:
+        return list_sales_machines(cur)
+
+
+def _sales_rows_sql(cur, machines: list, start_date: date, end_date: date):
+    """
+    期間・機械で絞った売上行 (machine, date, sale, ...) を返すSQLとパラメータ
+
+    統合済みなら daily_sales の主キー範囲検索、
+    統合前なら機械テーブルの UNION ALL（各テーブルの date インデックスを使う）。
+    対象の無い場合は (None, None)。
+    """
+    columns = ", ".join(SALES_COLUMNS)
+    period = (start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d"))
+    machines = list(dict.fromkeys(machines))
+
+    if is_unified(cur):
+        if not machines:
+            return None, None
+        sql = f"""
+            SELECT machine, date, {columns}
+            FROM {UNIFIED_TABLE}
+            WHERE machine IN ({", ".join("?" for _ in machines)})
+            AND date BETWEEN ? AND ?
+        """
+        return sql, (*machines, *period)
+
+    tables = set(list_machine_tables(cur))
+    targets = [m for m in machines if m in tables]
+    if not targets:
+        return None, None
+
+    sql = "\nUNION ALL\n".join(
+        f"SELECT ? AS machine, date, {columns} FROM {_quote(m)} WHERE date BETWEEN ? AND ?"
+        for m in targets
+    )
+    params = tuple(p for m in targets for p in (m, *period))
+    return sql, params
+
+
+# ---------------------------
+# マイグレーション
+# ---------------------------
+def _migration_1_date_index(cur):
+    """各機械テーブルの date 列にインデックスを作成する"""
+    for table in list_machine_tables(cur):
+        cur.execute(
+            f"CREATE INDEX IF NOT EXISTS {_quote(f'idx_{table}_date')} ON {_quote(table)} (date)"
+        )
+
+
+def _migration_2_unify_tables(cur):
+    """
+    機械別テーブルを縦持ちの daily_sales に統合する
+
+    旧テーブルは削除し、同名の互換ビューを作成する。
+    """
+    columns = ", ".join(SALES_COLUMNS)
+
+    cur.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {UNIFIED_TABLE} (
+            machine        TEXT NOT NULL,
+            date           TEXT NOT NULL,
+            sale           INTEGER,
+            day_operator   TEXT,
+            day_multi      TEXT,
+            night_operator TEXT,
+            night_multi    TEXT,
+            PRIMARY KEY (machine, date)
+        ) WITHOUT ROWID
+        """
+    )
+    # 全機械の期間集計・比較用（テーブルを読まずにインデックスだけで完結する）
+    cur.execute(
+        f"CREATE INDEX IF NOT EXISTS idx_{UNIFIED_TABLE}_date ON {UNIFIED_TABLE} (date, machine, sale)"
+    )
+
+    for table in list_machine_tables(cur):
+        cur.execute(
+            f"""
+            INSERT OR REPLACE INTO {UNIFIED_TABLE} (machine, date, {columns})
+            SELECT ?, date, {columns} FROM {_quote(table)}
+            WHERE date IS NOT NULL
+            """,
+            (table,),
+        )
+        cur.execute(f"DROP TABLE {_quote(table)}")
+        cur.execute(
+            f"""
+            CREATE VIEW {_quote(table)} AS
+            SELECT date, {columns} FROM {UNIFIED_TABLE}
+            WHERE machine = '{table.replace("'", "''")}'
+            """
+        )
+
+
+MIGRATIONS: list = [
+    _migration_1_date_index,
+    _migration_2_unify_tables,
+]
+
+
+def migrate(db_path: Path = SALES_DB_PATH) -> int:
+    """
+    未適用のマイグレーションを順に適用する
+
+    適用状況は PRAGMA user_version で管理する。戻り値は適用後のバージョン。
+    """
+    with _cursor(db_path) as cur:
+        version = cur.execute("PRAGMA user_version").fetchone()[0]
+        conn = cur.connection
+
+        for i, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+            with conn:
+                migration(cur)
+                cur.execute(f"PRAGMA user_version = {i}")
+            version = i
+
+    return version
+
+
+# ---------------------------
+# 参照
+# ---------------------------
+def fetch_daily_sale(machine_name: str, target_date: date, db_path: Path = SALES_DB_PATH):
+    """
+    1機械1日分の (売上, 日勤担当, 日勤マルチ, 夜勤担当, 夜勤マルチ)
+
+    行が無い場合は (0, None, None, None, None)
+    """
+    with _cursor(db_path) as cur:
+        sql, params = _sales_rows_sql(cur, [machine_name], target_date, target_date)
+        if sql is None:
+            return 0, None, None, None, None
+
+        cur.execute(f"SELECT {', '.join(SALES_COLUMNS)} FROM ({sql}) LIMIT 1", params)
+        result = cur.fetchone()
+
+    if result:
+        return result
+    return 0, None, None, None, None
+
+
+def fetch_daily_sales(
+    machines: list,
+    start_date: date,
+    end_date: date,
+    db_path: Path = SALES_DB_PATH,
+) -> "pd.DataFrame":
+    """期間・複数機械の日次の売上行（machine, date, sale, 担当者・マルチ）"""
+    import pandas as pd
+
+    with _cursor(db_path) as cur:
+        sql, params = _sales_rows_sql(cur, machines, start_date, end_date)
+        rows = cur.execute(sql, params).fetchall() if sql is not None else []
+
+    return pd.DataFrame(rows, columns=["machine", "date", *SALES_COLUMNS])
+
+
+def fetch_total_sales(
+    machines: list,
+    start_date: date,
+    end_date: date,
+    db_path: Path = SALES_DB_PATH,
+) -> int:
+    """期間・複数機械の売上合計を1クエリで取得する（データの無い機械は0扱い）"""
+    with _cursor(db_path) as cur:
+        sql, params = _sales_rows_sql(cur, machines, start_date, end_date)
+        if sql is None:
+            return 0
+
+        cur.execute(f"SELECT COALESCE(SUM(sale), 0) FROM ({sql})", params)
+        return cur.fetchone()[0]
+
+
+def fetch_fleet_comparison(
+    machines: list,
+    start_date: date,
+    end_date: date,
+    db_path: Path = SALES_DB_PATH,
+) -> "pd.DataFrame":
+    """機械別の 稼働日数・売上合計・1日平均売上"""
+    import pandas as pd
+
+    with _cursor(db_path) as cur:
+        sql, params = _sales_rows_sql(cur, machines, start_date, end_date)
+        if sql is None:
+            return pd.DataFrame(columns=["machine", "days", "sale", "sale_per_day"])
+
+        cur.execute(
+            f"""
+            SELECT machine,
+                   COUNT(*) AS days,
+                   COALESCE(SUM(sale), 0) AS sale,
+                   COALESCE(AVG(sale), 0) AS sale_per_day
+            FROM ({sql})
+            GROUP BY machine
+            ORDER BY sale DESC
+            """,
+            params,
+        )
+        rows = cur.fetchall()
+
+    return pd.DataFrame(rows, columns=["machine", "days", "sale", "sale_per_day"])
+
+
+def fetch_operator_ranking(
+    machines: list,
+    start_date: date,
+    end_date: date,
+    db_path: Path = SALES_DB_PATH,
+) -> "pd.DataFrame":
+    """
+    担当者別の 担当シフト数・売上 ランキング
+
+    日勤・夜勤の両方に担当者がいる日は、その日の売上を半分ずつ按分する。
+    """
+    import pandas as pd
+
+    with _cursor(db_path) as cur:
+        sql, params = _sales_rows_sql(cur, machines, start_date, end_date)
+        if sql is None:
+            return pd.DataFrame(columns=["operator", "shifts", "sale"])
+
+        cur.execute(
+            f"""
+            WITH src AS ({sql}),
+            shifts AS (
+                SELECT day_operator AS operator,
+                       sale * CASE WHEN COALESCE(night_operator, '') = '' THEN 1.0 ELSE 0.5 END AS share
+                FROM src
+                WHERE COALESCE(day_operator, '') != ''
+                UNION ALL
+                SELECT night_operator AS operator,
+                       sale * CASE WHEN COALESCE(day_operator, '') = '' THEN 1.0 ELSE 0.5 END AS share
+                FROM src
+                WHERE COALESCE(night_operator, '') != ''
+            )
+            SELECT operator, COUNT(*) AS shifts, COALESCE(SUM(share), 0) AS sale
+            FROM shifts
+            GROUP BY operator
+            ORDER BY sale DESC
+            """,
+            params,
+        )
+        rows = cur.fetchall()
+
+    return pd.DataFrame(rows, columns=["operator", "shifts", "sale"])
+
+
+# ---------------------------
+# 書き込み
+# ---------------------------
+def _normalize_row(row) -> tuple:
+    """(machine, date, sale, 日勤担当, 日勤マルチ, 夜勤担当, 夜勤マルチ)。空文字は NULL として保存する"""
+    machine, date_str, sale, *texts = row
+    return (machine, date_str, int(sale or 0), *[t or None for t in texts])
+
+
+def upsert_daily_sales(rows: list, db_path: Path = SALES_DB_PATH) -> dict:
+    """
+    日次の売上・担当者を一括で書き込む（1トランザクション）
+
+    rows は (machine, "YYYY-MM-DD", sale, day_operator, day_multi, night_operator, night_multi) のリスト。
+    既存行と同じ内容の行は書き込まないため、同じ期間を何度流しても結果は変わらない。
+    戻り値は {"inserted", "updated", "unchanged"} の件数。
+    """
+    rows = [_normalize_row(r) for r in rows]
+    counts = {"inserted": 0, "updated": 0, "unchanged": 0}
+    if not rows:
+        return counts
+
+    machines = sorted({r[0] for r in rows})
+    dates = [r[1] for r in rows]
+    columns = ", ".join(SALES_COLUMNS)
+
+    with _cursor(db_path) as cur:
+        conn = cur.connection
+        cur.execute("BEGIN IMMEDIATE")
+        try:
+            unified = is_unified(cur)
+
+            # 統合前のスキーマで、テーブルの無い機械は同じ形のテーブルを作る
+            if not unified:
+                tables = set(list_machine_tables(cur))
+                for machine in machines:
+                    if machine not in tables:
+                        cur.execute(
+                            f"""
+                            CREATE TABLE {_quote(machine)} (
+                                "date" TEXT, "sale" INTEGER,
+                                "day_operator" TEXT, "day_multi" TEXT,
+                                "night_operator" TEXT, "night_multi" TEXT
+                            )
+                            """
+                        )
+                        cur.execute(
+                            f"CREATE INDEX IF NOT EXISTS {_quote(f'idx_{machine}_date')} ON {_quote(machine)} (date)"
+                        )
+
+            # 既存行を1クエリで読み、変化した行だけを書き込む
+            sql, params = _sales_rows_sql(
+                cur,
+                machines,
+                datetime.strptime(min(dates), "%Y-%m-%d").date(),
+                datetime.strptime(max(dates), "%Y-%m-%d").date(),
+            )
+            existing = {(r[0], r[1]): tuple(r[2:]) for r in cur.execute(sql, params)} if sql else {}
+
+            inserts = [r for r in rows if (r[0], r[1]) not in existing]
+            updates = [r for r in rows if (r[0], r[1]) in existing and existing[(r[0], r[1])] != r[2:]]
+            counts["inserted"] = len(inserts)
+            counts["updated"] = len(updates)
+            counts["unchanged"] = len(rows) - len(inserts) - len(updates)
+
+            if unified:
+                cur.executemany(
+                    f"""
+                    INSERT INTO {UNIFIED_TABLE} (machine, date, {columns})
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (machine, date) DO UPDATE SET
+                    {", ".join(f"{c} = excluded.{c}" for c in SALES_COLUMNS)}
+                    """,
+                    inserts + updates,
+                )
+            else:
+                for machine in machines:
+                    table = _quote(machine)
+                    cur.executemany(
+                        f"INSERT INTO {table} (date, {columns}) VALUES (?, ?, ?, ?, ?, ?)",
+                        [r[1:] for r in inserts if r[0] == machine],
+                    )
+                    cur.executemany(
+                        f"UPDATE {table} SET {', '.join(f'{c} = ?' for c in SALES_COLUMNS)} WHERE date = ?",
+                        [(*r[2:], r[1]) for r in updates if r[0] == machine],
+                    )
+
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="売上DBの管理")
+    parser.add_argument("command", choices=["migrate"])
+    parser.add_argument("--db", type=Path, default=SALES_DB_PATH, help="売上DBのパス")
+    args = parser.parse_args()
+
+    if args.command == "migrate":
+        version = migrate(args.db)
+        print(f"✅ マイグレーション完了: version {version}")
+
+
+if __name__ == "__main__":
+    main()
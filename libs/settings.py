@@ -0,0 +1,55 @@
+import os
+import tomllib
+from pathlib import Path, PureWindowsPath
+
+
+# --- パス定数 ---
+BASE_DIR: Path = Path(__file__).resolve().parent.parent
+## 稼働CSV・sales.db の置き場（環境変数 MACHINING_DATASET_DIR で変更可。ベンチマークの合成データ等）
+DATASET_DIR: Path = Path(os.environ.get("MACHINING_DATASET_DIR", BASE_DIR / "dataset"))
+SALES_DB_PATH: Path = DATASET_DIR / "sales.db"
+
+## 生成物（イベントストア等）の置き場。git管理外（環境変数 MACHINING_CACHE_DIR で変更可）
+CACHE_DIR: Path = Path(os.environ.get("MACHINING_CACHE_DIR", BASE_DIR / "cache"))
+
+## CSVを並列に読み込む方式とワーカー数（環境変数 MACHINING_LOAD_EXECUTOR / MACHINING_LOAD_WORKERS で変更可）
+## "thread": ファイル共有など I/O 待ちが主なとき、"process": 解析（CPU）が主なとき、"serial": 逐次
+## ワーカー数の既定は I/O 待ちを重ねられるよう CPU 数 + 4（上限 8）
+EXECUTORS: list = ["thread", "process", "serial"]
+LOAD_EXECUTOR: str = os.environ.get("MACHINING_LOAD_EXECUTOR", "thread")
+LOAD_WORKERS: int = int(os.environ.get("MACHINING_LOAD_WORKERS", min(8, (os.cpu_count() or 1) + 4)))
+
+## 売上・担当者抽出の設定ファイル（環境変数 MACHINING_CONFIG で変更可）
+CONFIG_PATH: Path = BASE_DIR / "config.toml"
+
+
+def _parse_hms(value: str) -> dict:
+    """ "05:00:00" → {"hour": 5, "mitute": 0, "second": 0} """
+    hour, minute, second = (int(v) for v in value.split(":"))
+    return {"hour": hour, "mitute": minute, "second": second}
+
+
+def load_config(path: Path = None) -> dict:
+    """
+    設定ファイル（TOML）と環境変数から抽出設定を読み込む
+
+    戻り値: {"db_path": Path, "shift_start": dict, "day_end": dict, "machines": list}
+    """
+    path = Path(path or os.environ.get("MACHINING_CONFIG", CONFIG_PATH))
+    with open(path, "rb") as f:
+        raw = tomllib.load(f)
+
+    db_path = os.environ.get("MACHINING_DB_PATH", raw["source"]["db_path"])
+    # Windows の絶対パスはそのまま、相対パスは設定ファイルの位置から解決する
+    if not (Path(db_path).is_absolute() or PureWindowsPath(db_path).is_absolute()):
+        db_path = path.parent / db_path
+
+    machines = os.environ.get("MACHINING_MACHINES")
+    machines = [m.strip() for m in machines.split(",") if m.strip()] if machines else raw["machines"]["names"]
+
+    return {
+        "db_path": Path(db_path),
+        "shift_start": _parse_hms(os.environ.get("MACHINING_SHIFT_START", raw["shift"]["start"])),
+        "day_end": _parse_hms(os.environ.get("MACHINING_DAY_END", raw["shift"]["day_end"])),
+        "machines": machines,
+    }
@@ -0,0 +1,223 @@
+"""
+シフト（日勤 / 夜勤）別の稼働集計
+
+シフトの境目（既定 17:00）をまたぐ区間は境目で分けて
+機械×日×シフト×ステータス の秒数をベクトル演算で集計する。
+期間の分析では生イベントを連結せず、機械×月 のパーティションごとに
+NumPy の集計配列へ足し込んでは捨てる。集計配列は 機械×日×シフト×ステータス の
+int64 のため期間・機械数に比例するが（50機械×3年で約 6 MB）、イベントの行数にはよらない。
+シフトの境目は config.toml の [shift] に従う。
+
+sales.db の売上は1日単位のため、シフト別の売上は
+その日の自動起動（加工）時間の比で日勤・夜勤に按分する。
+"""
+from datetime import date
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from libs.event_store import iter_event_batches
+from libs.sales_db import fetch_daily_sales
+from libs.settings import load_config
+from libs.status_csv import STATUS_LIST, UNKNOWN_STATUS
+
+
+# --- 定数 ---
+DAY_SECONDS = 24 * 3600
+
+SHIFTS: list = ["日勤", "夜勤"]
+
+POWER_OFF_CODE = STATUS_LIST.index("電源断")
+CUTTING_CODE = STATUS_LIST.index("自動起動")
+
+
+def _seconds_of(status: dict) -> int:
+    return status["hour"] * 3600 + status["mitute"] * 60 + status["second"]
+
+
+def shift_bounds(config: Optional[dict] = None) -> tuple:
+    """(稼働日の開始秒, 稼働日の開始から日勤終了までの秒数)"""
+    config = config or load_config()
+    start = _seconds_of(config["shift_start"])
+    return start, _seconds_of(config["day_end"]) - start
+
+
+INDEX_NAMES: list = ["machine", "date", "shift"]
+
+
+def _split_shifts(events: pd.DataFrame, day_start: int, boundary: int) -> tuple:
+    """各イベントの (ステータスコード, 日勤側の秒数, 夜勤側の秒数)"""
+    # 稼働日の開始からの 開始秒・終了秒
+    origin = events["date"].to_numpy(dtype="datetime64[s]") + np.timedelta64(day_start, "s")
+    start = (events["日時"].to_numpy(dtype="datetime64[s]") - origin).astype("int64")
+    duration = events["経過秒数"].to_numpy(dtype="int64")
+    end = start + duration
+
+    # 境目より前を日勤、残りを夜勤に分ける
+    day_part = np.clip(np.minimum(end, boundary) - start, 0, duration)
+    night_part = duration - day_part
+
+    code = events["ステータス"].cat.codes.to_numpy().astype("int64")
+    code[code < 0] = STATUS_LIST.index(UNKNOWN_STATUS)
+    return code, day_part, night_part
+
+
+def _shift_frame(machines, dates, acc: np.ndarray) -> pd.DataFrame:
+    """(機械, 日) ごとの shape (件数, len(SHIFTS), len(STATUS_LIST)) の配列を DataFrame にする"""
+    if len(acc) == 0:
+        return pd.DataFrame(
+            columns=STATUS_LIST,
+            index=pd.MultiIndex.from_arrays([[], [], []], names=INDEX_NAMES),
+            dtype="int64",
+        )
+
+    index = pd.MultiIndex.from_arrays(
+        [
+            np.repeat(np.asarray(machines, dtype=object), len(SHIFTS)),
+            np.repeat(dates, len(SHIFTS)),
+            np.tile(SHIFTS, len(acc)),
+        ],
+        names=INDEX_NAMES,
+    )
+    return pd.DataFrame(acc.reshape(-1, len(STATUS_LIST)), index=index, columns=STATUS_LIST).sort_index()
+
+
+def shift_status_seconds(events: pd.DataFrame, config: Optional[dict] = None) -> pd.DataFrame:
+    """
+    機械×日×シフト ごとのステータス別秒数
+
+    events: load_events() の結果（machine, date, 日時, ステータス, 経過秒数）
+    戻り値: index (machine, date, shift)、列 STATUS_LIST の int64 DataFrame
+    """
+    day_start, boundary = shift_bounds(config)
+    if events.empty:
+        return _shift_frame([], [], np.zeros((0, len(SHIFTS), len(STATUS_LIST)), dtype="int64"))
+
+    code, day_part, night_part = _split_shifts(events, day_start, boundary)
+
+    # (機械, 日) の組に番号を振って 3次元配列に足し込む
+    keys, groups = pd.MultiIndex.from_arrays([events["machine"], events["date"]]).factorize()
+    acc = np.zeros((len(groups), len(SHIFTS), len(STATUS_LIST)), dtype="int64")
+    np.add.at(acc, (keys, 0, code), day_part)
+    np.add.at(acc, (keys, 1, code), night_part)
+
+    return _shift_frame(groups.get_level_values(0).astype(str), groups.get_level_values(1), acc)
+
+
+def stream_shift_status_seconds(
+    machines: list,
+    start_date: date,
+    end_date: date,
+    config: Optional[dict] = None,
+) -> pd.DataFrame:
+    """
+    shift_status_seconds と同じ結果を、生イベントを連結せずに求める
+
+    機械×月 のパーティションを1つずつ読み込み、
+    機械×日×シフト×ステータス の int64 配列に足し込んでは捨てる。
+    メモリはこの配列（機械数×日数×2×7 要素）と1パーティション分のイベント。
+    """
+    day_start, boundary = shift_bounds(config)
+    machines = list(dict.fromkeys(machines))
+    position = {machine: i for i, machine in enumerate(machines)}
+
+    n_days = (end_date - start_date).days + 1
+    cells = len(SHIFTS) * len(STATUS_LIST)  # 1日分の要素数
+    acc = np.zeros((len(machines), n_days * cells), dtype="int64")
+    present = np.zeros((len(machines), n_days), dtype=bool)
+    first_day = np.datetime64(start_date, "D")
+
+    for machine, events in iter_event_batches(
+        machines, start_date, end_date, columns=["日時", "ステータス", "経過秒数"]
+    ):
+        code, day_part, night_part = _split_shifts(events, day_start, boundary)
+        day = (events["date"].to_numpy(dtype="datetime64[D]") - first_day).astype("int64")
+
+        # 日×シフト×ステータス の通し番号ごとに合計する（np.add.at より速い）
+        flat = day * cells + code
+        acc[position[machine]] += np.bincount(
+            np.concatenate([flat, flat + len(STATUS_LIST)]),
+            weights=np.concatenate([day_part, night_part]),
+            minlength=n_days * cells,
+        ).astype("int64")
+        present[position[machine], np.unique(day)] = True
+
+    m_idx, d_idx = np.nonzero(present)
+    values = acc.reshape(len(machines), n_days, len(SHIFTS), len(STATUS_LIST))[m_idx, d_idx]
+    dates = pd.DatetimeIndex(first_day + d_idx.astype("timedelta64[D]")).as_unit("ns")
+    return _shift_frame(np.asarray(machines, dtype=object)[m_idx], dates, values)
+
+
+def shift_detail(shift_seconds: pd.DataFrame, sales: pd.DataFrame, config: Optional[dict] = None) -> pd.DataFrame:
+    """
+    機械×日×シフト ごとの 担当者・按分売上・稼働秒数・シフト秒数
+
+    売上はその日の自動起動秒数の比で按分する（自動起動が無い日は稼働秒数の比）。
+    """
+    _, boundary = shift_bounds(config)
+
+    detail = pd.DataFrame({
+        "real_work_seconds": shift_seconds.drop(columns="電源断").sum(axis=1),
+        "cutting_seconds": shift_seconds["自動起動"],
+    }).reset_index()
+    detail["date"] = pd.to_datetime(detail["date"])
+    detail["shift_seconds"] = np.where(detail["shift"] == SHIFTS[0], boundary, DAY_SECONDS - boundary)
+
+    # 売上・担当者（日単位）を付ける（日付の壊れた行は使わない）
+    sales = sales.assign(date=pd.to_datetime(sales["date"], format="%Y-%m-%d", errors="coerce"))
+    sales = sales.dropna(subset=["date"])
+    detail = detail.merge(sales, on=["machine", "date"], how="left")
+    detail["sale"] = detail["sale"].fillna(0)
+    detail["operator"] = np.where(
+        detail["shift"] == SHIFTS[0], detail["day_operator"], detail["night_operator"]
+    )
+
+    # 按分の重み（その日の合計に対する比）
+    day_key = [detail["machine"], detail["date"]]
+    cutting_total = detail.groupby(day_key)["cutting_seconds"].transform("sum")
+    work_total = detail.groupby(day_key)["real_work_seconds"].transform("sum")
+    weight = np.where(
+        cutting_total > 0,
+        detail["cutting_seconds"] / cutting_total.where(cutting_total > 0, 1),
+        detail["real_work_seconds"] / work_total.where(work_total > 0, 1),
+    )
+    detail["sale"] = detail["sale"] * weight
+
+    return detail[[
+        "machine", "date", "shift", "operator", "sale",
+        "real_work_seconds", "cutting_seconds", "shift_seconds",
+    ]]
+
+
+def _kpis(grouped) -> pd.DataFrame:
+    """按分売上・稼働時間 から ¥/h・遊休率 を求める"""
+    kpi = grouped.agg(
+        shifts=("sale", "size"),
+        sale=("sale", "sum"),
+        real_work_seconds=("real_work_seconds", "sum"),
+        shift_seconds=("shift_seconds", "sum"),
+    )
+    hours = kpi["real_work_seconds"] / 3600
+    kpi["real_work_hours"] = hours
+    kpi["unit_price"] = (kpi["sale"] / hours.where(hours > 0)).fillna(0)
+    # 遊休率 = シフト時間のうち稼働していない（電源断の）割合
+    kpi["idle_rate"] = (1 - kpi["real_work_seconds"] / kpi["shift_seconds"]) * 100
+    return kpi.drop(columns=["real_work_seconds", "shift_seconds"]).reset_index()
+
+
+def shift_kpis(detail: pd.DataFrame) -> pd.DataFrame:
+    """シフト別の 件数・売上・稼働時間・¥/h・遊休率"""
+    return _kpis(detail.groupby("shift")).set_index("shift").reindex(SHIFTS).dropna(how="all").reset_index()
+
+
+def operator_kpis(detail: pd.DataFrame) -> pd.DataFrame:
+    """担当者別の 担当シフト数・売上・稼働時間・¥/h・遊休率（¥/h の高い順）"""
+    detail = detail[detail["operator"].fillna("") != ""]
+    return _kpis(detail.groupby("operator")).sort_values("unit_price", ascending=False, ignore_index=True)
+
+
+def query_shift_detail(machines: list, start_date: date, end_date: date) -> pd.DataFrame:
+    """期間・複数機械のシフト別明細（イベントは足し込みながら読み、売上は1回で読み込む）"""
+    sales = fetch_daily_sales(machines, start_date, end_date)
+    return shift_detail(stream_shift_status_seconds(machines, start_date, end_date), sales)
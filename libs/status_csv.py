@@ -0,0 +1,115 @@
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+from libs.profiling import span
+from libs.statuses import STATUS_LIST, UNKNOWN_STATUS  # 従来の import 元のため再公開
+
+
+# --- ステータス定義 ---
+STATUS_DTYPE = pd.CategoricalDtype(STATUS_LIST)
+
+## ステータス → カテゴリのコード
+STATUS_CODES: dict = {s: i for i, s in enumerate(STATUS_LIST)}
+
+CSV_HEADER = "日時,ステータス,経過秒数"
+
+## 日時の標準形式（旧形式 "2026/3/7 5:00" は読み込み時に自動判定へ切り替える）
+DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+## 読み込み時の型（ステータスは読み込み後に固定カテゴリへ変換）
+CSV_DTYPES: dict = {
+    "日時": "object",
+    "ステータス": "object",
+    "経過秒数": "int32",
+}
+
+## pyarrow を使えるか（engine="pyarrow" の指定時のみ使う）
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+
+def to_status_category(values: pd.Series) -> pd.Series:
+    """ステータス列を固定カテゴリに変換する（未定義の値は「不明」扱い）"""
+    status = values.astype(STATUS_DTYPE)
+    unknown = status.isna() & values.notna()
+    if unknown.any():
+        status[unknown] = UNKNOWN_STATUS
+    return status
+
+
+def parse_datetime(values: pd.Series) -> pd.Series:
+    """日時列を標準形式で変換し、合わない行がある場合だけ形式の自動判定に切り替える"""
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    try:
+        return pd.to_datetime(values, format=DATETIME_FORMAT)
+    except ValueError:
+        return pd.to_datetime(values, format="mixed")
+
+
+def _read_fixed_format(path: Path):
+    """
+    標準形式のCSVを pandas の read_csv を通さずに読み込む（1日分は数百行と小さく、
+    read_csv の呼び出しコストの方が大きいため）。形式が違えば None を返す
+    """
+    with open(path, encoding="utf-8-sig") as f:
+        lines = f.read().splitlines()
+
+    if not lines or lines[0] != CSV_HEADER:
+        return None
+    fields = [line.split(",") for line in lines[1:] if line]
+    if not fields:
+        return None
+    if any(len(row) != 3 for row in fields):
+        return None
+
+    timestamps, statuses, seconds = zip(*fields)
+    try:
+        timestamps = np.array(timestamps, dtype="datetime64[s]")
+        seconds = np.array(seconds, dtype="int32")
+    except ValueError:
+        # 旧形式の日時など
+        return None
+
+    codes = np.fromiter(
+        (STATUS_CODES.get(s, STATUS_CODES[UNKNOWN_STATUS]) for s in statuses),
+        dtype="int8",
+        count=len(statuses),
+    )
+    return pd.DataFrame({
+        "日時": timestamps.astype("datetime64[ns]"),
+        "ステータス": pd.Categorical.from_codes(codes, dtype=STATUS_DTYPE),
+        "経過秒数": seconds,
+    })
+
+
+@span("csv_parse")
+def read_status_csv(path: Path, engine: str = "fast") -> pd.DataFrame:
+    """
+    稼働ステータスCSV（日時, ステータス, 経過秒数）を型付きで読み込む
+
+    engine="fast"（既定）は標準形式を直接解析し、形式が違うファイルだけ read_csv で読む。
+    engine="c" / "pyarrow" は常に read_csv を使う（pyarrow が無ければ "c"）。
+    """
+    if engine == "fast":
+        df = _read_fixed_format(path)
+        if df is not None:
+            return df
+        engine = "c"
+    elif engine == "pyarrow" and not HAS_PYARROW:
+        engine = "c"
+
+    df = pd.read_csv(
+        path,
+        encoding="utf-8-sig",  # 日本語対応
+        dtype=CSV_DTYPES,
+        engine=engine,
+    )
+
+    df["日時"] = parse_datetime(df["日時"])
+    df["ステータス"] = to_status_category(df["ステータス"])
+    return df
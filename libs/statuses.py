@@ -0,0 +1,20 @@
+"""
+稼働ステータスの定義
+
+pandas を読み込まないページ（当日稼働など）からも参照できるよう、libs.status_csv から分けている。
+"""
+
+
+# --- ステータス定義 ---
+## ReportConfig.color_map の6種 + 実データに出現する「不明」
+STATUS_LIST: list = [
+    "電源断",
+    "アラーム",
+    "段取り",
+    "自動停止",
+    "自動起動",
+    "パレチェン",
+    "不明",
+]
+
+UNKNOWN_STATUS = "不明"
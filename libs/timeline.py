@@ -0,0 +1,170 @@
+"""
+ステータスのタイムライン（区間配列）
+
+1日分のイベント（日時, ステータス, 経過秒数）を
+稼働日の開始（5:00）からの 開始秒・継続秒・ステータスコード の NumPy 配列に変換し、
+ガントチャートとKPI（ステータス別秒数・電源オン/オフ）の両方がここから求める。
+
+- 区間の開始位置は各行の「日時」（累積の経過秒数ではない）
+- 連続する同一ステータスは merged() で1区間にまとめられる
+- 日時と経過秒数の食い違い（すき間・重なり）は check_continuity() で確認できる
+- 任意の時間帯（日勤 5:00～17:00 など）のステータス別秒数をまとめて求められる
+"""
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from libs.status_csv import STATUS_DTYPE, STATUS_LIST, to_status_category
+
+
+# --- 定数 ---
+DAY_SECONDS = 24 * 3600
+
+## 1日の始まり（5:00）
+DEFAULT_START_HOUR = 5
+
+POWER_OFF_CODE = STATUS_LIST.index("電源断")
+
+
+@dataclass(frozen=True)
+class Timeline:
+    origin: np.datetime64  # 稼働日の開始時刻（秒精度）
+    start: np.ndarray  # int64 origin からの開始秒
+    duration: np.ndarray  # int64 継続秒（CSVの経過秒数）
+    code: np.ndarray  # int8 ステータスコード（STATUS_LIST の位置）
+
+    # --- 作成 ---
+    @classmethod
+    def from_events(
+        cls,
+        df: pd.DataFrame,
+        origin: Optional[np.datetime64] = None,
+        start_hour: int = DEFAULT_START_HOUR,
+    ) -> "Timeline":
+        """
+        1日分のイベントからタイムラインを作る
+
+        origin を省略した場合は、先頭行の日時が属する稼働日の start_hour 時。
+        """
+        timestamps = df["日時"].to_numpy(dtype="datetime64[s]")
+        duration = df["経過秒数"].to_numpy(dtype="int64")
+
+        status = df["ステータス"]
+        if not isinstance(status.dtype, pd.CategoricalDtype) or status.dtype != STATUS_DTYPE:
+            status = to_status_category(status)
+        code = status.cat.codes.to_numpy().astype("int8")
+        code[code < 0] = STATUS_LIST.index("不明")
+
+        offset = np.timedelta64(start_hour * 3600, "s")
+        if origin is None:
+            if len(timestamps):
+                origin = (timestamps[0] - offset).astype("datetime64[D]") + offset
+            else:
+                origin = np.datetime64("NaT", "s")
+        origin = np.datetime64(origin, "s")
+
+        start = (timestamps - origin).astype("int64")
+        return cls(origin, start, duration, code)
+
+    def __len__(self) -> int:
+        return len(self.start)
+
+    @property
+    def end(self) -> np.ndarray:
+        return self.start + self.duration
+
+    @property
+    def statuses(self) -> np.ndarray:
+        return np.asarray(STATUS_LIST, dtype=object)[self.code]
+
+    # --- 変換 ---
+    def merged(self) -> "Timeline":
+        """連続する同一ステータスを1区間にまとめる（継続秒は合計する）"""
+        if len(self) == 0:
+            return self
+        head = np.ones(len(self), dtype=bool)
+        head[1:] = self.code[1:] != self.code[:-1]
+        idx = np.flatnonzero(head)
+        return Timeline(
+            self.origin,
+            self.start[idx],
+            np.add.reduceat(self.duration, idx),
+            self.code[idx],
+        )
+
+    def where(self, mask: np.ndarray) -> "Timeline":
+        return Timeline(self.origin, self.start[mask], self.duration[mask], self.code[mask])
+
+    # --- 検証 ---
+    def check_continuity(self) -> pd.DataFrame:
+        """
+        前の区間の終わり（開始 + 経過秒数）と次の日時の食い違い
+
+        戻り値: 行番号, 種別（すき間 / 重なり）, 秒数 の DataFrame（食い違いが無ければ空）
+        """
+        diff = self.start[1:] - self.end[:-1]
+        idx = np.flatnonzero(diff) + 1
+        return pd.DataFrame({
+            "行": idx,
+            "種別": np.where(diff[idx - 1] > 0, "すき間", "重なり"),
+            "秒数": np.abs(diff[idx - 1]),
+        })
+
+    # --- 集計 ---
+    def status_seconds_in_windows(self, windows) -> np.ndarray:
+        """
+        時間帯ごとのステータス別秒数
+
+        windows: [(開始秒, 終了秒), ...]（origin からの秒）
+        戻り値: shape (時間帯数, len(STATUS_LIST)) の int64 配列
+        """
+        windows = np.asarray(windows, dtype="int64").reshape(-1, 2)
+        # 区間 × 時間帯 の重なり秒数
+        overlap = np.clip(
+            np.minimum(self.end[None, :], windows[:, 1:2]) - np.maximum(self.start[None, :], windows[:, 0:1]),
+            0,
+            None,
+        )
+        result = np.zeros((len(windows), len(STATUS_LIST)), dtype="int64")
+        np.add.at(result, (slice(None), self.code), overlap)
+        return result
+
+    def status_seconds(self, window: Optional[tuple] = None) -> pd.Series:
+        """
+        ステータス別秒数（出現したステータスのみ）
+
+        window を省略した場合は経過秒数の合計（時間帯で切らない）。
+        """
+        if window is None:
+            seconds = np.bincount(self.code, weights=self.duration, minlength=len(STATUS_LIST)).astype("int64")
+            present = np.bincount(self.code, minlength=len(STATUS_LIST)) > 0
+        else:
+            seconds = self.status_seconds_in_windows([window])[0]
+            present = seconds > 0
+
+        summary = pd.Series(seconds[present], index=pd.CategoricalIndex(
+            np.asarray(STATUS_LIST)[present], dtype=STATUS_DTYPE, name="ステータス"
+        ), name="経過秒数")
+        return summary
+
+    def real_work_seconds(self) -> int:
+        """電源断以外の合計秒数"""
+        return int(self.duration[self.code != POWER_OFF_CODE].sum())
+
+    def _timestamp(self, i: int) -> pd.Timestamp:
+        return pd.Timestamp(self.origin + np.timedelta64(int(self.start[i]), "s"))
+
+    def first_power_on(self) -> Optional[pd.Timestamp]:
+        """最初の「電源断 → 電源断以外」の時刻"""
+        off = self.code == POWER_OFF_CODE
+        idx = np.flatnonzero(~off[1:] & off[:-1]) + 1
+        return self._timestamp(idx[0]) if len(idx) else None
+
+    def last_power_off(self) -> Optional[pd.Timestamp]:
+        """最後の「電源断以外 → 電源断」の時刻（先頭行が電源断の場合も含む）"""
+        off = self.code == POWER_OFF_CODE
+        prev_off = np.concatenate([[False], off[:-1]])
+        idx = np.flatnonzero(off & ~prev_off)
+        return self._timestamp(idx[-1]) if len(idx) else None
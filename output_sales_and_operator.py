@@ -1,105 +1,136 @@
+import argparse
 import sqlite3
 from datetime import datetime, timedelta
 from pathlib import Path
 from collections import Counter
+from typing import Optional
+
+from libs.machine_registry import list_machine_names
+from libs.sales_db import upsert_daily_sales
+from libs.settings import SALES_DB_PATH, load_config
 
 
 # --- 定数 ---
-DB_PATH: Path = Path(r"C:\Users\81802\Box\システム開発\H-HUB\machining_completed.db")
-# DB_PATH: Path = Path(r"C:\Users\81802\Box\システム開発\H-HUB\test.db")
-
-## 機械名
-MACHINE_NAME_LIST: list = [
-    "M1-1",
-    "M1-2",
-    "M1-3",
-    "M1-4",
-    "M1-6",
-    "M1-7",
-    "M2-3",
-    "LAB_M1-1",
-    "LAB_M1-3"
-]
-
-## シフト時間
-TIME_RANGE_START_STATUS: dict = {
-    "hour": 5,
-    "mitute": 0,
-    "second": 0
-}
-
-TIME_RANGE_END_STATUS: dict = {
-    "hour": 23,
-    "mitute": 59,
-    "second": 59
-}
-
-DAY_END_STATUS: dict = {
-    "hour": 17,
-    "mitute": 0,
-    "second": 0
-}
-
-NIGHT_START_STATUS: dict = {k: (v + 1 if k == "second" else v) for k, v in DAY_END_STATUS.items()}
+## 抽出元DB・シフト・機械名は config.toml（または環境変数）から実行時に読み込む（load_config）
+## （import しただけで dataset/ の走査やマニフェストの書き込みが起きないよう、モジュールの読み込み時には読まない）
 
 ## SQL
-SQL_REVENUE = """
-SELECT SUM(revenue_total)
-FROM machining_completed
-WHERE unit_name = ?
-AND timestamp BETWEEN ? AND ?
+## 全機械・全日を1回の走査で集計する
+## 稼働日（5:00起点）とシフト（日勤/夜勤）は、開始時刻ぶんずらした時刻から求める
+SQL_FLEET = """
+SELECT unit_name,
+       date(shifted) AS work_date,
+       CASE WHEN time(shifted) <= :day_end THEN 'day' ELSE 'night' END AS shift,
+       operator_name,
+       COUNT(*) AS cnt,
+       SUM(revenue_total) AS revenue
+FROM (
+    SELECT unit_name, operator_name, revenue_total,
+           datetime(timestamp, :offset) AS shifted
+    FROM machining_completed
+    WHERE unit_name IN ({units})
+    AND timestamp BETWEEN :range_start AND :range_end
+)
+GROUP BY unit_name, work_date, shift, operator_name
 """
 
-SQL_OPERATOR = """
-SELECT operator_name
-FROM machining_completed
-WHERE unit_name = ?
-AND timestamp BETWEEN ? AND ?
-GROUP BY operator_name
-ORDER BY COUNT(*) DESC
-LIMIT 1
+## 推奨インデックス（unit_name, timestamp で範囲検索し、残りの列も索引だけで読める）
+SQL_CREATE_INDEX = """
+CREATE INDEX IF NOT EXISTS idx_machining_completed_unit_timestamp
+ON machining_completed (unit_name, timestamp, operator_name, revenue_total)
 """
 
 
-def create_time(target_date: str):
+def machine_names(config: dict) -> list:
+    """機械名（設定が空なら dataset/ と sales.db から検出した機械）"""
+    return config["machines"] or list_machine_names()
+
+
+def create_time(target_date: str, config: Optional[dict] = None):
     """
     指定日の加工集計時間を作成する
 
-    5:00:00 ～ 翌日 4:59:59
+    5:00:00 ～ 翌日 4:59:59（シフト時間は config.toml の [shift]）
     """
+    config = config or load_config()
+    start_status, day_end_status = config["shift_start"], config["day_end"]
+
     time_range_start = datetime.strptime(target_date, "%Y-%m-%d").replace(
-        hour=TIME_RANGE_START_STATUS["hour"], minute=TIME_RANGE_START_STATUS["mitute"], second=TIME_RANGE_START_STATUS["second"]
+        hour=start_status["hour"], minute=start_status["mitute"], second=start_status["second"]
     )
 
-    day_end = time_range_start.replace(hour=DAY_END_STATUS["hour"], minute=DAY_END_STATUS["mitute"], second=DAY_END_STATUS["second"])
+    day_end = time_range_start.replace(hour=day_end_status["hour"], minute=day_end_status["mitute"], second=day_end_status["second"])
     night_start = day_end + timedelta(seconds=1)
     time_range_end = time_range_start + timedelta(days=1) - timedelta(seconds=1)
 
     return time_range_start, day_end, night_start, time_range_end
 
 
-def fetch_total_revenue_and_oeprator_for_machine(cur, machine_name, time_range_start, day_end, night_start, time_range_end):
-    """機械から売上・担当者を取得する関数"""
-    # 売上取得
-    cur.execute(SQL_REVENUE, (machine_name, time_range_start, time_range_end))
-    revenue = cur.fetchone()[0] or 0
+def _seconds_of(status: dict) -> int:
+    return status["hour"] * 3600 + status["mitute"] * 60 + status["second"]
 
-    # 日勤担当者
-    cur.execute(SQL_OPERATOR, (machine_name, time_range_start, day_end))
-    r = cur.fetchone()
-    day_operator = r[0] if r else ""
 
-    # 夜勤担当者
-    cur.execute(SQL_OPERATOR, (machine_name, night_start, time_range_end))
-    r = cur.fetchone()
-    night_operator = r[0] if r else ""
+def fetch_fleet_revenue_and_operator(
+    cur,
+    machine_names: list,
+    start_date: str,
+    end_date: str,
+    config: Optional[dict] = None,
+) -> dict:
+    """
+    全機械・全日の売上・担当者を1クエリで取得する関数
 
-    return {
-        "revenue": revenue,
-        "day_operator": day_operator,
-        "night_operator": night_operator,
+    戻り値: {"YYYY-MM-DD": {機械名: {"revenue", "day_operator", "night_operator", "has_source"}}}
+    has_source は抽出元に (日, 機械) の行が1件でもあったか（無ければ 0 / 空欄のまま）
+    """
+    config = config or load_config()
+    range_start, _, _, _ = create_time(start_date, config)
+    _, _, _, range_end = create_time(end_date, config)
+
+    start_sec = _seconds_of(config["shift_start"])
+    day_end = timedelta(seconds=_seconds_of(config["day_end"]) - start_sec)
+
+    sql = SQL_FLEET.format(units=", ".join(f":u{i}" for i in range(len(machine_names))))
+    params = {
+        "offset": f"-{start_sec} seconds",
+        "day_end": f"{day_end.seconds // 3600:02d}:{day_end.seconds // 60 % 60:02d}:{day_end.seconds % 60:02d}",
+        "range_start": range_start.strftime("%Y-%m-%d %H:%M:%S"),
+        "range_end": range_end.strftime("%Y-%m-%d %H:%M:%S"),
+        **{f"u{i}": name for i, name in enumerate(machine_names)},
     }
 
+    # 日付 × 機械 の器を先に作る（データの無い機械も 0 / 空欄で出力する）
+    result = {}
+    day = datetime.strptime(start_date, "%Y-%m-%d")
+    while day <= datetime.strptime(end_date, "%Y-%m-%d"):
+        result[day.strftime("%Y-%m-%d")] = {
+            name: {"revenue": 0, "day_operator": "", "night_operator": "", "has_source": False}
+            for name in machine_names
+        }
+        day += timedelta(days=1)
+
+    # (機械, 日, シフト) ごとの担当者別件数
+    counts: dict = {}
+    for unit_name, work_date, shift, operator_name, cnt, revenue in cur.execute(sql, params):
+        if work_date not in result:
+            continue
+        result[work_date][unit_name]["revenue"] += revenue or 0
+        result[work_date][unit_name]["has_source"] = True
+        counts.setdefault((work_date, unit_name, shift), Counter())[operator_name] += cnt
+
+    # 最も件数の多い担当者（同数なら名前順で先のもの）
+    for (work_date, unit_name, shift), counter in counts.items():
+        operator_name = min(counter.items(), key=lambda kv: (-kv[1], kv[0] or ""))[0]
+        result[work_date][unit_name][f"{shift}_operator"] = operator_name
+
+    return result
+
+
+def create_index(conn):
+    """推奨インデックスを作成する関数"""
+    conn.execute(SQL_CREATE_INDEX)
+    conn.commit()
+
 
 def apply_multi_flag(result: dict):
     """同じ担当者が複数機械にいる場合「マルチ」を付与する関数"""
@@ -116,34 +147,127 @@ def apply_multi_flag(result: dict):
         v["night_multi"] = "マルチ" if night_counts[v["night_operator"]] > 1 else ""
 
 
+def to_sales_rows(results: dict, zero_fill: bool = False) -> list:
+    """
+    集計結果（マルチ判定済み）を sales.db の行 (machine, date, sale, ...) に変換する関数
+
+    抽出元に行の無い (日, 機械) は、zero_fill=True のときだけ 0 / 空欄の行にする
+    （抽出元が削除済みの期間などで、sales.db の値を 0 で上書きしないため）
+    """
+    return [
+        (
+            unit,
+            target_date,
+            v["revenue"],
+            v["day_operator"],
+            v["day_multi"],
+            v["night_operator"],
+            v["night_multi"],
+        )
+        for target_date, result in results.items()
+        for unit, v in result.items()
+        if zero_fill or v["has_source"]
+    ]
+
+
+def sync_sales(
+    cur,
+    start_date: str,
+    end_date: str,
+    sales_db_path: Path = SALES_DB_PATH,
+    zero_fill: bool = False,
+    machines: Optional[list] = None,
+    config: Optional[dict] = None,
+) -> dict:
+    """
+    期間の売上・担当者・マルチを集計し、sales.db に1トランザクションで反映する関数
+
+    machines を省略すると設定の機械（machine_names）を対象にする。
+    戻り値は upsert_daily_sales の件数に、抽出元に行が無く書き込まなかった件数 "skipped" を加えたもの
+    """
+    config = config or load_config()
+    machines = machines or machine_names(config)
+    results = fetch_fleet_revenue_and_operator(cur, machines, start_date, end_date, config)
+
+    for result in results.values():
+        apply_multi_flag(result)
+
+    rows = to_sales_rows(results, zero_fill)
+    counts = upsert_daily_sales(rows, sales_db_path)
+    counts["skipped"] = sum(len(result) for result in results.values()) - len(rows)
+    return counts
+
+
+def _date_arg(value: str) -> str:
+    """YYYY-MM-DD を検証し、文字列のまま返す（集計関数は文字列で受け取るため）"""
+    try:
+        datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"YYYY-MM-DD の日付ではありません: {value}")
+    return value
+
+
 def main():
-    target_date = "2026-03-15"
-    time_range_start, day_end, night_start, time_range_end = create_time(target_date)
+    parser = argparse.ArgumentParser(description="機械ごとの売上・担当者を集計する")
+    parser.add_argument("--date", type=_date_arg, default="2026-03-15", help="対象日 YYYY-MM-DD")
+    parser.add_argument("--from", dest="start_date", type=_date_arg, help="期間集計の開始日 YYYY-MM-DD")
+    parser.add_argument(
+        "--to",
+        dest="end_date",
+        type=_date_arg,
+        help="期間集計の終了日 YYYY-MM-DD（--from と併用。省略時は --from の1日だけ）",
+    )
+    parser.add_argument("--create-index", action="store_true", help="推奨インデックスを作成してから集計する")
+    parser.add_argument("--sync", action="store_true", help="集計結果を sales.db に書き込む")
+    parser.add_argument("--sales-db", type=Path, default=SALES_DB_PATH, help="書き込み先の売上DB")
+    parser.add_argument(
+        "--zero-fill",
+        action="store_true",
+        help="--sync で、抽出元に行の無い日・機械も売上 0 / 担当者空欄で書き込む",
+    )
+    args = parser.parse_args()
 
-    result = {}
-    with sqlite3.connect(DB_PATH) as conn:
+    if args.end_date and not args.start_date:
+        parser.error("--to は --from と併用してください")
+
+    start_date = args.start_date or args.date
+    end_date = args.end_date or start_date
+
+    if start_date > end_date:
+        parser.error(f"--from {start_date} が --to {end_date} より後です")
+
+    config = load_config()
+    machines = machine_names(config)
+
+    with sqlite3.connect(config["db_path"]) as conn:
+        if args.create_index:
+            create_index(conn)
         cur = conn.cursor()
-        for machine_name in MACHINE_NAME_LIST:
-            result[machine_name] = fetch_total_revenue_and_oeprator_for_machine(
-                cur,
-                machine_name,
-                time_range_start,
-                day_end,
-                night_start,
-                time_range_end,
+
+        if args.sync:
+            counts = sync_sales(cur, start_date, end_date, args.sales_db, args.zero_fill, machines, config)
+            print(
+                f"✅ sales.db 反映: 追加 {counts['inserted']} 件 / "
+                f"更新 {counts['updated']} 件 / 変更なし {counts['unchanged']} 件 / "
+                f"抽出元なし {counts['skipped']} 件"
             )
+            return
 
-    # マルチ判定
-    apply_multi_flag(result)
+        results = fetch_fleet_revenue_and_operator(cur, machines, start_date, end_date, config)
 
-    # 出力
-    for unit, v in result.items():
-        print(
-            f"{unit} -> "
-            f"売上: {v['revenue']}、"
-            f"日勤: {v['day_operator']} {v['day_multi']}、"
-            f"夜勤: {v['night_operator']} {v['night_multi']}"
-        )
+    for target_date, result in results.items():
+        # マルチ判定（日ごと）
+        apply_multi_flag(result)
+
+        # 出力
+        print(f"--- {target_date} ---")
+        for unit, v in result.items():
+            print(
+                f"{unit} -> "
+                f"売上: {v['revenue']}、"
+                f"日勤: {v['day_operator']} {v['day_multi']}、"
+                f"夜勤: {v['night_operator']} {v['night_multi']}"
+            )
 
 
 if __name__ == "__main__":
@@ -1,9 +1,12 @@
 import streamlit as st
-import pandas as pd
-import os
-import sqlite3
-import matplotlib.pyplot as plt
-from datetime import timedelta
+from datetime import datetime, timedelta
+
+from libs.debug_panel import show_debug_panel, start_profile
+from libs.machine_registry import date_bounds, get_registry
+from libs.manifest import get_manifest
+from libs.profiling import span
+
+## 集計・グラフ（pyarrow・matplotlib・altair）は結果を表示するときに初めて読み込む
 
 # -----------------------------
 # ページ設定
@@ -11,10 +14,17 @@ from datetime import timedelta
 st.set_page_config(page_title="期間分析", layout="wide")
 st.title("📈 期間分析ダッシュボード")
 
+## 処理時間の計測（?debug=1 または MACHINING_PROFILE=1 のときだけ）
+start_profile("analysis")
+
 # -----------------------------
 # サイドバー
 # -----------------------------
-machines = ["M1-1", "M1-2", "M1-3", "M1-4", "M1-6", "M1-7", "M1-8", "M2-3", "LAB_M1-1", "LAB_M1-3"]
+registry = get_registry()
+machines = list(registry)
+
+## 最後に実行した条件（ヒートマップの操作や日次ページから戻った後も結果を表示し続ける）
+params = st.session_state.get("analysis_params")
 
 with st.sidebar:
 
@@ -23,122 +33,43 @@ with st.sidebar:
     selected_machines = st.multiselect(
         "機械名選択",
         machines,
-        # default=machines
+        default=[m for m in params["machines"] if m in machines] if params else None,
     )
 
+    # 選択した機械（未選択なら全機械）のデータがある期間に限定する
+    first_date, last_date = date_bounds(selected_machines or machines, registry)
+    default_end = datetime.now().date() - timedelta(days=1)
+    if last_date is not None:
+        default_end = min(max(default_end, first_date), last_date)
+    default_start = default_end - timedelta(days=6)
+    if first_date is not None:
+        default_start = max(default_start, first_date)
+
+    # 前回の期間は、今の選択でデータがある期間に収まるときだけ引き継ぐ
+    if params and (
+        first_date is None
+        or first_date <= params["start_date"] <= params["end_date"] <= last_date
+    ):
+        default_start, default_end = params["start_date"], params["end_date"]
+
     date_range = st.date_input(
         "日付範囲",
-        value=(
-            pd.Timestamp.today() - timedelta(days=7),
-            pd.Timestamp.today() - timedelta(days=1)
-        )
+        value=(default_start, default_end),
+        min_value=first_date,
+        max_value=last_date,
     )
 
     submitted = st.button("実行")
 
 # -----------------------------
-# CSV読み込み
+# 期間分析の結果一式
 # -----------------------------
-@st.cache_data
-def load_csv(path):
-    return pd.read_csv(path)
-
-
-def load_multiple_csv(selected_machines, start_date, end_date):
-
-    all_df = []
-    date_list = pd.date_range(start_date, end_date)
-
-    for machine in selected_machines:
-        for date in date_list:
-
-            filename = date.strftime("%Y%m%d") + ".csv"
-            path = os.path.join("dataset", machine, filename)
+def load_period_result(selected_machines, start_date, end_date):
+    # (機械, 期間, データのバージョン) で結果をキャッシュ（CSV・sales.db が変われば再集計）
+    from libs.period_analysis import analyze_period
 
-            if os.path.exists(path):
-                df = load_csv(path)
-                all_df.append(df)
-
-    if all_df:
-        return pd.concat(all_df, ignore_index=True)
-    else:
-        return pd.DataFrame()
-
-# -----------------------------
-# 売上合算取得
-# -----------------------------
-def get_total_sales(selected_machines, start_date, end_date):
-
-    conn = sqlite3.connect("dataset/sales.db")
-    cursor = conn.cursor()
-
-    total_sales = 0
-    date_list = pd.date_range(start_date, end_date)
-
-    for machine in selected_machines:
-        for date in date_list:
-
-            formatted = date.strftime("%Y-%m-%d")
-
-            try:
-                cursor.execute(
-                    f"SELECT sale FROM '{machine}' WHERE date = ?",
-                    (formatted,)
-                )
-                result = cursor.fetchone()
-
-                if result:
-                    total_sales += result[0]
-
-            except:
-                pass
-
-    conn.close()
-    return total_sales
-
-# -----------------------------
-# 円グラフ描画（指定仕様）
-# -----------------------------
-def draw_pie_chart(df):
-
-    status_order = [
-        "自動起動",
-        "自動停止",
-        "段取り",
-        "アラーム",
-        "電源断"
-    ]
-
-    color_map = {
-        "電源断": "gray",
-        "アラーム": "red",
-        "段取り": "yellow",
-        "自動停止": "green",
-        "自動起動": "#1E90FF",
-    }
-
-    summary = df.groupby("ステータス")["経過秒数"].sum()
-
-    summary = summary.reindex(status_order, fill_value=0)
-
-    hours = summary / 3600
-
-    fig, ax = plt.subplots(figsize=(4.5, 4.5))
-
-    ax.pie(
-        hours,
-        labels=hours.index,
-        colors=[color_map[s] for s in hours.index],
-        autopct="%1.1f%%",
-        startangle=90,
-        counterclock=False
-    )
-
-    ax.set_title("ステータス内訳（時間比率）", fontsize=12)
-
-    plt.tight_layout()
-
-    return fig, summary
+    with span("aggregate"):
+        return analyze_period(selected_machines, start_date, end_date)
 
 # -----------------------------
 # 実行処理
@@ -159,22 +90,34 @@ if submitted:
         st.warning("日付範囲が不正です")
         st.stop()
 
-    # CSV読込
-    df = load_multiple_csv(selected_machines, start_date, end_date)
+    params = {
+        "machines": selected_machines,
+        "start_date": start_date,
+        "end_date": end_date,
+    }
+    st.session_state["analysis_params"] = params
+
+if params:
+    from libs.analysis_charts import draw_pie_chart
+    from libs.fleet_heatmap import METRICS, TREND_WINDOW, build_heatmap, metric_matrix, selected_cell, trend_frame
+    from libs.shifts import operator_kpis, shift_bounds, shift_kpis
+
+    selected_machines = params["machines"]
+    start_date, end_date = params["start_date"], params["end_date"]
+
+    result = load_period_result(selected_machines, start_date, end_date)
 
-    if df.empty:
+    # ステータス別秒数
+    summary_all = result.status_seconds
+
+    if summary_all.empty:
         st.warning("該当データがありません")
         st.stop()
 
-    # 売上合算取得
-    total_sales = get_total_sales(
-        selected_machines,
-        start_date,
-        end_date
-    )
+    # 売上合算
+    total_sales = result.total_sales
 
     # KPI計算
-    summary_all = df.groupby("ステータス")["経過秒数"].sum()
     real_work_time = summary_all.sum() / 3600
 
     unit_price = (
@@ -196,6 +139,15 @@ if submitted:
         """
     )
 
+    # 期間内でデータの無い日数（日付マニフェストから求める）
+    missing_text = [
+        f"{m}: {len(missing)}日"
+        for m in selected_machines
+        if (missing := get_manifest(m).missing_dates(start_date, end_date))
+    ]
+    if missing_text:
+        st.caption("データの無い日 → " + " ／ ".join(missing_text))
+
     st.divider()
 
     # -------------------------
@@ -205,8 +157,10 @@ if submitted:
 
     # 左：円グラフ
     with col_left:
-        fig, summary = draw_pie_chart(df)
-        st.pyplot(fig)
+        with span("figure"):
+            fig, summary = draw_pie_chart(summary_all)
+        with span("render"):
+            st.pyplot(fig)
 
     # 右：KPI
     with col_right:
@@ -233,9 +187,141 @@ if submitted:
 
     st.dataframe(
         summary_hours.rename("時間(h)").reset_index(),
-        use_container_width=True
+        width="stretch"
+    )
+
+    st.divider()
+
+    # -------------------------
+    # 機械×日 ヒートマップ・稼働推移
+    # -------------------------
+    st.subheader("機械×日 ヒートマップ")
+
+    metric = st.radio("指標", list(METRICS), horizontal=True, key="heatmap_metric")
+    st.caption(METRICS[metric])
+
+    # 日次ロールアップの 機械×日 行列から求める（CSVは読まない）
+    dates = result.dates
+    values = metric_matrix(result.daily_seconds, metric)
+
+    with span("figure"):
+        heatmap = build_heatmap(result.machines, dates, values, metric)
+    with span("render"):
+        event = st.altair_chart(
+            heatmap,
+            on_select="rerun",
+            key="heatmap",
+            width="stretch",
+        )
+
+    ## セルを選ぶと、その機械・日の日次レポートへ移動できる
+    cell_machine, cell_date = selected_cell(event)
+    if cell_machine:
+        if st.button(f"📅 {cell_machine} {cell_date.strftime('%Y/%m/%d')} の日次レポートを開く"):
+            st.session_state["drilldown"] = {"machine": cell_machine, "date": cell_date}
+            st.switch_page("pages/daily.py")
+    else:
+        st.caption("セルをクリックすると、その機械・日の日次レポートを開けます")
+
+    st.subheader(f"稼働推移（{TREND_WINDOW}日移動平均）")
+    st.line_chart(trend_frame(result.machines, dates, values), y_label=f"{metric}(%)")
+
+    st.divider()
+
+    # -------------------------
+    # 機械別売上・担当者ランキング
+    # -------------------------
+    col_fleet, col_operator = st.columns([1, 1])
+
+    with col_fleet:
+        st.subheader("機械別売上")
+        fleet_df = result.fleet
+        st.dataframe(
+            fleet_df.rename(columns={
+                "machine": "機械名",
+                "days": "日数",
+                "sale": "売上(円)",
+                "sale_per_day": "1日平均(円)",
+            }).round(0),
+            width="stretch",
+            hide_index=True,
+        )
+
+    with col_operator:
+        st.subheader("担当者別売上ランキング")
+        operator_df = result.operators
+        st.dataframe(
+            operator_df.rename(columns={
+                "operator": "担当者",
+                "shifts": "担当シフト数",
+                "sale": "売上(円)",
+            }).round(0),
+            width="stretch",
+            hide_index=True,
+        )
+
+    st.divider()
+
+    # -------------------------
+    # シフト別・担当者別の稼働効率
+    # -------------------------
+    st.subheader("シフト別・担当者別の稼働効率")
+    day_start, boundary = shift_bounds()
+    day_end = (day_start + boundary) % (24 * 3600)
+    st.caption(
+        f"{day_end // 3600:02d}:{day_end // 60 % 60:02d}をまたぐ区間は境目で分けて集計。"
+        "売上はその日の自動起動時間の比で日勤・夜勤に按分"
     )
 
+    # 機械×月 の部分結果から組み立てたシフト別明細
+    shift_detail_df = result.shift_detail
+
+    kpi_columns = {
+        "shift": "シフト",
+        "operator": "担当者",
+        "shifts": "シフト数",
+        "sale": "売上(円)",
+        "real_work_hours": "稼働時間(h)",
+        "unit_price": "￥/h",
+        "idle_rate": "遊休率(%)",
+    }
+
+    with span("aggregate"):
+        shift_kpi_df = shift_kpis(shift_detail_df)
+        operator_kpi_df = operator_kpis(shift_detail_df)
+
+    col_shift, col_shift_operator = st.columns([1, 2])
+
+    with col_shift:
+        st.dataframe(
+            shift_kpi_df.rename(columns=kpi_columns).round(1),
+            width="stretch",
+            hide_index=True,
+        )
+
+    with col_shift_operator:
+        st.dataframe(
+            operator_kpi_df.rename(columns=kpi_columns).round(1),
+            width="stretch",
+            hide_index=True,
+        )
+
+    st.divider()
+
+    # -------------------------
+    # イベント明細（集計には使わない。表示を選んだときだけ読み込む）
+    # -------------------------
+    if st.checkbox("イベント明細を表示", key="show_events", help="期間内の全イベントを読み込むため、期間が長いと時間がかかります"):
+        from libs.event_store import load_events
+
+        with span("csv_parse"):
+            events_df = load_events(selected_machines, start_date, end_date)
+        st.caption(f"{len(events_df):,} 行")
+        with span("render"):
+            st.dataframe(events_df, width="stretch", hide_index=True)
+
 
 else:
-    st.html("<strong style='color: blue;'>左のサイドバーで条件を選択して、「実行」ボタンを押してください。</strong>")
\ No newline at end of file
+    st.html("<strong style='color: blue;'>左のサイドバーで条件を選択して、「実行」ボタンを押してください。</strong>")
+
+show_debug_panel(params)
@@ -1,120 +1,178 @@
 import streamlit as st
-import pandas as pd
 from datetime import datetime, timedelta
-from pathlib import Path
-import sqlite3
 
-from libs.graph_blueprint import ReportConfig, MachineDailyReport
+from libs.debug_panel import show_debug_panel, start_profile
+from libs.machine_registry import get_registry
+from libs.manifest import get_manifest
+from libs.profiling import counted_cache, span
+from libs.report_cache import get_report_image
+from libs.result_cache import sales_version
+from libs.sales_db import fetch_daily_sale
 
-BASE_DIR: Path = Path(__file__).resolve().parent.parent
-DATASET_DIR: Path = BASE_DIR / "dataset"
-DB_PATH: Path = DATASET_DIR / "sales.db"
+## 描画・イベント読み込み（matplotlib・plotly・pyarrow）は「実行」後に初めて読み込む
 
+@counted_cache(st.cache_data(max_entries=1024)) # 件数の上限つき（ヒット/ミスを数える）
+def get_sale(machine_name: str, selected_date, version: str):
+    # version は sales.db のバージョン（同期で書き換わったら別のキーになる）
+    # (売上, 日勤担当, 日勤マルチ, 夜勤担当, 夜勤マルチ)
+    return fetch_daily_sale(machine_name, selected_date)
 
-@st.cache_data(ttl=3600) # 1時間
-def load_csv(path: Path):
-    return pd.read_csv(
-        path,
-        encoding="utf-8-sig"  # 日本語対応
-    )
-
-@st.cache_data(ttl=3600) # 1時間
-def get_sale(machine_name: str, selected_date):
-
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
 
-    # YYYY-mm-dd形式
-    date_str = selected_date.strftime("%Y-%m-%d")
+def generate_report(df, config, summary=None):
+    from libs.graph_blueprint import MachineDailyReport
 
-    query = f"""
-        SELECT sale, day_operator, day_multi, night_operator, night_multi
-        FROM "{machine_name}"
-        WHERE date = ?
-        LIMIT 1
-        """
-
-    cursor.execute(query, (date_str,))
-    result = cursor.fetchone()
-
-    conn.close()
-
-    if result:
-        sales_amount, day_operator, day_multi, night_operator, night_multi = result
-        return sales_amount, day_operator, day_multi, night_operator, night_multi
-    else:
-        return 0, None, None, None, None
-
-
-@st.cache_data(ttl=3600) # 1時間
-def generate_report(df, config):
-    report = MachineDailyReport(df, config)
-    return report.draw()
+    with span("figure"):
+        report = MachineDailyReport(df, config, summary)
+        return report.draw()
 
 
 # --- タイトル ---
 st.set_page_config(page_title="日次分析", layout="wide")
 st.title("📅 日次ダッシュボード")
 
+## 処理時間の計測（?debug=1 または MACHINING_PROFILE=1 のときだけ）
+start_profile("daily")
+
 
 # --- サイドバー ---
+registry = get_registry()
+
+## 期間分析のヒートマップから開いた場合は、その機械・日をすぐに表示する
+## （index / value で渡すと次の再実行で既定値に戻るため、ウィジェットの状態に入れる）
+drilldown = st.session_state.pop("drilldown", None)
+if drilldown is not None and drilldown["machine"] not in registry:
+    drilldown = None
+if drilldown is not None:
+    st.session_state["daily_machine"] = drilldown["machine"]
+    st.session_state["daily_date"] = drilldown["date"]
+
+## 機械名（選択に合わせて日付の範囲を変えるため、フォームの外に置く）
+machine_name = st.sidebar.selectbox("機械名を選択", list(registry), key="daily_machine")
+machine_info = registry[machine_name]
+
+## 日付の初期値は前日。データのある期間の外になったら範囲内に寄せる
+selected_date = st.session_state.get("daily_date", datetime.now().date() - timedelta(days=1))
+if machine_info.has_data:
+    selected_date = min(max(selected_date, machine_info.first_date), machine_info.last_date)
+if st.session_state.get("daily_date") != selected_date:
+    st.session_state["daily_date"] = selected_date
+
 with st.sidebar.form(key="filter_form"):
     st.header("フィルタ設定")
 
-    ## 機械名
-    machine_name = st.selectbox(
-        "機械名を選択",
-        ["M1-1", "M1-2", "M1-3", "M1-4", "M1-6", "M1-7", "M1-8", "M2-3", "LAB_M1-1", "LAB_M1-3"]
-    )
-
-    ## 日付
-    yesterday = datetime.now().date() - timedelta(days=1)
-
+    ## 日付（データのある期間に限定する）
     selected_date = st.date_input(
         "日付を選択",
-        value=yesterday
+        min_value=machine_info.first_date,
+        max_value=machine_info.last_date,
+        key="daily_date",
+    )
+
+    ## 描画モード
+    render_mode = st.radio(
+        "描画モード",
+        ["静止画", "インタラクティブ"],
+        horizontal=True,
     )
 
     ## 実行ボタン
-    submitted_btn = st.form_submit_button("実行")
+    submitted_btn = st.form_submit_button("実行") or drilldown is not None
+
+## データの無い日（日付ピッカーでは日ごとに無効化できないため一覧で示す）
+manifest = get_manifest(machine_name)
+if machine_info.has_data:
+    missing = manifest.missing_dates(machine_info.first_date, machine_info.last_date)
+    if missing:
+        st.sidebar.caption(
+            "データなし: "
+            + "、".join(d.strftime("%m/%d") for d in missing[-10:])
+            + (f" ほか{len(missing) - 10}日" if len(missing) > 10 else "")
+        )
 
 
 # --- 実行後の処理 ---
 if submitted_btn:
-    file_name = f"{selected_date.strftime("%Y%m%d")}.csv"
-    file_path = DATASET_DIR / machine_name / file_name
-
-    if file_path.exists():
+    from libs.daily_report import make_report_config
+    from libs.event_store import load_day
+    from libs.graph_blueprint import MachineDailyReport
+    from libs.interactive_gantt import build_gantt_figure
+    from libs.rollup import get_day_summary, refresh_rollup
+    from libs.timeline import Timeline
+
+    day_summary = None
+    df = None
+    if manifest.has(selected_date):
+        # KPI（ステータス別秒数・電源オン/オフ）は日次ロールアップから取得
+        with span("aggregate"):
+            refresh_rollup([machine_name], start_date=selected_date, end_date=selected_date)
+            day_summary = get_day_summary(machine_name, selected_date)
+        # 生イベントはガントチャートと明細表示にだけ使う
+        if day_summary is not None:
+            with span("csv_parse"):
+                df = load_day(machine_name, selected_date)
+
+    if df is not None:
         st.success("データ読み込み成功")
-        df = load_csv(file_path)
-        df["日時"] = pd.to_datetime(df["日時"], format="mixed")
-        mask_on = (df["ステータス"] != "電源断") & (df["ステータス"].shift() == "電源断")
-        on_rows = df.loc[mask_on, "日時"]
-        on_time = on_rows.iloc[0].strftime("%H:%M:%S") if not on_rows.empty else None
-
-        mask_off = (df["ステータス"] == "電源断") & (df["ステータス"].shift() != "電源断")
-        off_rows = df.loc[mask_off, "日時"]
-        off_time = off_rows.iloc[-1].strftime("%H:%M:%S") if not off_rows.empty else None
-        sales_amount, day_operator, day_multi, night_operator, night_multi = get_sale(machine_name, selected_date)
-        config = ReportConfig(
-            machine_name=f"{machine_name}",
-            report_date=selected_date.strftime("%Y/%m/%d"),
-            sales_amount=sales_amount,
-            on_time=on_time,
-            off_time=off_time,
-            day_operator=day_operator,
-            day_multi=day_multi,
-            night_operator=night_operator,
-            night_multi=night_multi,
+        sale_row = get_sale(machine_name, selected_date, sales_version())
+        config = make_report_config(
+            machine_name,
+            selected_date,
+            day_summary,
+            sale_row,
         )
-        fig = generate_report(df, config)
-        st.pyplot(fig)
-        st.dataframe(df)
+
+        # 日時と経過秒数の食い違い（ガントは日時の位置に描くため、重なりやすき間として現れる）
+        with span("aggregate"):
+            gaps = Timeline.from_events(df, start_hour=config.start_hour).check_continuity()
+        if not gaps.empty:
+            counts = gaps.groupby("種別")["秒数"].agg(["count", "sum"])
+            st.warning(
+                "日時と経過秒数が食い違う行があります: "
+                + " ／ ".join(f"{kind} {row['count']} 件（計 {row['sum']:,} 秒）" for kind, row in counts.iterrows())
+            )
+            with st.expander("食い違いの明細"):
+                st.dataframe(
+                    gaps.assign(日時=df["日時"].to_numpy()[gaps["行"]]),
+                    hide_index=True,
+                )
+
+        if render_mode == "インタラクティブ":
+            # 圧縮した区間データだけを送り、ズームはブラウザ側で行う
+            with span("figure"):
+                report = MachineDailyReport(df, config, day_summary.status_seconds)
+                gantt = build_gantt_figure(report)
+            with span("render"):
+                st.plotly_chart(gantt, width="stretch")
+
+            col1, col2, col3, col4 = st.columns(4)
+            col1.metric("売上", f"￥{config.sales_amount:,}")
+            col2.metric("￥/h", f"￥{int(report.unit_price):,}")
+            col3.metric("遊休時間", f"{report.idle_time:.2f} h")
+            col4.metric("遊休％", f"{report.idle_rate:.1f} %")
+        else:
+            # 描画済みPNGのディスクキャッシュ（CSV・売上行が変わらなければ再描画しない）
+            image = get_report_image(
+                machine_name,
+                selected_date,
+                sale_row,
+                lambda: generate_report(df, config, day_summary.status_seconds),
+            )
+            with span("render"):
+                st.image(image, width="stretch")
+        with span("render"):
+            st.dataframe(df)
+    elif day_summary is not None:
+        # ヘッダー行だけのCSV（日付が変わった直後など）はロールアップ行はあるがイベントが無い
+        st.info(f"{selected_date.strftime('%Y/%m/%d')} のイベントはまだ記録されていません")
     else:
-        st.error("該当ファイルが存在しません")
-        st.write(file_path)
+        before, after = manifest.nearest(selected_date)
+        st.error(f"{selected_date.strftime('%Y/%m/%d')} のデータはありません")
+        st.write(
+            f"前のデータ: {before.strftime('%Y/%m/%d') if before else '-'} ／ "
+            f"次のデータ: {after.strftime('%Y/%m/%d') if after else '-'}"
+        )
 
 else:
     st.html("<strong style='color: blue;'>左のサイドバーで条件を選択して、「実行」ボタンを押してください。</strong>")
 
-
+show_debug_panel({"machine": machine_name, "date": selected_date, "submitted": bool(submitted_btn)})
@@ -0,0 +1,85 @@
+import streamlit as st
+from datetime import datetime, timedelta
+
+from libs.live_tail import StatusTail
+from libs.machine_registry import list_machine_names
+from libs.manifest import get_manifest
+from libs.settings import DATASET_DIR
+
+## 更新間隔（秒）
+REFRESH_SECONDS = 30
+
+## 1日の始まり（5:00）
+DAY_START_HOUR = 5
+
+
+@st.cache_resource(max_entries=64)
+def get_tail(path: str) -> StatusTail:
+    # ファイルごとに1つのリーダーを全セッションで共有する（読み込み位置を覚えている）
+    return StatusTail(path)
+
+
+def operating_date(now: datetime):
+    # 5:00前は前日の稼働日扱い
+    return (now - timedelta(hours=DAY_START_HOUR)).date()
+
+
+# --- タイトル ---
+st.set_page_config(page_title="当日稼働", layout="wide")
+st.title("⏱ 当日稼働モニター")
+
+
+# --- サイドバー ---
+with st.sidebar:
+    st.header("表示設定")
+
+    ## 機械名
+    machine_name = st.selectbox(
+        "機械名を選択",
+        list_machine_names()
+    )
+
+
+@st.fragment(run_every=REFRESH_SECONDS)
+def live_view(machine_name: str):
+    # 稼働日は自動更新のたびに求め直す（5:00 をまたいだら新しい日のファイルに切り替わる）
+    target_date = operating_date(datetime.now())
+    st.caption(f"稼働日：{target_date.strftime('%Y/%m/%d')}")
+
+    file_path = DATASET_DIR / machine_name / f"{target_date.strftime('%Y%m%d')}.csv"
+
+    if not get_manifest(machine_name).has(target_date):
+        st.warning("当日のデータがまだありません")
+        st.write(file_path)
+        return
+
+    # 追記された行だけを読み込む
+    tail = get_tail(str(file_path))
+    tail.poll()
+
+    if tail.rows == 0:
+        st.info("データ待ち")
+        return
+
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("現在のステータス", tail.last_status)
+    col2.metric("電源オン", tail.power_on_time.strftime("%H:%M:%S") if tail.power_on_time else "-")
+    col3.metric("稼働時間", f"{tail.real_work_time:.2f} h")
+    col4.metric("最終更新", tail.last_timestamp.strftime("%H:%M:%S"))
+
+    st.divider()
+
+    # --- ステータス別時間 ---
+    st.subheader("ステータス別時間（時間）")
+    summary_hours = (tail.summary() / 3600).round(2)
+    st.bar_chart(summary_hours.rename("時間(h)"))
+    st.dataframe(
+        summary_hours.rename("時間(h)").reset_index(),
+        width="stretch",
+    )
+
+    bad = f"、解析できない行 {tail.bad_rows} 行" if tail.bad_rows else ""
+    st.caption(f"{REFRESH_SECONDS}秒ごとに自動更新（読み込み済み {tail.rows} 行{bad}）")
+
+
+live_view(machine_name)
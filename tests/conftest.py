@@ -0,0 +1,11 @@
+"""テスト共通の設定"""
+import atexit
+import os
+import shutil
+import tempfile
+
+## キャッシュ（マニフェスト・ロールアップ・Parquet 等）は一時ディレクトリに作り、cache/ を汚さない
+## （libs.settings の読み込み時に決まるため、テストモジュールより先にここで設定する）
+_cache_dir = tempfile.mkdtemp(prefix="machining-test-cache-")
+os.environ["MACHINING_CACHE_DIR"] = _cache_dir
+atexit.register(shutil.rmtree, _cache_dir, ignore_errors=True)
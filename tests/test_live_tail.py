@@ -0,0 +1,98 @@
+"""libs.live_tail.StatusTail のテスト"""
+import subprocess
+import sys
+from datetime import datetime
+
+from libs.live_tail import StatusTail
+
+
+HEADER = "日時,ステータス,経過秒数\n"
+
+
+def write(path, text: str, mode: str = "a"):
+    with open(path, mode, encoding="utf-8", newline="") as f:
+        f.write(text)
+
+
+def test_poll_reads_only_appended_lines(tmp_path):
+    path = tmp_path / "20260510.csv"
+    write(path, HEADER + "2026-05-10 05:00:00,電源断,3600\n", "w")
+
+    tail = StatusTail(path)
+    assert tail.poll() == 1
+    assert tail.poll() == 0
+
+    write(path, "2026-05-10 06:00:00,自動起動,600\n2026-05-10 06:10:00,電源断,60\n")
+    assert tail.poll() == 2
+    assert tail.rows == 3
+    assert tail.status_seconds["電源断"] == 3660
+    assert tail.status_seconds["自動起動"] == 600
+    assert tail.power_on_time == datetime(2026, 5, 10, 6, 0)
+    assert tail.power_off_time == datetime(2026, 5, 10, 6, 10)
+
+
+def test_partial_line_is_carried_over(tmp_path):
+    path = tmp_path / "20260510.csv"
+    write(path, HEADER + "2026-05-10 05:00:00,段取り,1", "w")
+
+    tail = StatusTail(path)
+    assert tail.poll() == 0
+
+    write(path, "20\n")
+    assert tail.poll() == 1
+    assert tail.status_seconds["段取り"] == 120
+
+
+def test_bad_lines_are_skipped_and_counted(tmp_path):
+    path = tmp_path / "20260510.csv"
+    write(
+        path,
+        HEADER
+        + "2026-05-10 05:00:00,電源断,3600\n"
+        + "2026-05-10 06:00:00,自動起動\n"  # 列が足りない
+        + "2026-05-10 06:00:00,自動起動,abc\n"  # 秒数が数値でない
+        + "not-a-date,自動起動,10\n"  # 日時が解析できない
+        + "2026-05-10 06:00:00,自動起動,600\n",
+        "w",
+    )
+
+    tail = StatusTail(path)
+    assert tail.poll() == 2
+    assert tail.bad_rows == 3
+    assert tail.status_seconds["自動起動"] == 600
+    assert tail.last_status == "自動起動"
+
+    # 壊れた行の後も読み込み位置は進み、次の追記分を読める
+    write(path, "2026-05-10 06:10:00,電源断,60\n")
+    assert tail.poll() == 1
+    assert tail.rows == 3
+
+
+def test_replaced_file_is_read_from_start(tmp_path):
+    path = tmp_path / "20260510.csv"
+    write(path, HEADER + "2026-05-10 05:00:00,電源断,3600\n2026-05-10 06:00:00,自動起動,600\n", "w")
+
+    tail = StatusTail(path)
+    tail.poll()
+
+    write(path, HEADER + "2026-05-10 05:00:00,段取り,60\n", "w")
+    assert tail.poll() == 1
+    assert tail.rows == 1
+    assert tail.status_seconds["電源断"] == 0
+    assert tail.status_seconds["段取り"] == 60
+
+
+def test_import_does_not_load_pandas():
+    # 当日稼働ページの起動時間のため、読み込みだけでは pandas を import しない
+    code = "import sys, libs.live_tail; sys.exit('pandas' in sys.modules)"
+    assert subprocess.run([sys.executable, "-c", code]).returncode == 0
+
+
+def test_summary_and_old_timestamp_format(tmp_path):
+    path = tmp_path / "20260510.csv"
+    write(path, HEADER + "2026/5/10 5:00,電源断,3600\n2026/5/10 6:00,自動起動,120\n", "w")
+
+    tail = StatusTail(path)
+    assert tail.poll() == 2
+    assert tail.power_on_time == datetime(2026, 5, 10, 6, 0)
+    assert tail.summary().to_dict() == {"電源断": 3600, "自動起動": 120}
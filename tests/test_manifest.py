@@ -0,0 +1,121 @@
+"""libs.manifest と、それを使う鮮度の確認（scan_sources・ロールアップ）のテスト"""
+import os
+from datetime import date
+
+import pytest
+
+from libs.event_store import load_day, scan_sources
+from libs.manifest import get_manifest
+from libs.rollup import get_day_summary, refresh_rollup
+
+
+HEADER = "日時,ステータス,経過秒数\n"
+MACHINE = "T-1"
+
+
+def write_day(machine_dir, ymd: str, rows: list):
+    text = HEADER + "".join(f"{ymd[:4]}-{ymd[4:6]}-{ymd[6:]} {t},{s},{sec}\n" for t, s, sec in rows)
+    (machine_dir / f"{ymd}.csv").write_text(text, encoding="utf-8")
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    machine_dir = tmp_path / "dataset" / MACHINE
+    machine_dir.mkdir(parents=True)
+    write_day(machine_dir, "20260501", [("05:00:00", "電源断", 3600), ("06:00:00", "自動起動", 82800)])
+    write_day(machine_dir, "20260502", [("05:00:00", "電源断", 86400)])
+    write_day(machine_dir, "20260504", [("05:00:00", "段取り", 86400)])
+    return tmp_path / "dataset"
+
+
+def rewrite_in_place(machine_dir, ymd: str, rows: list):
+    """過去日のCSVを書き換える（ディレクトリの mtime は元に戻す）"""
+    st = os.stat(machine_dir)
+    path = machine_dir / f"{ymd}.csv"
+    old = os.stat(path)
+    write_day(machine_dir, ymd, rows)
+    os.utime(path, ns=(old.st_atime_ns, old.st_mtime_ns + 1_000_000_000))
+    os.utime(machine_dir, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+
+def test_range_queries(dataset, tmp_path):
+    manifest = get_manifest(MACHINE, dataset, tmp_path / "manifest")
+
+    assert manifest.dates == [date(2026, 5, 1), date(2026, 5, 2), date(2026, 5, 4)]
+    assert manifest.dates_in_range(date(2026, 5, 2), date(2026, 5, 31)) == [date(2026, 5, 2), date(2026, 5, 4)]
+    assert manifest.missing_dates(date(2026, 5, 1), date(2026, 5, 4)) == [date(2026, 5, 3)]
+    assert manifest.nearest(date(2026, 5, 3)) == (date(2026, 5, 2), date(2026, 5, 4))
+    assert manifest.entries[date(2026, 5, 1)].rows == 2
+
+
+def test_new_file_is_found_by_directory_mtime(dataset, tmp_path):
+    manifest_dir = tmp_path / "manifest"
+    get_manifest(MACHINE, dataset, manifest_dir)
+
+    write_day(dataset / MACHINE, "20260505", [("05:00:00", "電源断", 86400)])
+    # 同じ秒のうちに作ると mtime が変わらないファイルシステムがあるため明示的に進める
+    st = os.stat(dataset / MACHINE)
+    os.utime(dataset / MACHINE, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+    assert get_manifest(MACHINE, dataset, manifest_dir).last_date == date(2026, 5, 5)
+
+
+def test_full_detects_in_place_rewrite(dataset, tmp_path):
+    manifest_dir = tmp_path / "manifest"
+    before = get_manifest(MACHINE, dataset, manifest_dir).entries[date(2026, 5, 1)]
+
+    rewrite_in_place(dataset / MACHINE, "20260501", [("05:00:00", "段取り", 86400)])
+
+    # ディレクトリの mtime だけを見る問い合わせでは気付かない（日付の有無は変わらないため十分）
+    assert get_manifest(MACHINE, dataset, manifest_dir).entries[date(2026, 5, 1)] == before
+    after = get_manifest(MACHINE, dataset, manifest_dir, full=True).entries[date(2026, 5, 1)]
+    assert after.sha1 != before.sha1
+    assert after.rows == 1
+
+
+def test_rollup_reaggregates_in_place_rewrite(dataset, tmp_path):
+    db_path = tmp_path / "rollup.db"
+    assert refresh_rollup([MACHINE], dataset, db_path, executor="serial") == 3
+    assert get_day_summary(MACHINE, date(2026, 5, 1), db_path).status_seconds["自動起動"] == 82800
+
+    rewrite_in_place(dataset / MACHINE, "20260501", [("05:00:00", "段取り", 86400)])
+
+    # 期間を指定しなければディレクトリの mtime だけで判断する（全ファイルの stat はしない）
+    assert refresh_rollup([MACHINE], dataset, db_path, executor="serial") == 0
+    # 期間を指定すると、その期間のファイルだけ stat し直して拾う
+    assert refresh_rollup(
+        [MACHINE], dataset, db_path, executor="serial",
+        start_date=date(2026, 5, 1), end_date=date(2026, 5, 1),
+    ) == 1
+    summary = get_day_summary(MACHINE, date(2026, 5, 1), db_path)
+    assert summary.status_seconds.get("自動起動", 0) == 0
+    assert summary.status_seconds["段取り"] == 86400
+
+
+def test_removed_file_is_dropped(dataset, tmp_path):
+    manifest_dir = tmp_path / "manifest"
+    get_manifest(MACHINE, dataset, manifest_dir)
+
+    (dataset / MACHINE / "20260502.csv").unlink()
+    manifest = get_manifest(MACHINE, dataset, manifest_dir, full=True)
+    assert manifest.dates == [date(2026, 5, 1), date(2026, 5, 4)]
+    assert date(2026, 5, 2) not in manifest.entries
+
+
+def test_scan_sources_full_and_range(dataset, tmp_path):
+    scan_sources(MACHINE, dataset)
+    rewrite_in_place(dataset / MACHINE, "20260502", [("05:00:00", "段取り", 43200), ("17:00:00", "電源断", 43200)])
+    size = os.stat(dataset / MACHINE / "20260502.csv").st_size
+
+    assert scan_sources(MACHINE, dataset)["2026-05"]["20260502.csv"][1] != size
+    # 範囲外の日は stat し直さない
+    assert scan_sources(MACHINE, dataset, date(2026, 5, 3), date(2026, 5, 31))["2026-05"]["20260502.csv"][1] != size
+    assert scan_sources(MACHINE, dataset, full=True)["2026-05"]["20260502.csv"][1] == size
+
+
+def test_load_day_reingests_rewritten_month(dataset, tmp_path):
+    store_dir = tmp_path / "events"
+    assert load_day(MACHINE, date(2026, 5, 1), dataset, store_dir)["ステータス"].tolist() == ["電源断", "自動起動"]
+
+    rewrite_in_place(dataset / MACHINE, "20260501", [("05:00:00", "段取り", 86400)])
+    assert load_day(MACHINE, date(2026, 5, 1), dataset, store_dir)["ステータス"].tolist() == ["段取り"]
@@ -0,0 +1,42 @@
+"""libs.parallel.iter_ordered のテスト"""
+import time
+
+import pytest
+
+from libs.parallel import CHUNK_SIZE, EXECUTORS, iter_ordered
+
+
+def _slow_square(x: int) -> int:
+    # 後の要素ほど早く終わるようにして、完了順ではなく入力順で返ることを確かめる
+    time.sleep(0.001 * (x % 5))
+    return x * x
+
+
+@pytest.mark.parametrize("executor", EXECUTORS)
+def test_results_keep_input_order(executor):
+    items = list(range(CHUNK_SIZE * 2 + 3))
+    assert list(iter_ordered(_slow_square, items, executor, max_workers=4)) == [x * x for x in items]
+
+
+@pytest.mark.parametrize("items", [[], [3]])
+def test_empty_and_single_item(items):
+    assert list(iter_ordered(_slow_square, items, "thread", max_workers=4)) == [x * x for x in items]
+
+
+def test_items_are_consumed_one_chunk_at_a_time():
+    pulled = []
+
+    def source():
+        for i in range(CHUNK_SIZE * 3):
+            pulled.append(i)
+            yield i
+
+    results = iter_ordered(_slow_square, source(), "thread", max_workers=4)
+    next(results)
+    assert len(pulled) == CHUNK_SIZE
+    assert len(list(results)) == CHUNK_SIZE * 3 - 1
+
+
+def test_unknown_executor_is_an_error():
+    with pytest.raises(ValueError, match="MACHINING_LOAD_EXECUTOR"):
+        list(iter_ordered(_slow_square, [1, 2], "thraed"))
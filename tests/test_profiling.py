@@ -0,0 +1,47 @@
+"""libs.profiling・libs.debug_panel の計測開始/終了のテスト"""
+import json
+
+from libs import debug_panel, profiling
+
+
+def test_span_and_cache_are_recorded(tmp_path):
+    log_path = tmp_path / "profile.jsonl"
+    profiling.start("page")
+    with profiling.span("aggregate"):
+        with profiling.span("aggregate"):  # 同じ段階の入れ子は外側だけ
+            pass
+        with profiling.span("csv_parse"):
+            pass
+    profiling.count_cache("c", hit=True)
+    profiling.count_cache("c", hit=False)
+
+    profile = profiling.finish({"x": 1}, log_path)
+    assert profile.stages["aggregate"][0] == 1
+    assert profile.stages["csv_parse"][0] == 1
+    assert profile.cache["c"] == [2, 1]
+
+    record = json.loads(log_path.read_text(encoding="utf-8"))
+    assert record["page"] == "page" and record["cache"]["c"]["hits"] == 1
+    assert profiling.current() is None
+
+
+def test_nothing_is_recorded_without_start(tmp_path):
+    with profiling.span("aggregate"):
+        pass
+    assert profiling.finish(log_path=tmp_path / "profile.jsonl") is None
+    assert not (tmp_path / "profile.jsonl").exists()
+
+
+def test_disabled_run_discards_unfinished_profile(tmp_path, monkeypatch):
+    # st.stop() で終わった実行の計測がスレッドに残っている状態
+    monkeypatch.setattr(debug_panel, "debug_enabled", lambda: True)
+    assert debug_panel.start_profile("analysis") is not None
+    with profiling.span("aggregate"):
+        pass
+
+    # 同じスレッドの次の実行（計測は無効）
+    monkeypatch.setattr(debug_panel, "debug_enabled", lambda: False)
+    assert debug_panel.start_profile("analysis") is None
+    with profiling.span("aggregate"):
+        pass
+    assert profiling.finish(log_path=tmp_path / "profile.jsonl") is None
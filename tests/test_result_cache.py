@@ -0,0 +1,67 @@
+"""libs.result_cache のテスト"""
+import os
+from datetime import date
+
+import pandas as pd
+
+from libs.result_cache import ResultCache, source_version
+
+
+def test_put_get_memory_and_disk(tmp_path):
+    cache = ResultCache(tmp_path / "results")
+    value = pd.DataFrame({"a": [1, 2, 3]})
+    cache.put(("x", 1), value)
+
+    pd.testing.assert_frame_equal(cache.get(("x", 1)), value)
+    assert cache.stats()["hits"] == 1
+
+    # メモリから消えてもディスクから読み戻す（再起動後と同じ）
+    fresh = ResultCache(tmp_path / "results")
+    pd.testing.assert_frame_equal(fresh.get(("x", 1)), value)
+    assert fresh.stats()["disk_hits"] == 1
+    assert fresh.get(("x", 2), "none") == "none"
+
+
+def test_memory_limit_evicts_oldest(tmp_path):
+    cache = ResultCache(tmp_path / "results", max_memory_bytes=300)
+    for i in range(5):
+        cache.put(("x", i), b"0" * 100)
+    assert cache.stats()["memory_bytes"] <= 300
+    assert cache.get(("x", 0)) == b"0" * 100  # ディスクには残っている
+
+
+def test_corrupted_file_is_a_miss(tmp_path):
+    cache = ResultCache(tmp_path / "results")
+    cache.put(("x", 1), list(range(1000)))
+    path = cache._disk_path(cache.make_key(("x", 1)))
+    path.write_bytes(path.read_bytes()[:20])  # 途中で切れたファイル
+
+    fresh = ResultCache(tmp_path / "results")
+    assert fresh.get(("x", 1), "miss") == "miss"
+    assert not path.exists()
+    assert fresh.get_or_compute(("x", 1), lambda: [1]) == [1]
+    assert ResultCache(tmp_path / "results").get(("x", 1)) == [1]
+
+
+def test_source_version_follows_in_place_rewrite(tmp_path):
+    machine_dir = tmp_path / "dataset" / "T-1"
+    machine_dir.mkdir(parents=True)
+    for ymd in ("20260501", "20260502"):
+        (machine_dir / f"{ymd}.csv").write_text(
+            f"日時,ステータス,経過秒数\n{ymd[:4]}-{ymd[4:6]}-{ymd[6:]} 05:00:00,電源断,86400\n", encoding="utf-8"
+        )
+    dataset = tmp_path / "dataset"
+    may = (date(2026, 5, 1), date(2026, 5, 31))
+    before = source_version("T-1", *may, dataset)
+    only_2nd = source_version("T-1", date(2026, 5, 2), date(2026, 5, 2), dataset)
+
+    # 過去日をその場で書き換える（ディレクトリの mtime は変わらない）
+    st = os.stat(machine_dir)
+    path = machine_dir / "20260501.csv"
+    old = os.stat(path)
+    path.write_text("日時,ステータス,経過秒数\n2026-05-01 05:00:00,段取り,86400\n", encoding="utf-8")
+    os.utime(path, ns=(old.st_atime_ns, old.st_mtime_ns + 1_000_000_000))
+    os.utime(machine_dir, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+    assert source_version("T-1", *may, dataset) != before
+    assert source_version("T-1", date(2026, 5, 2), date(2026, 5, 2), dataset) == only_2nd
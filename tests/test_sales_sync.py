@@ -0,0 +1,58 @@
+"""output_sales_and_operator.sync_sales のテスト（抽出元の無い日・機械を上書きしない）"""
+import sqlite3
+from datetime import date
+
+import pytest
+
+import output_sales_and_operator as extraction
+from benchmarks.synthetic import write_machining_db
+from libs.sales_db import fetch_daily_sale, upsert_daily_sales
+
+
+MACHINES = ["SYN-001", "SYN-002"]
+ABSENT = "SYN-003"  # 抽出元に1行も無い機械
+
+
+@pytest.fixture
+def source(tmp_path):
+    """2026-01-01 から3日分の machining_completed（SYN-001, SYN-002）"""
+    db_path = tmp_path / "machining.db"
+    write_machining_db(db_path, 600, MACHINES, date(2026, 1, 1), 3)
+
+    conn = sqlite3.connect(db_path)
+    yield conn.cursor()
+    conn.close()
+
+
+@pytest.fixture
+def sales_db(tmp_path):
+    """抽出元の範囲外の売上が入っている sales.db"""
+    db_path = tmp_path / "sales.db"
+    upsert_daily_sales(
+        [
+            ("SYN-001", "2026-01-10", 12345, "A0", "", "B0", ""),
+            (ABSENT, "2026-01-02", 678, "C0", "", "", ""),
+        ],
+        db_path,
+    )
+    return db_path
+
+
+def test_sync_keeps_rows_without_source(source, sales_db):
+    counts = extraction.sync_sales(source, "2026-01-01", "2026-01-10", sales_db, machines=MACHINES + [ABSENT])
+
+    assert counts["inserted"] == len(MACHINES) * 3
+    assert counts["skipped"] == 3 * 10 - len(MACHINES) * 3
+    assert fetch_daily_sale("SYN-001", date(2026, 1, 10), sales_db)[0] == 12345
+    assert fetch_daily_sale(ABSENT, date(2026, 1, 2), sales_db)[0] == 678
+    assert fetch_daily_sale("SYN-002", date(2026, 1, 2), sales_db)[0] > 0
+
+
+def test_sync_zero_fill(source, sales_db):
+    counts = extraction.sync_sales(
+        source, "2026-01-01", "2026-01-10", sales_db, zero_fill=True, machines=MACHINES + [ABSENT]
+    )
+
+    assert counts["skipped"] == 0
+    assert fetch_daily_sale("SYN-001", date(2026, 1, 10), sales_db)[0] == 0
+    assert fetch_daily_sale(ABSENT, date(2026, 1, 2), sales_db)[0] == 0
@@ -0,0 +1,45 @@
+"""libs.shifts のテスト（パーティションごとの集計が一括の集計と一致すること）"""
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from libs.event_store import load_events
+from libs.manifest import list_machines
+from libs.settings import load_config
+from libs.shifts import shift_status_seconds, stream_shift_status_seconds
+from libs.status_csv import STATUS_LIST
+
+
+COLUMNS = ["日時", "ステータス", "経過秒数"]
+
+
+@pytest.mark.parametrize(
+    "start_date, end_date",
+    [
+        (date(2026, 3, 1), date(2026, 3, 31)),
+        (date(2026, 2, 20), date(2026, 4, 5)),  # 月をまたぐ
+        (date(2026, 6, 28), date(2026, 6, 28)),  # 1日だけ
+        (date(2030, 1, 1), date(2030, 1, 31)),  # データなし
+    ],
+)
+def test_stream_matches_concatenated_events(start_date, end_date):
+    machines = list_machines()
+    expected = shift_status_seconds(load_events(machines, start_date, end_date, columns=COLUMNS))
+    result = stream_shift_status_seconds(machines, start_date, end_date)
+
+    pd.testing.assert_frame_equal(result, expected)
+    assert list(result.columns) == STATUS_LIST
+
+
+def test_stream_matches_with_other_boundary():
+    config = load_config()
+    config["day_end"] = {"hour": 19, "mitute": 30, "second": 0}
+    machines = list_machines()[:3]
+    start_date, end_date = date(2026, 5, 1), date(2026, 5, 31)
+
+    expected = shift_status_seconds(load_events(machines, start_date, end_date, columns=COLUMNS), config)
+    result = stream_shift_status_seconds(machines, start_date, end_date, config)
+
+    pd.testing.assert_frame_equal(result, expected)
+    assert not result.empty
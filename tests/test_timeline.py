@@ -0,0 +1,69 @@
+"""libs.timeline.Timeline のテスト"""
+import numpy as np
+import pandas as pd
+
+from libs.status_csv import STATUS_LIST
+from libs.timeline import Timeline
+
+
+def events(rows: list) -> pd.DataFrame:
+    return pd.DataFrame(rows, columns=["日時", "ステータス", "経過秒数"]).assign(
+        日時=lambda d: pd.to_datetime(d["日時"])
+    )
+
+
+DAY = events([
+    ("2026-05-10 05:00:00", "電源断", 3600),
+    ("2026-05-10 06:00:00", "段取り", 600),
+    ("2026-05-10 06:10:00", "自動起動", 1200),
+    ("2026-05-10 06:30:00", "自動起動", 1800),
+    ("2026-05-10 07:00:00", "電源断", 79200),
+])
+
+
+def test_from_events_uses_operating_day_origin():
+    # 5:00 前の行は前日の稼働日に属する
+    timeline = Timeline.from_events(events([("2026-05-11 04:00:00", "電源断", 3600)]))
+    assert timeline.origin == np.datetime64("2026-05-10T05:00:00")
+    assert timeline.start.tolist() == [23 * 3600]
+
+    timeline = Timeline.from_events(DAY)
+    assert timeline.start.tolist() == [0, 3600, 4200, 5400, 7200]
+    assert timeline.end[-1] == 24 * 3600
+
+
+def test_unknown_status_maps_to_fumei():
+    timeline = Timeline.from_events(events([("2026-05-10 05:00:00", "謎", 10)]))
+    assert timeline.statuses.tolist() == ["不明"]
+
+
+def test_merged_joins_consecutive_statuses():
+    merged = Timeline.from_events(DAY).merged()
+    assert merged.statuses.tolist() == ["電源断", "段取り", "自動起動", "電源断"]
+    assert merged.duration.tolist() == [3600, 600, 3000, 79200]
+
+
+def test_check_continuity_reports_gaps_and_overlaps():
+    assert Timeline.from_events(DAY).check_continuity().empty
+
+    timeline = Timeline.from_events(events([
+        ("2026-05-10 05:00:00", "電源断", 3600),
+        ("2026-05-10 06:00:10", "段取り", 600),  # 10秒のすき間
+        ("2026-05-10 06:10:00", "自動起動", 600),  # 10秒の重なり
+    ]))
+    gaps = timeline.check_continuity()
+    assert gaps["行"].tolist() == [1, 2]
+    assert gaps["種別"].tolist() == ["すき間", "重なり"]
+    assert gaps["秒数"].tolist() == [10, 10]
+
+
+def test_status_seconds_in_windows():
+    timeline = Timeline.from_events(DAY)
+    # 5:00～6:05 と 6:05～翌5:00
+    result = timeline.status_seconds_in_windows([(0, 3900), (3900, 24 * 3600)])
+
+    power_off = STATUS_LIST.index("電源断")
+    setup = STATUS_LIST.index("段取り")
+    assert result[0, power_off] == 3600 and result[0, setup] == 300
+    assert result[1, setup] == 300 and result[1, power_off] == 79200
+    assert result.sum() == 24 * 3600